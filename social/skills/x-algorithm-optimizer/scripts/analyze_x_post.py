@@ -12,13 +12,78 @@ Usage:
 
     # Or calculate raw weighted score
     score = calculate_weighted_score(p_reply=0.15, p_like=0.08, p_block=0.001)
+
+    # Features are extracted once and shared by every analyzer
+    features = extract_features("Your post text here")
+    post_type, patterns = detect_post_type(features)
+
+    # Score a large batch across all cores
+    for result in analyze_posts(posts, workers=8):
+        ...
+
+    # Memoize repeated drafts (LRU, optional TTL)
+    cache = enable_cache(maxsize=50_000, ttl=3600)
+    analyze_post("Same draft again")
+    print(cache.stats())
+
+    # Real media: aspect ratio and duration read from the file headers
+    result = analyze_post("Your post text here", media_files=["clip.mp4"])
+    for info in inspect_media_files(paths, strict=False):
+        ...
+
+    # Score only (no feedback strings) for filtering stages
+    score = quick_score("Your post text here", include_media=True)
+
+    # Whole threads: hook weighted separately, one aggregate score
+    thread = analyze_thread(["Hook tweet 🧵", "Tweet 2", "Follow for more"])
+    print(format_thread_report(thread))
+
+    # Calibrated weights and probability coefficients (see scripts/calibrate.py)
+    load_profile("profile.json")
+
+    # Declarative scoring rules: export, edit, hot-swap (compiled before the swap)
+    json.dump(current_rules(), open("rules.json", "w"), indent=2)
+    load_rules("rules.json")
+
+    # Percentiles against your own history (see scripts/percentile_index.py)
+    enable_percentiles("reference.pidx")
+    print(format_report(analyze_post("Your post text here")))  # adds "Percentile: 87th ..."
+
+    # Per-stage timings and pattern/post-type counters (off by default)
+    metrics = enable_metrics(callback=None)
+    analyze_post("Your post text here")
+    print(metrics.snapshot()["stages"]["reply"])
 """
 
+import copy
+import hashlib
+import heapq
+import json
+import mmap
+import operator
+import os
 import re
-from dataclasses import dataclass, field
-from typing import Optional
+import string
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from itertools import count, islice, tee
+from typing import Iterable, Iterator, Optional, Union
 from enum import Enum
 
+from media_info import MediaInfo, inspect_media, inspect_media_files, primary_media  # noqa: F401 (re-exported)
+
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
 
 # === CONFIGURATION: Inferred weights from algorithm analysis ===
 
@@ -61,6 +126,53 @@ class PostType(Enum):
     GENERIC = "generic"
 
 
+# Compact integer code per post type (stable: follows declaration order)
+POST_TYPE_CODES = {post_type: code for code, post_type in enumerate(PostType)}
+
+# Scored actions, in the order used by calculate_weighted_score and batch arrays
+ACTIONS = (
+    "reply", "repost", "quote", "like", "video_view", "photo_expand",
+    "bookmark", "click", "profile_click", "block", "mute", "report",
+)
+
+# Per-type probability multipliers, and the cap applied after each multiplier
+TYPE_ADJUSTMENTS = {
+    PostType.FILL_BLANK: {"p_reply": 1.5},
+    PostType.OPEN_QUESTION: {"p_reply": 1.3},
+    PostType.DATA_DROP: {"p_repost": 1.4, "p_bookmark": 1.5},
+    PostType.THREAD_HOOK: {"p_bookmark": 1.5, "p_profile_click": 1.4},
+    PostType.CONTRARIAN: {"p_reply": 1.2, "p_quote": 1.3, "p_block": 1.5},
+    PostType.LINK_DUMP: {"p_reply": 0.3, "p_repost": 0.3, "p_like": 0.4},
+}
+
+ADJUSTED_CAPS = {
+    "p_reply": 0.35,
+    "p_repost": 0.15,
+    "p_quote": 0.08,
+    "p_bookmark": 0.12,
+    "p_profile_click": 0.10,
+    "p_like": 0.25,
+    "p_block": 0.05,
+}
+
+# Component-score points per unit of probability: P(action) = min(cap, driver / divisor)
+# before type adjustments (drivers: reply, share, reply + share, media, 100 - safety)
+PROBABILITY_DIVISORS = {
+    "p_reply": 300.0,
+    "p_repost": 700.0,
+    "p_quote": 1000.0,
+    "p_like": 500.0,
+    "p_bookmark": 800.0,
+    "p_profile_click": 1000.0,
+    "p_video_view": 400.0,
+    "p_photo_expand": 450.0,
+    "p_block": 5000.0,
+}
+
+# Mute and report rates as fractions of the (unadjusted) block rate
+BLOCK_RATIOS = {"p_mute": 0.5, "p_report": 0.1}
+
+
 @dataclass
 class ProbabilityEstimates:
     """Estimated engagement probabilities."""
@@ -78,6 +190,10 @@ class ProbabilityEstimates:
     p_report: float = 0.0
 
 
+# Version of the AnalysisResult.to_dict() layout (bump on any field change)
+RESULT_SCHEMA_VERSION = 1
+
+
 @dataclass
 class AnalysisResult:
     """Comprehensive analysis results."""
@@ -112,6 +228,47 @@ class AnalysisResult:
     has_media: bool
     media_type: Optional[str]
 
+    def to_dict(self) -> dict:
+        """
+        JSON-ready dict in field order (schema RESULT_SCHEMA_VERSION).
+
+        post_type is its POST_TYPE_CODES code and probabilities is a flat
+        {"p_reply": ...} dict. Much cheaper than dataclasses.asdict.
+        """
+        d = self.__dict__.copy()
+        d["score_breakdown"] = dict(self.score_breakdown)
+        d["post_type"] = POST_TYPE_CODES[self.post_type]
+        d["detected_patterns"] = list(self.detected_patterns)
+        d["probabilities"] = self.probabilities.__dict__.copy()
+        d["strengths"] = list(self.strengths)
+        d["weaknesses"] = list(self.weaknesses)
+        d["suggestions"] = list(self.suggestions)
+        return d
+
+    def to_json(self) -> str:
+        """Compact JSON of to_dict()."""
+        return _encode_json(self.to_dict())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AnalysisResult":
+        """Rebuild a result from to_dict() output; post_type may be a code or its string value."""
+        post_type = data["post_type"]
+        post_type = _POST_TYPES[post_type] if isinstance(post_type, int) else PostType(post_type)
+        return cls(**{
+            **data,
+            "score_breakdown": dict(data["score_breakdown"]),
+            "post_type": post_type,
+            "detected_patterns": list(data["detected_patterns"]),
+            "probabilities": ProbabilityEstimates(**data["probabilities"]),
+            "strengths": list(data["strengths"]),
+            "weaknesses": list(data["weaknesses"]),
+            "suggestions": list(data["suggestions"]),
+        })
+
+
+_POST_TYPES = tuple(PostType)
+_encode_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
 
 def calculate_weighted_score(
     p_reply: float = 0.0,
@@ -152,19 +309,15 @@ def calculate_weighted_score(
     return total, breakdown
 
 
-def detect_post_type(text: str) -> tuple[PostType, list]:
-    """Detect the post type and patterns used."""
-    text_lower = text.lower()
-    detected = []
+# === RULES: declarative rule tables, compiled into a decision table ===
 
-    # Fill-in-the-blank (highest priority)
-    fill_patterns = [r"___", r"complete the sentence", r"fill in"]
-    if any(re.search(p, text_lower) for p in fill_patterns):
-        detected.append("fill_in_the_blank")
-        return PostType.FILL_BLANK, detected
-
-    # Open question
-    open_q_patterns = [
+# Rule patterns, grouped by the check that consumes them. Each group is compiled
+# once into a single alternation; a group "hits" if any of its patterns matches.
+# Post type priority lives in DEFAULT_RULES["post_types"], not in this table's order.
+PATTERN_GROUPS = {
+    # detect_post_type
+    "fill_blank": [r"___", r"complete the sentence", r"fill in"],
+    "open_question": [
         r"what('s| is| are) your",
         r"what do you",
         r"how do you",
@@ -172,213 +325,850 @@ def detect_post_type(text: str) -> tuple[PostType, list]:
         r"what's yours\?",
         r"agree or disagree",
         r"thoughts\?$",
-    ]
-    if any(re.search(p, text_lower) for p in open_q_patterns):
-        detected.append("open_question")
-        return PostType.OPEN_QUESTION, detected
-
-    # Contrarian/Hot take
-    contrarian_patterns = [
+    ],
+    "contrarian": [
         r"unpopular opinion",
         r"hot take",
         r"controversial",
         r"most people (think|believe|get wrong)",
-    ]
-    if any(re.search(p, text_lower) for p in contrarian_patterns):
-        detected.append("contrarian_take")
-        return PostType.CONTRARIAN, detected
-
-    # Thread hook
-    if "🧵" in text or re.search(r"thread|here's (the|my|a) (playbook|system|framework)", text_lower):
-        detected.append("thread_hook")
-        return PostType.THREAD_HOOK, detected
-
-    # Data drop
-    if re.search(r"\d+%|\d+ (percent|out of)", text_lower) and re.search(r"(analyzed|studied|found|shows)", text_lower):
-        detected.append("data_drop")
-        return PostType.DATA_DROP, detected
-
-    # Framework
-    if re.search(r"(the \w+ framework|framework:|\d\.\s|\d\)\s)", text_lower):
-        detected.append("framework")
-        return PostType.FRAMEWORK, detected
-
-    # Mistake admission
-    if re.search(r"(biggest mistake|i was wrong|i failed|lesson learned)", text_lower):
-        detected.append("mistake_admission")
-        return PostType.MISTAKE_ADMISSION, detected
-
-    # List
-    if re.search(r"^\d+[\.\)]\s", text, re.MULTILINE) or re.search(r"\d+ (tips|lessons|things|ways)", text_lower):
-        detected.append("rapid_fire_list")
-        return PostType.LIST, detected
-
-    # Link dump (anti-pattern)
-    url_pattern = r"https?://\S+"
-    if re.search(url_pattern, text):
-        text_no_url = re.sub(url_pattern, "", text).strip()
-        if len(text_no_url) < 50:
-            detected.append("link_dump")
-            return PostType.LINK_DUMP, detected
-
-    return PostType.GENERIC, detected
-
-
-def analyze_reply_potential(text: str, post_type: PostType) -> tuple[int, list, list, list]:
-    """Analyze P(reply) optimization. Returns (score, strengths, weaknesses, suggestions)."""
-    score = 40  # Base
-    strengths, weaknesses, suggestions = [], [], []
-    text_lower = text.lower()
-
-    # Post type bonuses
-    type_bonuses = {
-        PostType.FILL_BLANK: (40, "Fill-in-the-blank format (highest P(reply) potential, est. 20-35%)"),
-        PostType.OPEN_QUESTION: (30, "Open question inviting specific responses (est. P(reply) 15-25%)"),
-        PostType.CONTRARIAN: (20, "Contrarian framing invites debate from both sides"),
-        PostType.MISTAKE_ADMISSION: (15, "Vulnerability invites reciprocal sharing"),
-    }
+    ],
+    "thread": [r"thread|here's (the|my|a) (playbook|system|framework)"],
+    "data_stat": [r"\d+%|\d+ (percent|out of)"],
+    "data_verb": [r"(analyzed|studied|found|shows)"],
+    "framework": [r"(the \w+ framework|framework:|\d\.\s|\d\)\s)"],
+    "mistake": [r"(biggest mistake|i was wrong|i failed|lesson learned)"],
+    "list_count": [r"\d+ (tips|lessons|things|ways)"],
+    # analyze_reply_potential
+    "complete": [r"in conclusion", r"to summarize", r"that's all", r"the end\."],
+    "nuance": [r"but here's", r"however", r"that said", r"it depends", r"the nuance"],
+    # analyze_shareability
+    "value": [
+        r"here's (the|my|a) (playbook|framework|system|secret)",
+        r"i (analyzed|studied|spent \d+)",
+        r"\d+ (tips|lessons|things|ways|steps)",
+    ],
+    # analyze_negative_signals
+    "rage_insult": [r"\b(idiot|stupid|dumb|moron)s?\b"],
+    "rage_dismissive": [r"\b(wake up|sheep|sheeple)\b"],
+    "rage_accusatory": [r"\byou('re| are) (all )?wrong\b"],
+    "safety_nuance": [r"but here's", r"however", r"that said", r"nuance"],
+}
+
+# Literal substrings, at least one of which must occur for a regex group to
+# match. Groups made only of plain phrases need no entry: their phrases are
+# their keys, and finding one is already a hit.
+PATTERN_KEYS = {
+    "open_question": ["what", "how do you", "which ", "agree or disagree", "thoughts?"],
+    "contrarian": ["unpopular opinion", "hot take", "controversial", "most people "],
+    "thread": ["thread", "here's "],
+    "data_stat": ["%", " percent", " out of"],
+    "data_verb": ["analyzed", "studied", "found", "shows"],
+    "framework": [" framework", "framework:", ".", ")"],
+    "mistake": ["biggest mistake", "i was wrong", "i failed", "lesson learned"],
+    "list_count": [" tips", " lessons", " things", " ways"],
+    "value": ["here's ", "i analyzed", "i studied", "i spent ", " tips", " lessons", " things", " ways", " steps"],
+    "rage_insult": ["idiot", "stupid", "dumb", "moron"],
+    "rage_dismissive": ["wake up", "sheep"],
+    "rage_accusatory": ["wrong"],
+}
+
+# Version of the rules file layout understood by Ruleset
+RULES_SCHEMA_VERSION = 1
+
+# Built-in ruleset, in the rules file format (see load_rules). Each rule's
+# "when" holds conditions that must all be true: "type" / "not_type" (post
+# types), "hit" / "miss" (pattern groups) and "test" ([feature, op, value]).
+# A matching rule adds its points to the component and emits its messages;
+# "{char_count}" style placeholders are filled from the tested features.
+DEFAULT_RULES = {
+    "schema": RULES_SCHEMA_VERSION,
+    "version": "builtin",
+    "patterns": PATTERN_GROUPS,
+    "pattern_keys": PATTERN_KEYS,
+    # First match wins
+    "post_types": [
+        {"type": "fill_in_the_blank", "when": {"hit": ["fill_blank"]}},
+        {"type": "open_question", "when": {"hit": ["open_question"]}},
+        {"type": "contrarian_take", "when": {"hit": ["contrarian"]}},
+        {"type": "thread_hook", "when": {"test": [["has_thread_emoji", "==", True]]}},
+        {"type": "thread_hook", "when": {"hit": ["thread"]}},
+        {"type": "data_drop", "when": {"hit": ["data_stat", "data_verb"]}},
+        {"type": "framework", "when": {"hit": ["framework"]}},
+        {"type": "mistake_admission", "when": {"hit": ["mistake"]}},
+        {"type": "rapid_fire_list", "when": {"test": [["list_markers", ">", 0]]}},
+        {"type": "rapid_fire_list", "when": {"hit": ["list_count"]}},
+        # Link dump (anti-pattern)
+        {"type": "link_dump", "when": {"test": [["url_count", ">", 0], ["non_url_length", "<", 50]]}},
+    ],
+    "default_type": "generic",
+    "components": {
+        "reply_potential": {
+            "base": 40,
+            "rules": [
+                {
+                    "when": {"type": ["fill_in_the_blank"]},
+                    "points": 40,
+                    "strengths": ["Fill-in-the-blank format (highest P(reply) potential, est. 20-35%)"],
+                },
+                {
+                    "when": {"type": ["open_question"]},
+                    "points": 30,
+                    "strengths": ["Open question inviting specific responses (est. P(reply) 15-25%)"],
+                },
+                {
+                    "when": {"type": ["contrarian_take"]},
+                    "points": 20,
+                    "strengths": ["Contrarian framing invites debate from both sides"],
+                },
+                {
+                    "when": {"type": ["mistake_admission"]},
+                    "points": 15,
+                    "strengths": ["Vulnerability invites reciprocal sharing"],
+                },
+                {"when": {"test": [["question_count", "==", 1]]}, "points": 10},
+                {
+                    "when": {"test": [["question_count", ">", 2]]},
+                    "points": -5,
+                    "weaknesses": ["Multiple questions dilute focus"],
+                    "suggestions": ["Focus on one compelling question"],
+                },
+                {
+                    "when": {
+                        "test": [["question_count", "==", 0]],
+                        "not_type": ["fill_in_the_blank", "data_drop", "framework"],
+                    },
+                    "weaknesses": ["No question or clear invitation to reply"],
+                    "suggestions": ["Add an open-ended question to boost P(reply)"],
+                },
+                {
+                    "when": {"hit": ["complete"]},
+                    "points": -15,
+                    "weaknesses": ["Post feels 'complete' — leaves no room for discussion"],
+                    "suggestions": ["Leave something open-ended or debatable"],
+                },
+                {
+                    "when": {"type": ["contrarian_take"], "hit": ["nuance"]},
+                    "points": 10,
+                    "strengths": ["Nuanced contrarian take reduces P(block) while maintaining debate"],
+                },
+                {
+                    "when": {"type": ["contrarian_take"], "miss": ["nuance"]},
+                    "points": -10,
+                    "weaknesses": ["Contrarian without nuance may generate blocks alongside replies"],
+                    "suggestions": ["Add nuance: 'But here's the thing...' or 'However...'"],
+                },
+            ],
+        },
+        "shareability": {
+            "base": 40,
+            "rules": [
+                {
+                    "when": {"type": ["data_drop"]},
+                    "points": 25,
+                    "strengths": ["Data-driven insight (high P(repost) — sharers look smart)"],
+                },
+                {
+                    "when": {"type": ["framework"]},
+                    "points": 20,
+                    "strengths": ["Framework format is highly bookmarkable and shareable"],
+                },
+                {
+                    "when": {"type": ["thread_hook"]},
+                    "points": 15,
+                    "strengths": ["Thread format signals depth and value"],
+                },
+                {
+                    "when": {"test": [["digit_runs", ">", 0]]},
+                    "points": 10,
+                    "strengths": ["Specific numbers add credibility and quotability"],
+                },
+                {
+                    "when": {"hit": ["value"]},
+                    "points": 15,
+                    "strengths": ["Clear value proposition makes sharing worthwhile"],
+                },
+                {
+                    "when": {"type": ["link_dump"]},
+                    "points": -35,
+                    "weaknesses": ["Link-only post has no standalone value to share"],
+                    "suggestions": ["Add context, insights, or a key takeaway around the link"],
+                },
+            ],
+        },
+        # Media rules may only test MEDIA_FEATURES; size and duration tests
+        # should follow a media_inspected test (tests stop at the first miss)
+        "media_optimization": {
+            "base": 25,
+            "rules": [
+                {
+                    "when": {"test": [["include_media", "==", False]]},
+                    "weaknesses": ["No media — forfeits P(video_view) and P(photo_expand) probability terms"],
+                    "suggestions": ["Add an image or video to access additional scoring terms"],
+                },
+                {
+                    "when": {"test": [["include_media", "==", True]]},
+                    "points": 45,
+                    "strengths": ["Includes media (accesses additional probability terms in weighted scorer)"],
+                },
+                {
+                    "when": {"test": [["include_media", "==", True], ["media_type", "==", "video"]]},
+                    "points": 15,
+                    "suggestions": [
+                        "Ensure hook in first 2-3 seconds (before scroll-away)",
+                        "Add captions — 80% watch muted",
+                    ],
+                },
+                {
+                    "when": {"test": [["include_media", "==", True], ["media_type", "==", "image"]]},
+                    "points": 5,
+                },
+                {
+                    "when": {"test": [
+                        ["include_media", "==", True], ["media_type", "==", "image"], ["media_inspected", "==", False],
+                    ]},
+                    "suggestions": ["Consider vertical aspect ratio (gets cropped → forces P(photo_expand))"],
+                },
+                # Checks on inspected files (analyze_post(..., media_files=[...]))
+                {
+                    "when": {"test": [["media_inspected", "==", True], ["aspect_ratio", ">", 0], ["aspect_ratio", "<=", 0.8]]},
+                    "points": 5,
+                    "strengths": ["Vertical media ({width}x{height}) fills the mobile feed"],
+                },
+                {
+                    "when": {"test": [
+                        ["media_inspected", "==", True], ["media_type", "==", "image"], ["aspect_ratio", ">", 0.8],
+                    ]},
+                    "suggestions": [
+                        "Image is {width}x{height} — crop to 4:5 or 9:16 so the feed crops it and invites P(photo_expand)",
+                    ],
+                },
+                {
+                    "when": {"test": [["media_inspected", "==", True], ["aspect_ratio", ">=", 1.5]]},
+                    "points": -5,
+                    "weaknesses": ["Wide media ({width}x{height}) renders small on mobile"],
+                },
+                {
+                    "when": {"test": [
+                        ["media_inspected", "==", True], ["media_type", "==", "video"],
+                        ["duration", ">", 0], ["duration", "<=", 45],
+                    ]},
+                    "points": 5,
+                    "strengths": ["Short video ({duration:.0f}s) — more viewers reach the end"],
+                },
+                {
+                    "when": {"test": [["media_inspected", "==", True], ["media_type", "==", "video"], ["duration", ">", 140]]},
+                    "points": -10,
+                    "weaknesses": ["Long video ({duration:.0f}s) — most viewers scroll away before the payoff"],
+                    "suggestions": ["Cut to the strongest 30-60 seconds and link the full version in a reply"],
+                },
+            ],
+        },
+        # Risk points (lower is better); negative_signal_safety = 100 - risk
+        "block_risk": {
+            "base": 10,
+            "rules": [
+                {
+                    "when": {"hit": ["rage_insult"]},
+                    "points": 30,
+                    "weaknesses": ["Contains potentially offensive language"],
+                    "suggestions": ["Remove inflammatory language — one block ≈ -1000 likes"],
+                },
+                {
+                    "when": {"hit": ["rage_dismissive"]},
+                    "points": 25,
+                    "weaknesses": ["Dismissive language may trigger blocks"],
+                    "suggestions": ["Remove inflammatory language — one block ≈ -1000 likes"],
+                },
+                {
+                    "when": {"hit": ["rage_accusatory"]},
+                    "points": 20,
+                    "weaknesses": ["Accusatory framing increases P(block)"],
+                    "suggestions": ["Remove inflammatory language — one block ≈ -1000 likes"],
+                },
+                {
+                    "when": {"test": [["caps_ratio", ">", 0.3]]},
+                    "points": 15,
+                    "weaknesses": ["Heavy caps usage feels aggressive"],
+                    "suggestions": ["Use emphasis sparingly"],
+                },
+                {"when": {"type": ["contrarian_take"], "miss": ["safety_nuance"]}, "points": 15},
+                {
+                    "when": {"type": ["mistake_admission"]},
+                    "points": -10,
+                    "strengths": ["Vulnerability is nearly impossible to block — very safe format"],
+                },
+            ],
+        },
+    },
+    # Post-level feedback (messages only, no points)
+    "feedback": [
+        {
+            "when": {"test": [["char_count", "<", 50]]},
+            "weaknesses": ["Very short ({char_count} chars) — may lack substance"],
+        },
+        {
+            "when": {"test": [["char_count", ">=", 71], ["char_count", "<=", 100]]},
+            "strengths": ["Optimal length ({char_count} chars) — highest engagement per character"],
+        },
+        {
+            "when": {"test": [["char_count", ">", 280]]},
+            "weaknesses": ["Long post ({char_count} chars) — requires 'Show more' click"],
+        },
+    ],
+}
+
+# Scored components, in analysis order
+RULE_COMPONENTS = ("reply_potential", "shareability", "media_optimization", "block_risk")
+
+# Values rules can test: PostFeatures attributes for text components and
+# feedback, media settings for media_optimization
+RULE_FEATURES = (
+    "char_count", "word_count", "question_count", "has_question", "caps_ratio", "digit_runs",
+    "url_count", "non_url_length", "list_markers", "has_thread_emoji",
+)
+MEDIA_FEATURES = ("include_media", "media_type", "media_inspected", "width", "height", "aspect_ratio", "duration")
+
+_RULE_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda value, options: value in options,
+}
+
+
+def _plain_phrase(pattern: str) -> Optional[str]:
+    """The literal text a pattern matches, or None if it uses regex syntax."""
+    if re.search(r"\\\w", pattern) or re.search(r"[\[\](){}.*+?^$|]", re.sub(r"\\.", "", pattern)):
+        return None
+    return re.sub(r"\\(.)", r"\1", pattern)
+
+
+_WHITESPACE = "".join(c for c in map(chr, range(0x3001)) if c.isspace())
+# Character-class categories that include whitespace
+_SPACE_CATEGORIES = {"CATEGORY_SPACE", "CATEGORY_NOT_WORD", "CATEGORY_NOT_DIGIT", "CATEGORY_NOT_LINEBREAK"}
+
+
+def _class_has_space(items) -> bool:
+    """Whether a parsed character class ([...]) can match whitespace."""
+    for op, arg in items:
+        name = op.name
+        if name == "NEGATE":
+            return True
+        if name == "LITERAL" and chr(arg).isspace():
+            return True
+        if name == "RANGE" and any(arg[0] <= ord(c) <= arg[1] for c in _WHITESPACE):
+            return True
+        if name == "CATEGORY" and arg.name in _SPACE_CATEGORIES:
+            return True
+    return False
+
+
+def _max_spaces(parsed) -> Optional[int]:
+    """
+    Most whitespace characters one match of a parsed pattern can contain
+    (lookarounds included), or None if unbounded (\\s+, .*, [^x]{2,}, ...).
+    """
+    total = 0
+    for op, arg in parsed:
+        name = op.name
+        if name == "LITERAL":
+            n = 1 if chr(arg).isspace() else 0
+        elif name in ("ANY", "NOT_LITERAL"):
+            n = 1
+        elif name == "IN":
+            n = 1 if _class_has_space(arg) else 0
+        elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"):
+            low, high, sub = arg
+            n = _max_spaces(sub)
+            if n and high == _sre_parse.MAXREPEAT:
+                return None
+            n = None if n is None else n * high
+        elif name in ("SUBPATTERN", "ATOMIC_GROUP"):
+            n = _max_spaces(arg[-1] if name == "SUBPATTERN" else arg)
+        elif name in ("ASSERT", "ASSERT_NOT"):
+            n = _max_spaces(arg[1])
+        elif name == "BRANCH":
+            counts = [_max_spaces(branch) for branch in arg[1]]
+            n = None if None in counts else max(counts, default=0)
+        elif name in ("AT", "CATEGORY"):
+            n = 1 if name == "CATEGORY" and arg.name in _SPACE_CATEGORIES else 0
+        else:  # backreferences, conditionals: give up
+            return None
+        if n is None:
+            return None
+        total += n
+    return total
+
+
+def _reads_outside(parsed) -> bool:
+    """Whether a parsed pattern looks past its own match (lookarounds, backreferences)."""
+    stack = [parsed]
+    while stack:
+        for op, arg in stack.pop():
+            if op.name in ("ASSERT", "ASSERT_NOT", "GROUPREF", "GROUPREF_EXISTS"):
+                return True
+            for item in arg if isinstance(arg, (tuple, list)) else (arg,):
+                if isinstance(item, _sre_parse.SubPattern):
+                    stack.append(item)
+                elif isinstance(item, list):
+                    stack.extend(sub for sub in item if isinstance(sub, _sre_parse.SubPattern))
+    return False
+
+
+def _compile_patterns(groups: dict, keys: dict) -> tuple[dict, list, frozenset]:
+    """
+    Compile pattern groups into (regexes, literal index, plain-phrase groups).
 
-    if post_type in type_bonuses:
-        bonus, strength = type_bonuses[post_type]
-        score += bonus
-        strengths.append(strength)
-
-    # Question detection
-    has_question = "?" in text
-    if has_question:
-        q_count = text.count("?")
-        if q_count == 1:
-            score += 10
-        elif q_count > 2:
-            score -= 5
-            weaknesses.append("Multiple questions dilute focus")
-            suggestions.append("Focus on one compelling question")
-    else:
-        if post_type not in [PostType.FILL_BLANK, PostType.DATA_DROP, PostType.FRAMEWORK]:
-            weaknesses.append("No question or clear invitation to reply")
-            suggestions.append("Add an open-ended question to boost P(reply)")
-
-    # "Complete" post detection (bad)
-    complete_patterns = [r"in conclusion", r"to summarize", r"that's all", r"the end\."]
-    if any(re.search(p, text_lower) for p in complete_patterns):
-        score -= 15
-        weaknesses.append("Post feels 'complete' — leaves no room for discussion")
-        suggestions.append("Leave something open-ended or debatable")
-
-    # Nuance detection (good for contrarian)
-    nuance_patterns = [r"but here's", r"however", r"that said", r"it depends", r"the nuance"]
-    has_nuance = any(re.search(p, text_lower) for p in nuance_patterns)
-    if post_type == PostType.CONTRARIAN:
-        if has_nuance:
-            score += 10
-            strengths.append("Nuanced contrarian take reduces P(block) while maintaining debate")
+    The literal index maps each distinct key to every group it can trigger,
+    so one pass over the index finds all candidate groups for a post.
+    """
+    compiled = {name: re.compile("|".join(f"(?:{p})" for p in patterns)) for name, patterns in groups.items()}
+    index = {}
+    plain = set()
+    always = []
+    for name, patterns in groups.items():
+        phrases = [_plain_phrase(p) for p in patterns]
+        if all(phrase is not None for phrase in phrases):
+            plain.add(name)
+            group_keys = phrases
+        elif name in keys:
+            group_keys = keys[name]
+        else:
+            always.append(name)  # no keys declared: always run the regex
+            continue
+        for key in group_keys:
+            index.setdefault(key, []).append(name)
+    literal_index = [(key, tuple(names)) for key, names in index.items()]
+    if always:
+        literal_index.append(("", tuple(always)))  # "" is in every string
+    return compiled, literal_index, frozenset(plain)
+
+
+class _MediaSettings:
+    """What media_optimization rules test; size and duration are 0 unless a file was inspected."""
+
+    __slots__ = ("include_media", "media_type", "media_inspected", "width", "height", "aspect_ratio", "duration")
+
+    def __init__(self, include_media: bool, media_type: Optional[str], media: Optional["MediaInfo"] = None):
+        self.include_media = bool(include_media)
+        self.media_type = media_type
+        self.media_inspected = media is not None
+        if media is None:
+            self.width = self.height = 0
+            self.aspect_ratio = self.duration = 0.0
         else:
-            score -= 10
-            weaknesses.append("Contrarian without nuance may generate blocks alongside replies")
-            suggestions.append("Add nuance: 'But here's the thing...' or 'However...'")
+            self.width, self.height = media.width, media.height
+            self.aspect_ratio = round(media.aspect_ratio, 4)
+            self.duration = media.duration
 
-    return max(0, min(100, score)), strengths, weaknesses, suggestions
 
+# Serial number of each compiled Ruleset, so result cache keys can tell them apart
+_RULESET_SERIALS = count(1)
 
-def analyze_shareability(text: str, post_type: PostType) -> tuple[int, list, list, list]:
-    """Analyze P(repost) and P(quote) optimization."""
-    score = 40
+
+class Ruleset:
+    """
+    A rules file compiled into lookup tables.
+
+    Compiling resolves every "type" / "not_type" condition up front, so each
+    component has one rule table per post type holding only the rules that
+    can fire for it. Unconditional points are folded into a per-type
+    constant for the score-only path. Instances are never mutated after
+    construction: install_rules() swaps the active ruleset in one assignment,
+    and each analysis reads the global once, so it never mixes two rulesets.
+
+    Raises:
+        ValueError: Unknown schema, section, post type, pattern group,
+            feature or operator, or a pattern that doesn't compile
+    """
+
+    def __init__(self, rules: dict):
+        rules = copy.deepcopy(rules)
+        unknown = set(rules) - {
+            "schema", "version", "patterns", "pattern_keys", "post_types", "default_type", "components", "feedback",
+        }
+        if unknown:
+            raise ValueError(f"unknown rules sections: {', '.join(sorted(unknown))}")
+        if rules.get("schema") != RULES_SCHEMA_VERSION:
+            raise ValueError(f"unsupported rules schema {rules.get('schema')!r} (expected {RULES_SCHEMA_VERSION})")
+        self.source = rules
+        self.version = rules.get("version")
+        self.serial = next(_RULESET_SERIALS)
+
+        patterns = rules.get("patterns", {})
+        keys = rules.get("pattern_keys", {})
+        bad = set(keys) - set(patterns)
+        if bad:
+            raise ValueError(f"pattern_keys for unknown groups: {', '.join(sorted(bad))}")
+        try:
+            self.groups, self.literal_index, self.plain_groups = _compile_patterns(patterns, keys)
+        except re.error as exc:
+            raise ValueError(f"bad pattern: {exc}") from None
+        # Upper bound on whitespace inside one match (None if some pattern can
+        # span any amount, e.g. \s+ or .*), and groups tied to the end of the
+        # text (see incremental.py)
+        bounds = [_max_spaces(_sre_parse.parse(p)) for group in patterns.values() for p in group]
+        self.max_match_spaces = None if None in bounds else max(bounds, default=0)
+        # Per group, the longest match in chars and the most whitespace in one
+        # match; None if unbounded or if a pattern reads past its match
+        # (see variants.py)
+        self.match_widths, self.match_spaces = {}, {}
+        for name, group in patterns.items():
+            parsed = [_sre_parse.parse(p) for p in group]
+            local = not any(map(_reads_outside, parsed))
+            width = max((p.getwidth()[1] for p in parsed), default=0)
+            spaces = [_max_spaces(p) for p in parsed]
+            self.match_widths[name] = width if local and width < _sre_parse.MAXREPEAT else None
+            self.match_spaces[name] = max(spaces, default=0) if local and None not in spaces else None
+        self.end_anchored = frozenset(
+            name for name, group in patterns.items() if any("$" in p for p in group)
+        )
+
+        self.type_rules = tuple(
+            (self._post_type(entry.get("type")), *self._conditions(entry.get("when", {}), RULE_FEATURES, typed=False))
+            for entry in rules.get("post_types", [])
+        )
+        self.default_type = self._post_type(rules.get("default_type", PostType.GENERIC.value))
+
+        components = rules.get("components", {})
+        if set(components) != set(RULE_COMPONENTS):
+            raise ValueError(f"components must be exactly: {', '.join(RULE_COMPONENTS)}")
+        # tables[component][post_type] = (base, rules); points[post_type] = one
+        # (constant, conditional rules) pair per component
+        self.tables = {}
+        point_tables = {post_type: [] for post_type in PostType}
+        for name in RULE_COMPONENTS:
+            spec = components[name]
+            features = MEDIA_FEATURES if name == "media_optimization" else RULE_FEATURES
+            compiled = [self._rule(rule, features, typed=name != "media_optimization") for rule in spec.get("rules", [])]
+            base = spec.get("base", 0)
+            self.tables[name] = {}
+            for post_type in PostType:
+                table = tuple(rule[1:] for rule in compiled if post_type in rule[0])
+                self.tables[name][post_type] = (base, table)
+                constant = base + sum(r[3] for r in table if not (r[0] or r[1] or r[2]))
+                conditional = tuple(r[:4] for r in table if r[3] and (r[0] or r[1] or r[2]))
+                point_tables[post_type].append((constant, conditional))
+        self.points = {post_type: tuple(tables) for post_type, tables in point_tables.items()}
+
+        self.feedback = tuple(rule[1:] for rule in (
+            self._rule(rule, RULE_FEATURES, typed=False, scored=False) for rule in rules.get("feedback", [])
+        ))
+
+    @staticmethod
+    def _post_type(value) -> PostType:
+        try:
+            return PostType(value)
+        except ValueError:
+            raise ValueError(f"unknown post type {value!r}") from None
+
+    def _conditions(self, when: dict, features: tuple, typed: bool) -> tuple:
+        """Compile a "when" block to (post types, needed groups, excluded groups, tests)."""
+        allowed = {"type", "not_type", "hit", "miss", "test"} if typed else {"hit", "miss", "test"}
+        if features is MEDIA_FEATURES:
+            allowed = {"test"}
+        unknown = set(when) - allowed
+        if unknown:
+            raise ValueError(f"unsupported conditions here: {', '.join(sorted(unknown))}")
+
+        post_types = set(PostType)
+        if "type" in when:
+            post_types = {self._post_type(t) for t in when["type"]}
+        post_types -= {self._post_type(t) for t in when.get("not_type", [])}
+
+        need, avoid = frozenset(when.get("hit", [])), frozenset(when.get("miss", []))
+        bad = (need | avoid) - set(self.groups)
+        if bad:
+            raise ValueError(f"unknown pattern groups: {', '.join(sorted(bad))}")
+
+        tests = []
+        for test in when.get("test", []):
+            if len(test) != 3:
+                raise ValueError(f"test must be [feature, op, value], not {test!r}")
+            feature, op, value = test
+            if feature not in features:
+                raise ValueError(f"can't test {feature!r} here; use one of {', '.join(features)}")
+            if op not in _RULE_OPS:
+                raise ValueError(f"unknown operator {op!r}")
+            tests.append((operator.attrgetter(feature), _RULE_OPS[op], value))
+        if not typed:
+            return need, avoid, tuple(tests)
+        return frozenset(post_types), need, avoid, tuple(tests)
+
+    def _rule(self, rule: dict, features: tuple, typed: bool = True, scored: bool = True) -> tuple:
+        """Compile one rule to (post types, need, avoid, tests, points, strengths, weaknesses, suggestions, fields)."""
+        allowed = {"when", "points", "strengths", "weaknesses", "suggestions"} - (set() if scored else {"points"})
+        unknown = set(rule) - allowed
+        if unknown:
+            raise ValueError(f"unknown rule fields: {', '.join(sorted(unknown))}")
+        when = rule.get("when", {})
+        if typed:
+            post_types, need, avoid, tests = self._conditions(when, features, typed=True)
+        else:
+            post_types = frozenset(PostType)
+            need, avoid, tests = self._conditions(when, features, typed=False)
+
+        messages = tuple(tuple(rule.get(kind, [])) for kind in ("strengths", "weaknesses", "suggestions"))
+        fields = tuple(sorted({
+            field_name
+            for group in messages
+            for message in group
+            for _, field_name, _, _ in string.Formatter().parse(message)
+            if field_name
+        }))
+        bad = set(fields) - set(features)
+        if bad:
+            raise ValueError(f"unknown message placeholders: {', '.join(sorted(bad))}")
+        return (post_types, need, avoid, tests, rule.get("points", 0), *messages, fields)
+
+    def detect_type(self, f: "PostFeatures") -> PostType:
+        """First post_types entry whose conditions hold, else the default type."""
+        hits = f.hits
+        for post_type, need, avoid, tests in self.type_rules:
+            if need and not need <= hits:
+                continue
+            if avoid and not avoid.isdisjoint(hits):
+                continue
+            for get, op, value in tests:
+                if not op(get(f), value):
+                    break
+            else:
+                return post_type
+        return self.default_type
+
+
+def _apply_rules(entry: tuple, hits: frozenset, subject) -> tuple[int, list, list, list]:
+    """Run a (base, rules) table: (points, strengths, weaknesses, suggestions) of every matching rule."""
+    score, table = entry
     strengths, weaknesses, suggestions = [], [], []
-    text_lower = text.lower()
+    for need, avoid, tests, points, strs, weaks, sugs, fields in table:
+        if need and not need <= hits:
+            continue
+        if avoid and not avoid.isdisjoint(hits):
+            continue
+        for get, op, value in tests:
+            if not op(get(subject), value):
+                break
+        else:
+            score += points
+            if fields:
+                values = {name: getattr(subject, name) for name in fields}
+                strs, weaks, sugs = (tuple(m.format_map(values) for m in group) for group in (strs, weaks, sugs))
+            strengths.extend(strs)
+            weaknesses.extend(weaks)
+            suggestions.extend(sugs)
+    return score, strengths, weaknesses, suggestions
+
+
+def _sum_points(entry: tuple, hits: frozenset, subject) -> int:
+    """Score-only _apply_rules over a (constant, conditional rules) pair."""
+    score, table = entry
+    for need, avoid, tests, points in table:
+        if need and not need <= hits:
+            continue
+        if avoid and not avoid.isdisjoint(hits):
+            continue
+        for get, op, value in tests:
+            if not op(get(subject), value):
+                break
+        else:
+            score += points
+    return score
 
-    # High shareability patterns
-    if post_type == PostType.DATA_DROP:
-        score += 25
-        strengths.append("Data-driven insight (high P(repost) — sharers look smart)")
-    elif post_type == PostType.FRAMEWORK:
-        score += 20
-        strengths.append("Framework format is highly bookmarkable and shareable")
-    elif post_type == PostType.THREAD_HOOK:
-        score += 15
-        strengths.append("Thread format signals depth and value")
-
-    # Specific numbers
-    if re.search(r"\d{2,}", text):
-        score += 10
-        strengths.append("Specific numbers add credibility and quotability")
-
-    # Value indicators
-    value_patterns = [
-        r"here's (the|my|a) (playbook|framework|system|secret)",
-        r"i (analyzed|studied|spent \d+)",
-        r"\d+ (tips|lessons|things|ways|steps)",
-    ]
-    if any(re.search(p, text_lower) for p in value_patterns):
-        score += 15
-        strengths.append("Clear value proposition makes sharing worthwhile")
 
-    # Link dump penalty
-    if post_type == PostType.LINK_DUMP:
-        score -= 35
-        weaknesses.append("Link-only post has no standalone value to share")
-        suggestions.append("Add context, insights, or a key takeaway around the link")
+_BUILTIN_RULES = _RULES = Ruleset(DEFAULT_RULES)
 
-    return max(0, min(100, score)), strengths, weaknesses, suggestions
 
+def get_rules() -> Ruleset:
+    """The active compiled ruleset."""
+    return _RULES
 
-def analyze_media(include_media: bool, media_type: Optional[str]) -> tuple[int, list, list, list]:
-    """Analyze media optimization."""
-    strengths, weaknesses, suggestions = [], [], []
 
-    if not include_media:
-        weaknesses.append("No media — forfeits P(video_view) and P(photo_expand) probability terms")
-        suggestions.append("Add an image or video to access additional scoring terms")
-        return 25, strengths, weaknesses, suggestions
+def current_rules() -> dict:
+    """The active ruleset in rules file format (a copy; edit it and pass it to install_rules)."""
+    return copy.deepcopy(_RULES.source)
 
-    strengths.append("Includes media (accesses additional probability terms in weighted scorer)")
 
-    if media_type == "video":
-        suggestions.append("Ensure hook in first 2-3 seconds (before scroll-away)")
-        suggestions.append("Add captions — 80% watch muted")
-        return 85, strengths, weaknesses, suggestions
-    elif media_type == "image":
-        suggestions.append("Consider vertical aspect ratio (gets cropped → forces P(photo_expand))")
-        return 75, strengths, weaknesses, suggestions
-    else:
-        return 70, strengths, weaknesses, suggestions
+def install_rules(rules: Union[dict, Ruleset]) -> Ruleset:
+    """
+    Atomically make a ruleset active, compiling it first if given as a dict.
 
+    Compilation happens before the swap, so an invalid file raises
+    ValueError and leaves the active rules untouched. Analyses already
+    running finish on the ruleset they started with. The result cache is
+    cleared afterwards.
+    """
+    global _RULES
+    ruleset = rules if isinstance(rules, Ruleset) else Ruleset(rules)
+    _RULES = ruleset
+    if _result_cache is not None:
+        _result_cache.clear()
+    return ruleset
+
+
+def load_rules(path: str) -> Ruleset:
+    """Read a JSON rules file, compile it and install it (see install_rules)."""
+    with open(path, encoding="utf-8") as f:
+        rules = json.load(f)
+    return install_rules(rules)
+
+
+def match_pattern_groups(
+    text_lower: str,
+    literal_index: Optional[list] = None,
+    rules: Optional[Ruleset] = None,
+) -> frozenset:
+    """
+    Names of every pattern group that matches the lowercased text.
 
-def analyze_negative_signals(text: str, post_type: PostType) -> tuple[int, float, list, list, list]:
-    """Analyze P(block) risk. Returns (safety_score, est_p_block, strengths, weaknesses, suggestions)."""
-    risk_score = 10  # Lower is better
-    strengths, weaknesses, suggestions = [], [], []
+    One pass over the literal index (C-level substring search) yields the
+    candidate groups; plain-phrase groups are hits outright and regex groups
+    are confirmed with their precompiled pattern. A narrower literal_index
+    (see live_literal_index) skips keys known to be absent.
+    """
+    rules = rules or _RULES
+    candidates = set()
+    for key, names in rules.literal_index if literal_index is None else literal_index:
+        if key in text_lower:
+            candidates.update(names)
+    plain, groups = rules.plain_groups, rules.groups
+    return frozenset(
+        name for name in candidates
+        if name in plain or groups[name].search(text_lower)
+    )
+
+
+# === FEATURE EXTRACTION: one pass over the text, shared by every analyzer ===
+
+_URL_RE = re.compile(r"https?://\S+")
+_DIGIT_RUN_RE = re.compile(r"\d{2,}")
+_LIST_MARKER_RE = re.compile(r"^\d+[\.\)]\s", re.MULTILINE)
+
+# What's left of a thread opener once thread markers and punctuation are removed
+_THREAD_TEASE_RE = re.compile(r"thread|🧵|[\W_]+")
+
+
+@dataclass
+class PostFeatures:
+    """Everything the analyzers read from a post, computed once."""
+    text: str
+    text_lower: str
+    char_count: int
+    word_count: int
+    question_count: int
+    caps_ratio: float
+    digit_runs: int
+    urls: list
+    non_url_length: int
+    list_markers: int
+    has_thread_emoji: bool
+    hits: frozenset
+
+    @property
+    def has_question(self) -> bool:
+        return self.question_count > 0
+
+    @property
+    def url_count(self) -> int:
+        return len(self.urls)
+
+
+def live_literal_index(texts_lower: Iterable[str], rules: Optional[Ruleset] = None) -> list:
+    """
+    The literal index entries whose key occurs in at least one of the texts.
+
+    Every key found in one text is found in their concatenation, so one scan
+    of the joined text gives an index that is exact for each text on its own.
+    """
+    joined = "\n".join(texts_lower)
+    return [(key, names) for key, names in (rules or _RULES).literal_index if key in joined]
+
+
+def extract_features(
+    text: str,
+    literal_index: Optional[list] = None,
+    rules: Optional[Ruleset] = None,
+) -> PostFeatures:
+    """Scan a post once and collect the features every analyzer needs."""
     text_lower = text.lower()
+    char_count = len(text)
+
+    urls = _URL_RE.findall(text)
+    non_url_length = len(_URL_RE.sub("", text).strip()) if urls else len(text.strip())
+
+    return PostFeatures(
+        text=text,
+        text_lower=text_lower,
+        char_count=char_count,
+        word_count=len(text.split()),
+        question_count=text.count("?"),
+        caps_ratio=sum(map(str.isupper, text)) / max(char_count, 1),
+        digit_runs=len(_DIGIT_RUN_RE.findall(text)),
+        urls=urls,
+        non_url_length=non_url_length,
+        list_markers=len(_LIST_MARKER_RE.findall(text)),
+        has_thread_emoji="🧵" in text,
+        hits=match_pattern_groups(text_lower, literal_index, rules),
+    )
 
-    # Rage-bait indicators
-    rage_patterns = [
-        (r"\b(idiot|stupid|dumb|moron)s?\b", 30, "Contains potentially offensive language"),
-        (r"\b(wake up|sheep|sheeple)\b", 25, "Dismissive language may trigger blocks"),
-        (r"\byou('re| are) (all )?wrong\b", 20, "Accusatory framing increases P(block)"),
-    ]
 
-    for pattern, penalty, message in rage_patterns:
-        if re.search(pattern, text_lower):
-            risk_score += penalty
-            weaknesses.append(message)
-            suggestions.append("Remove inflammatory language — one block ≈ -1000 likes")
-
-    # All-caps aggression
-    caps_ratio = sum(1 for c in text if c.isupper()) / max(len(text), 1)
-    if caps_ratio > 0.3:
-        risk_score += 15
-        weaknesses.append("Heavy caps usage feels aggressive")
-        suggestions.append("Use emphasis sparingly")
-
-    # Contrarian without nuance
-    if post_type == PostType.CONTRARIAN:
-        nuance_patterns = [r"but here's", r"however", r"that said", r"nuance"]
-        if not any(re.search(p, text_lower) for p in nuance_patterns):
-            risk_score += 15
-
-    # Positive signals
-    if post_type == PostType.MISTAKE_ADMISSION:
-        risk_score -= 10
-        strengths.append("Vulnerability is nearly impossible to block — very safe format")
+def _as_features(post, rules: Optional[Ruleset] = None) -> PostFeatures:
+    """Accept either raw text or precomputed features."""
+    return post if isinstance(post, PostFeatures) else extract_features(post, rules=rules)
+
+
+def detect_post_type(post, rules: Optional[Ruleset] = None) -> tuple[PostType, list]:
+    """Detect the post type and patterns used. Accepts text or PostFeatures."""
+    rules = rules or _RULES
+    post_type = rules.detect_type(_as_features(post, rules))
+    detected = [] if post_type == PostType.GENERIC else [post_type.value]
+    return post_type, detected
+
+
+def analyze_reply_potential(post, post_type: PostType, rules: Optional[Ruleset] = None) -> tuple[int, list, list, list]:
+    """Analyze P(reply) optimization. Returns (score, strengths, weaknesses, suggestions)."""
+    rules = rules or _RULES
+    f = _as_features(post, rules)
+    score, strengths, weaknesses, suggestions = _apply_rules(rules.tables["reply_potential"][post_type], f.hits, f)
+    return max(0, min(100, score)), strengths, weaknesses, suggestions
+
+
+def analyze_shareability(post, post_type: PostType, rules: Optional[Ruleset] = None) -> tuple[int, list, list, list]:
+    """Analyze P(repost) and P(quote) optimization."""
+    rules = rules or _RULES
+    f = _as_features(post, rules)
+    score, strengths, weaknesses, suggestions = _apply_rules(rules.tables["shareability"][post_type], f.hits, f)
+    return max(0, min(100, score)), strengths, weaknesses, suggestions
+
+
+def analyze_media(
+    include_media: bool,
+    media_type: Optional[str],
+    rules: Optional[Ruleset] = None,
+    media: Optional[MediaInfo] = None,
+) -> tuple[int, list, list, list]:
+    """Analyze media optimization; media (see inspect_media) adds aspect-ratio and duration checks."""
+    rules = rules or _RULES
+    score, strengths, weaknesses, suggestions = _apply_rules(
+        rules.tables["media_optimization"][PostType.GENERIC], frozenset(),
+        _MediaSettings(include_media, media_type, media),
+    )
+    return max(0, min(100, score)), strengths, weaknesses, suggestions
+
+
+def analyze_negative_signals(
+    post,
+    post_type: PostType,
+    rules: Optional[Ruleset] = None,
+) -> tuple[int, float, list, list, list]:
+    """Analyze P(block) risk. Returns (safety_score, est_p_block, strengths, weaknesses, suggestions)."""
+    rules = rules or _RULES
+    f = _as_features(post, rules)
+    # Risk points: lower is better
+    risk_score, strengths, weaknesses, suggestions = _apply_rules(rules.tables["block_risk"][post_type], f.hits, f)
 
     # Calculate estimated P(block)
     est_p_block = max(0.001, min(0.05, risk_score / 2000))
@@ -401,70 +1191,526 @@ def estimate_probabilities(
 ) -> ProbabilityEstimates:
     """Estimate engagement probabilities based on analysis."""
 
+    d = PROBABILITY_DIVISORS
+
     # Base estimates from scores (rough heuristics)
-    p_reply = min(0.35, reply_score / 300)
-    p_repost = min(0.15, share_score / 700)
-    p_quote = min(0.08, share_score / 1000)
-    p_like = min(0.20, (reply_score + share_score) / 500)
-    p_bookmark = min(0.10, share_score / 800)
-    p_profile_click = min(0.08, share_score / 1000)
-    p_click = min(0.15, 0.05)  # Low and stable
+    probs = {
+        "p_reply": min(0.35, reply_score / d["p_reply"]),
+        "p_repost": min(0.15, share_score / d["p_repost"]),
+        "p_quote": min(0.08, share_score / d["p_quote"]),
+        "p_like": min(0.20, (reply_score + share_score) / d["p_like"]),
+        "p_bookmark": min(0.10, share_score / d["p_bookmark"]),
+        "p_profile_click": min(0.08, share_score / d["p_profile_click"]),
+        "p_click": min(0.15, 0.05),  # Low and stable
+    }
 
     # Media probabilities
-    p_video_view = 0.0
-    p_photo_expand = 0.0
+    probs["p_video_view"] = 0.0
+    probs["p_photo_expand"] = 0.0
     if include_media:
         if media_type == "video":
-            p_video_view = min(0.25, media_score / 400)
+            probs["p_video_view"] = min(0.25, media_score / d["p_video_view"])
         else:
-            p_photo_expand = min(0.20, media_score / 450)
+            probs["p_photo_expand"] = min(0.20, media_score / d["p_photo_expand"])
 
-    # Negative signal estimates
-    p_block = max(0.001, (100 - safety_score) / 5000)
-    p_mute = p_block * 0.5
-    p_report = p_block * 0.1
+    # Negative signal estimates (mute/report follow the unadjusted block rate)
+    p_block = max(0.001, (100 - safety_score) / d["p_block"])
+    probs["p_block"] = p_block
+    probs["p_mute"] = p_block * BLOCK_RATIOS["p_mute"]
+    probs["p_report"] = p_block * BLOCK_RATIOS["p_report"]
 
     # Post type adjustments
-    type_adjustments = {
-        PostType.FILL_BLANK: {"p_reply": 1.5},
-        PostType.OPEN_QUESTION: {"p_reply": 1.3},
-        PostType.DATA_DROP: {"p_repost": 1.4, "p_bookmark": 1.5},
-        PostType.THREAD_HOOK: {"p_bookmark": 1.5, "p_profile_click": 1.4},
-        PostType.CONTRARIAN: {"p_reply": 1.2, "p_quote": 1.3, "p_block": 1.5},
-        PostType.LINK_DUMP: {"p_reply": 0.3, "p_repost": 0.3, "p_like": 0.4},
+    for key, mult in TYPE_ADJUSTMENTS.get(post_type, {}).items():
+        probs[key] = min(ADJUSTED_CAPS[key], probs[key] * mult)
+
+    return ProbabilityEstimates(**probs)
+
+
+# === SCORE-ONLY FAST PATH: numbers only, no feedback lists or messages ===
+# Component points come from the same Ruleset as the analyzers (Ruleset.points);
+# the probability model below mirrors estimate_probabilities, keep the two in sync.
+
+_ADJUSTABLE = ("p_reply", "p_repost", "p_quote", "p_like", "p_bookmark", "p_profile_click", "p_block")
+
+
+def _build_fast_tables() -> tuple[dict, tuple]:
+    """
+    Flatten the probability model for weighted_score_from_components.
+
+    Returns:
+        (per-type (multiplier, cap) pairs for each _ADJUSTABLE key, where
+        (1.0, inf) is a no-op; divisors in _FAST_DIVISOR_KEYS order plus the
+        mute and report ratios)
+    """
+    type_adj = {
+        post_type: tuple(
+            value
+            for key in _ADJUSTABLE
+            for value in (
+                (TYPE_ADJUSTMENTS[post_type][key], ADJUSTED_CAPS[key])
+                if key in TYPE_ADJUSTMENTS.get(post_type, {})
+                else (1.0, float("inf"))
+            )
+        )
+        for post_type in PostType
     }
+    divisors = tuple(PROBABILITY_DIVISORS[key] for key in _FAST_DIVISOR_KEYS)
+    return type_adj, divisors + (BLOCK_RATIOS["p_mute"], BLOCK_RATIOS["p_report"])
+
+
+_FAST_DIVISOR_KEYS = (
+    "p_reply", "p_repost", "p_quote", "p_like", "p_bookmark", "p_profile_click",
+    "p_video_view", "p_photo_expand", "p_block",
+)
+_TYPE_ADJ, _FAST_MODEL = _build_fast_tables()
 
-    if post_type in type_adjustments:
-        for key, mult in type_adjustments[post_type].items():
-            if key == "p_reply":
-                p_reply = min(0.35, p_reply * mult)
-            elif key == "p_repost":
-                p_repost = min(0.15, p_repost * mult)
-            elif key == "p_quote":
-                p_quote = min(0.08, p_quote * mult)
-            elif key == "p_bookmark":
-                p_bookmark = min(0.12, p_bookmark * mult)
-            elif key == "p_profile_click":
-                p_profile_click = min(0.10, p_profile_click * mult)
-            elif key == "p_like":
-                p_like = min(0.25, p_like * mult)
-            elif key == "p_block":
-                p_block = min(0.05, p_block * mult)
-
-    return ProbabilityEstimates(
-        p_reply=p_reply,
-        p_repost=p_repost,
-        p_quote=p_quote,
-        p_like=p_like,
-        p_video_view=p_video_view,
-        p_photo_expand=p_photo_expand,
-        p_bookmark=p_bookmark,
-        p_click=p_click,
-        p_profile_click=p_profile_click,
-        p_block=p_block,
-        p_mute=p_mute,
-        p_report=p_report,
+
+@dataclass
+class ScoreResult:
+    """Numeric-only analysis result returned by score_post."""
+    __slots__ = (
+        "weighted_score", "overall_score", "post_type", "reply_potential",
+        "shareability", "media_optimization", "negative_signal_safety",
     )
+    weighted_score: float
+    overall_score: int
+    post_type: PostType
+    reply_potential: int
+    shareability: int
+    media_optimization: int
+    negative_signal_safety: int
+
+
+def score_components(
+    f: PostFeatures,
+    include_media: bool,
+    media_type: Optional[str],
+    rules: Optional[Ruleset] = None,
+    media_info: Optional[MediaInfo] = None,
+) -> tuple:
+    """Return (post_type, reply, share, media, safety) component scores without feedback."""
+    rules = rules or _RULES
+    post_type = rules.detect_type(f)
+    hits = f.hits
+    reply, share, media, risk = rules.points[post_type]
+    media = _sum_points(media, frozenset(), _MediaSettings(include_media, media_type, media_info))
+    return (
+        post_type,
+        max(0, min(100, _sum_points(reply, hits, f))),
+        max(0, min(100, _sum_points(share, hits, f))),
+        max(0, min(100, media)),
+        max(0, min(100, 100 - _sum_points(risk, hits, f))),
+    )
+
+
+def weighted_score_from_components(
+    post_type: PostType,
+    reply_score: int,
+    share_score: int,
+    media_score: int,
+    safety_score: int,
+    include_media: bool,
+    media_type: Optional[str],
+) -> float:
+    """estimate_probabilities + calculate_weighted_score without building dicts or dataclasses."""
+    (d_reply, d_repost, d_quote, d_like, d_bookmark, d_profile, d_video, d_photo, d_block,
+     r_mute, r_report) = _FAST_MODEL
+    p_reply = min(0.35, reply_score / d_reply)
+    p_repost = min(0.15, share_score / d_repost)
+    p_quote = min(0.08, share_score / d_quote)
+    p_like = min(0.20, (reply_score + share_score) / d_like)
+    p_bookmark = min(0.10, share_score / d_bookmark)
+    p_profile_click = min(0.08, share_score / d_profile)
+    p_click = min(0.15, 0.05)
+
+    p_video_view = 0.0
+    p_photo_expand = 0.0
+    if include_media:
+        if media_type == "video":
+            p_video_view = min(0.25, media_score / d_video)
+        else:
+            p_photo_expand = min(0.20, media_score / d_photo)
+
+    p_block = max(0.001, (100 - safety_score) / d_block)
+    p_mute = p_block * r_mute
+    p_report = p_block * r_report
+
+    (m_reply, c_reply, m_repost, c_repost, m_quote, c_quote, m_like, c_like,
+     m_bookmark, c_bookmark, m_profile, c_profile, m_block, c_block) = _TYPE_ADJ[post_type]
+    p_reply = min(c_reply, p_reply * m_reply)
+    p_repost = min(c_repost, p_repost * m_repost)
+    p_quote = min(c_quote, p_quote * m_quote)
+    p_like = min(c_like, p_like * m_like)
+    p_bookmark = min(c_bookmark, p_bookmark * m_bookmark)
+    p_profile_click = min(c_profile, p_profile_click * m_profile)
+    p_block = min(c_block, p_block * m_block)
+
+    # Same terms, same order as calculate_weighted_score
+    w = ActionWeights
+    return (
+        w.REPLY * p_reply
+        + w.REPOST * p_repost
+        + w.QUOTE * p_quote
+        + w.LIKE * p_like
+        + w.VIDEO_VIEW * p_video_view
+        + w.PHOTO_EXPAND * p_photo_expand
+        + w.BOOKMARK * p_bookmark
+        + w.CLICK * p_click
+        + w.PROFILE_CLICK * p_profile_click
+        + w.BLOCK * p_block
+        + w.MUTE * p_mute
+        + w.REPORT * p_report
+    )
+
+
+def score_post(
+    text: str,
+    include_media: bool = False,
+    media_type: Optional[str] = None,
+    media_files=None,
+) -> ScoreResult:
+    """
+    Score a post without generating feedback.
+
+    Returns the same weighted score and component scores as analyze_post,
+    skipping strengths/weaknesses/suggestions and the full AnalysisResult.
+    """
+    rules = _RULES
+    media_info = primary_media(media_files)
+    if media_info is not None:
+        include_media, media_type = True, media_type or media_info.media_type
+    post_type, reply, share, media, safety = score_components(
+        extract_features(text, rules=rules), include_media, media_type, rules, media_info
+    )
+    return ScoreResult(
+        weighted_score=weighted_score_from_components(
+            post_type, reply, share, media, safety, include_media, media_type
+        ),
+        overall_score=int(reply * 0.40 + share * 0.25 + media * 0.15 + safety * 0.20),
+        post_type=post_type,
+        reply_potential=reply,
+        shareability=share,
+        media_optimization=media,
+        negative_signal_safety=safety,
+    )
+
+
+# === RESULT CACHE: opt-in memoization of analyze_post ===
+
+def copy_result(result: AnalysisResult) -> AnalysisResult:
+    """Copy an AnalysisResult deeply enough that mutating it can't affect the original."""
+    return replace(
+        result,
+        score_breakdown=dict(result.score_breakdown),
+        detected_patterns=list(result.detected_patterns),
+        probabilities=replace(result.probabilities),
+        strengths=list(result.strengths),
+        weaknesses=list(result.weaknesses),
+        suggestions=list(result.suggestions),
+    )
+
+
+class AnalysisCache:
+    """
+    Bounded LRU cache of AnalysisResults keyed by content hash and analysis options.
+
+    The key hashes the exact text: any normalization that changes the text
+    (whitespace, case, Unicode form) can change char counts or caps ratio and
+    therefore the result. It also names the ruleset and profile generation
+    the result was computed under, so a result finished after install_rules()
+    or apply_profile() is never served under the new settings; their clear()
+    only frees the space early. Entries older than ttl seconds are treated as
+    misses. Stored results are never handed out directly; readers get copies.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: Optional[float] = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        text: str,
+        include_media: bool,
+        media_type: Optional[str],
+        is_thread_start: bool,
+        media: Optional[MediaInfo] = None,
+        rules: Optional["Ruleset"] = None,
+        profile_generation: Optional[int] = None,
+    ) -> tuple:
+        """Cache key; rules and profile_generation default to the active ones."""
+        digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        # Inspected media is keyed by what the rules read, not by path
+        signature = None if media is None else (media.media_type, media.width, media.height, media.duration)
+        if profile_generation is None:
+            profile_generation = _profile_generation
+        return (
+            digest, bool(include_media), media_type, bool(is_thread_start), signature,
+            (rules or _RULES).serial, profile_generation,
+        )
+
+    def get(self, key: tuple) -> Optional[AnalysisResult]:
+        """Return a copy of the cached result, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = entry[1]
+        return copy_result(result)
+
+    def put(self, key: tuple, result: AnalysisResult) -> None:
+        """Store a private copy of result, evicting the least recently used entry if full."""
+        entry = (time.monotonic(), copy_result(result))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_result_cache: Optional[AnalysisCache] = None
+
+
+def enable_cache(maxsize: int = 10_000, ttl: Optional[float] = None) -> AnalysisCache:
+    """Turn on result caching for analyze_post (and everything built on it)."""
+    global _result_cache
+    _result_cache = AnalysisCache(maxsize=maxsize, ttl=ttl)
+    return _result_cache
+
+
+def disable_cache() -> None:
+    """Turn result caching off and drop all cached results."""
+    global _result_cache
+    _result_cache = None
+
+
+def get_cache() -> Optional[AnalysisCache]:
+    """The active cache, or None if caching is off."""
+    return _result_cache
+
+
+# === PROFILES: swap in calibrated weights and probability coefficients ===
+
+# Bumped by every apply_profile(), so cached results name the profile they used
+_profile_generation = 0
+
+
+def current_profile() -> dict:
+    """The active action weights and probability model as a JSON-ready profile."""
+    return {
+        "weights": {action: getattr(ActionWeights, action.upper()) for action in ACTIONS},
+        "probability_divisors": dict(PROBABILITY_DIVISORS),
+        "block_ratios": dict(BLOCK_RATIOS),
+        "type_adjustments": {post_type.value: dict(adj) for post_type, adj in TYPE_ADJUSTMENTS.items()},
+    }
+
+
+def apply_profile(profile: dict) -> None:
+    """
+    Install weights and probability coefficients from a profile.
+
+    Every section (weights, probability_divisors, block_ratios,
+    type_adjustments) and every entry is optional; anything left out keeps
+    its current value. The whole profile is validated before anything
+    changes, and the result cache is cleared afterwards.
+
+    Raises:
+        ValueError: Unknown section, action, probability or post type
+    """
+    sections = {"weights", "probability_divisors", "block_ratios", "type_adjustments"}
+    unknown = set(profile) - sections - {"calibration"}
+    if unknown:
+        raise ValueError(f"unknown profile sections: {', '.join(sorted(unknown))}")
+
+    weights = {key.lower(): float(value) for key, value in profile.get("weights", {}).items()}
+    divisors = {key: float(value) for key, value in profile.get("probability_divisors", {}).items()}
+    ratios = {key: float(value) for key, value in profile.get("block_ratios", {}).items()}
+    types = {post_type.value: post_type for post_type in PostType}
+    adjustments = {}
+    for name, adj in profile.get("type_adjustments", {}).items():
+        if name not in types:
+            raise ValueError(f"unknown post type {name!r}")
+        bad = set(adj) - set(ADJUSTED_CAPS)
+        if bad:
+            raise ValueError(f"{name}: only {', '.join(ADJUSTED_CAPS)} can be adjusted, not {', '.join(sorted(bad))}")
+        adjustments[types[name]] = {key: float(mult) for key, mult in adj.items()}
+    for given, allowed, what in (
+        (weights, ACTIONS, "action"),
+        (divisors, PROBABILITY_DIVISORS, "probability divisor"),
+        (ratios, BLOCK_RATIOS, "block ratio"),
+    ):
+        bad = set(given) - set(allowed)
+        if bad:
+            raise ValueError(f"unknown {what}: {', '.join(sorted(bad))}")
+    if any(value <= 0 for value in divisors.values()):
+        raise ValueError("probability divisors must be positive")
+
+    global _TYPE_ADJ, _FAST_MODEL, _profile_generation
+    for action, value in weights.items():
+        setattr(ActionWeights, action.upper(), value)
+    PROBABILITY_DIVISORS.update(divisors)
+    BLOCK_RATIOS.update(ratios)
+    for post_type, adj in adjustments.items():
+        TYPE_ADJUSTMENTS.setdefault(post_type, {}).update(adj)
+    _TYPE_ADJ, _FAST_MODEL = _build_fast_tables()
+    _profile_generation += 1
+    if _result_cache is not None:
+        _result_cache.clear()
+
+
+def load_profile(path: str) -> dict:
+    """Read a JSON profile (e.g. from scripts/calibrate.py), apply it, and return it."""
+    with open(path, encoding="utf-8") as f:
+        profile = json.load(f)
+    apply_profile(profile)
+    return profile
+
+
+# === INSTRUMENTATION: opt-in per-stage timing and counters ===
+
+# Stages timed inside analyze_post / format_report, in pipeline order
+STAGES = (
+    "features",
+    "post_type",
+    "reply",
+    "shareability",
+    "media",
+    "negative_signals",
+    "probabilities",
+    "weighted_score",
+    "report",
+)
+
+
+class _StageTimer:
+    """Lap timer for one analysis; lap(stage) charges the time since the last lap."""
+
+    __slots__ = ("metrics", "laps", "_last")
+
+    def __init__(self, metrics: "AnalysisMetrics"):
+        self.metrics = metrics
+        self.laps = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.laps[stage] = now - self._last
+        self._last = now
+
+
+class AnalysisMetrics:
+    """
+    In-process counters for analyze_post: per-stage wall time and call counts,
+    plus how often each pattern group and post type fired.
+
+    Metrics are per process; workers started by analyze_posts(workers>1) keep
+    their own. An optional callback receives one event dict per analysis
+    ({"stages": {stage: seconds}, "post_type": str, "patterns": [...]}) and
+    one per report ({"stages": {"report": seconds}}), e.g. to feed Prometheus
+    histograms. Cache hits skip analysis and record nothing.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.posts = 0
+            self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+            self.stage_calls = dict.fromkeys(STAGES, 0)
+            self.pattern_counts = dict.fromkeys(_RULES.groups, 0)
+            self.post_type_counts = dict.fromkeys((t.value for t in PostType), 0)
+
+    def record(self, laps: dict, post_type: Optional[PostType] = None, hits: frozenset = frozenset()) -> None:
+        """Add one analysis (or report) to the totals."""
+        with self._lock:
+            for stage, seconds in laps.items():
+                self.stage_seconds[stage] += seconds
+                self.stage_calls[stage] += 1
+            if post_type is not None:
+                self.posts += 1
+                self.post_type_counts[post_type.value] += 1
+                for name in hits:
+                    self.pattern_counts[name] = self.pattern_counts.get(name, 0) + 1
+        if self.callback is not None:
+            event = {"stages": laps}
+            if post_type is not None:
+                event["post_type"] = post_type.value
+                event["patterns"] = sorted(hits)
+            self.callback(event)
+
+    def snapshot(self) -> dict:
+        """Point-in-time copy of every counter, with mean seconds per stage."""
+        with self._lock:
+            return {
+                "posts": self.posts,
+                "stages": {
+                    stage: {
+                        "calls": self.stage_calls[stage],
+                        "seconds": self.stage_seconds[stage],
+                        "mean_seconds": self.stage_seconds[stage] / self.stage_calls[stage]
+                        if self.stage_calls[stage] else 0.0,
+                    }
+                    for stage in STAGES
+                },
+                "patterns": dict(self.pattern_counts),
+                "post_types": dict(self.post_type_counts),
+            }
+
+
+_metrics: Optional[AnalysisMetrics] = None
+
+
+def enable_metrics(callback=None) -> AnalysisMetrics:
+    """Turn on per-stage instrumentation for analyze_post and format_report."""
+    global _metrics
+    _metrics = AnalysisMetrics(callback=callback)
+    return _metrics
+
+
+def disable_metrics() -> None:
+    """Turn instrumentation off (the hot path then pays one global lookup)."""
+    global _metrics
+    _metrics = None
+
+
+def get_metrics() -> Optional[AnalysisMetrics]:
+    """The active metrics collector, or None if instrumentation is off."""
+    return _metrics
 
 
 def analyze_post(
@@ -472,6 +1718,7 @@ def analyze_post(
     include_media: bool = False,
     media_type: Optional[str] = None,
     is_thread_start: bool = False,
+    media_files=None,
 ) -> AnalysisResult:
     """
     Comprehensive post analysis against X's weighted scorer mechanics.
@@ -481,42 +1728,141 @@ def analyze_post(
         include_media: Whether the post includes media (image or video)
         media_type: "image", "video", or None
         is_thread_start: Whether this is the first tweet of a thread
+        media_files: Path (or list of paths) of the attached media; the
+            first file's headers set include_media, the media_type default
+            and the aspect-ratio and duration checks (see inspect_media)
 
     Returns:
         AnalysisResult with scores, probabilities, and recommendations
+
+    Raises:
+        ValueError / OSError: A media file is unsupported or unreadable
+    """
+    media = primary_media(media_files)
+    if media is not None:
+        include_media, media_type = True, media_type or media.media_type
+
+    cache = _result_cache
+    if cache is None:
+        return _analyze_post(text, include_media, media_type, is_thread_start, media)
+
+    # Key by the settings read before analyzing, so a result computed across
+    # an install_rules() or apply_profile() is stored under the old ones
+    rules = _RULES
+    key = cache.make_key(text, include_media, media_type, is_thread_start, media, rules, _profile_generation)
+    result = cache.get(key)
+    if result is None:
+        result = _analyze_post(text, include_media, media_type, is_thread_start, media, rules)
+        cache.put(key, result)
+    return result
+
+
+def _analyze_post(
+    text: str,
+    include_media: bool,
+    media_type: Optional[str],
+    is_thread_start: bool,
+    media: Optional[MediaInfo] = None,
+    rules: Optional[Ruleset] = None,
+) -> AnalysisResult:
+    # Single pass over the text; every analyzer reads from these features.
+    # The ruleset is read once so a concurrent install_rules can't split an analysis.
+    rules = rules or _RULES
+    metrics = _metrics
+    if metrics is None:
+        return _analyze_features(
+            extract_features(text, rules=rules), include_media, media_type, is_thread_start, None, rules, media
+        )
+
+    timer = _StageTimer(metrics)
+    features = extract_features(text, rules=rules)
+    timer.lap("features")
+    return _analyze_features(features, include_media, media_type, is_thread_start, timer, rules, media)
+
+
+def analyze_features(
+    features: PostFeatures,
+    include_media: bool = False,
+    media_type: Optional[str] = None,
+    is_thread_start: bool = False,
+    rules: Optional[Ruleset] = None,
+    media: Optional[MediaInfo] = None,
+) -> AnalysisResult:
+    """
+    analyze_post for features that are already extracted (see extract_features).
+
+    Pass the ruleset the features were extracted with, if it may have been
+    swapped since, and the inspected primary media file, if any.
     """
+    metrics = _metrics
+    return _analyze_features(
+        features, include_media, media_type, is_thread_start,
+        _StageTimer(metrics) if metrics is not None else None,
+        rules or _RULES, media,
+    )
+
+
+def _analyze_features(
+    features: PostFeatures,
+    include_media: bool,
+    media_type: Optional[str],
+    is_thread_start: bool,
+    timer: Optional[_StageTimer],
+    rules: Ruleset,
+    media: Optional[MediaInfo] = None,
+) -> AnalysisResult:
     # Metadata
-    char_count = len(text)
-    word_count = len(text.split())
-    has_question = "?" in text
+    char_count = features.char_count
+    word_count = features.word_count
+    has_question = features.has_question
 
     # Detect post type
-    post_type, detected_patterns = detect_post_type(text)
+    post_type, detected_patterns = detect_post_type(features, rules)
+    if timer is not None:
+        timer.lap("post_type")
 
     # Component analysis
-    reply_score, reply_str, reply_weak, reply_sug = analyze_reply_potential(text, post_type)
-    share_score, share_str, share_weak, share_sug = analyze_shareability(text, post_type)
-    media_score, media_str, media_weak, media_sug = analyze_media(include_media, media_type)
-    safety_score, est_p_block, safety_str, safety_weak, safety_sug = analyze_negative_signals(text, post_type)
+    reply_score, reply_str, reply_weak, reply_sug = analyze_reply_potential(features, post_type, rules)
+    if timer is not None:
+        timer.lap("reply")
+    share_score, share_str, share_weak, share_sug = analyze_shareability(features, post_type, rules)
+    if timer is not None:
+        timer.lap("shareability")
+    media_score, media_str, media_weak, media_sug = analyze_media(include_media, media_type, rules, media)
+    if timer is not None:
+        timer.lap("media")
+    safety_score, est_p_block, safety_str, safety_weak, safety_sug = analyze_negative_signals(
+        features, post_type, rules
+    )
+    if timer is not None:
+        timer.lap("negative_signals")
 
     # Combine feedback
     strengths = reply_str + share_str + media_str + safety_str
     weaknesses = reply_weak + share_weak + media_weak + safety_weak
     suggestions = reply_sug + share_sug + media_sug + safety_sug
 
-    # Character count analysis
-    if char_count < 50:
-        weaknesses.append(f"Very short ({char_count} chars) — may lack substance")
-    elif 71 <= char_count <= 100:
-        strengths.append(f"Optimal length ({char_count} chars) — highest engagement per character")
-    elif char_count > 280:
-        weaknesses.append(f"Long post ({char_count} chars) — requires 'Show more' click")
+    # Post-level feedback (character count, ...)
+    _, post_str, post_weak, post_sug = _apply_rules((0, rules.feedback), features.hits, features)
+    strengths += post_str
+    weaknesses += post_weak
+    suggestions += post_sug
+
+    # Thread opener: Tweet 1 is the only tweet scored for reach
+    if is_thread_start:
+        if len(_THREAD_TEASE_RE.sub("", features.text_lower)) < 20:
+            weaknesses.append("Thread tease as Tweet 1 — 'Thread! 🧵' with thin content reads as spam")
+            suggestions.append("Put the value proposition in Tweet 1 so it hooks on its own")
+        elif 100 <= char_count <= 150:
+            strengths.append(f"Hook length in the 100-150 char range for thread openers ({char_count} chars)")
 
     # Estimate probabilities
     probs = estimate_probabilities(
-        text, post_type, reply_score, share_score, media_score, safety_score,
+        features.text, post_type, reply_score, share_score, media_score, safety_score,
         include_media, media_type
     )
+    if timer is not None:
+        timer.lap("probabilities")
 
     # Calculate weighted score
     weighted_score, score_breakdown = calculate_weighted_score(
@@ -533,6 +1879,9 @@ def analyze_post(
         p_mute=probs.p_mute,
         p_report=probs.p_report,
     )
+    if timer is not None:
+        timer.lap("weighted_score")
+        timer.metrics.record(timer.laps, post_type, features.hits)
 
     # Overall score (0-100 scale for readability)
     overall_score = int(
@@ -564,8 +1913,231 @@ def analyze_post(
     )
 
 
+# === PERCENTILE RANKS: a draft's score against a reference corpus ===
+#
+# File layout (little-endian): magic, version, section count, then one
+# (PostType code or -1 for all posts, count, byte offset) entry per section,
+# then each section's sorted float64 scores at an 8-byte aligned offset.
+
+PERCENTILE_MAGIC = b"XPRANKS\x00"
+PERCENTILE_FORMAT_VERSION = 1
+_PCT_HEADER = struct.Struct("<8sII")
+_PCT_SECTION = struct.Struct("<iIQ")  # code, count, offset
+_ALL_POSTS = -1
+
+
+class PercentileIndex:
+    """
+    Sorted weighted scores of a reference corpus, overall and per PostType.
+
+    percentile() is a binary search, O(log n). load() memory-maps the file
+    and searches the mapped arrays in place, so opening an index of any
+    size costs a header read, and pages are only touched by lookups.
+    """
+
+    def __init__(self, sections: dict, path: Optional[str] = None):
+        # sections: None (all posts) or PostType -> sorted sequence of floats
+        self._sections = sections
+        self.path = path
+        self._mmap = None
+
+    @classmethod
+    def build(
+        cls,
+        rows: Iterable,
+        per_type: bool = True,
+        min_type_count: int = 100,
+    ) -> "PercentileIndex":
+        """
+        Build an index from AnalysisResults or (post_type, weighted_score) pairs.
+
+        Args:
+            rows: Reference results, consumed once
+            per_type: Also index each PostType separately
+            min_type_count: Leave out post types with fewer reference posts
+        """
+        scores = {}
+        for row in rows:
+            if isinstance(row, AnalysisResult):
+                post_type, score = row.post_type, row.weighted_score
+            else:
+                post_type, score = row
+                post_type = _POST_TYPES[post_type] if isinstance(post_type, int) else PostType(post_type)
+            scores.setdefault(post_type, array("d")).append(score)
+        sections = {None: array("d", sorted(s for values in scores.values() for s in values))}
+        if per_type:
+            for post_type, values in scores.items():
+                if len(values) >= min_type_count:
+                    sections[post_type] = array("d", sorted(values))
+        return cls(sections)
+
+    def save(self, path: str) -> None:
+        """Write the index in the memory-mappable format."""
+        keys = sorted(self._sections, key=lambda key: -1 if key is None else POST_TYPE_CODES[key])
+        offset = _PCT_HEADER.size + _PCT_SECTION.size * len(keys)
+        entries = []
+        for key in keys:
+            offset += -offset % 8
+            entries.append((_ALL_POSTS if key is None else POST_TYPE_CODES[key], len(self._sections[key]), offset))
+            offset += 8 * len(self._sections[key])
+        with open(path, "wb") as f:
+            f.write(_PCT_HEADER.pack(PERCENTILE_MAGIC, PERCENTILE_FORMAT_VERSION, len(keys)))
+            for entry in entries:
+                f.write(_PCT_SECTION.pack(*entry))
+            for key, (_, _, start) in zip(keys, entries):
+                f.write(b"\x00" * (start - f.tell()))
+                values = array("d", self._sections[key])
+                if sys.byteorder != "little":
+                    values.byteswap()
+                f.write(values.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "PercentileIndex":
+        """
+        Open a saved index by memory mapping (copied instead on big-endian hosts).
+
+        Raises:
+            ValueError: Not an index file, or an unsupported version
+        """
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count = _PCT_HEADER.unpack_from(buf, 0)
+            if magic != PERCENTILE_MAGIC:
+                raise ValueError(f"{path}: not a percentile index")
+            if version != PERCENTILE_FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported percentile index version {version}")
+            view = memoryview(buf)
+            sections = {}
+            for i in range(count):
+                code, n, offset = _PCT_SECTION.unpack_from(buf, _PCT_HEADER.size + i * _PCT_SECTION.size)
+                if offset + 8 * n > len(buf):
+                    raise ValueError(f"{path}: truncated percentile index")
+                data = view[offset:offset + 8 * n]
+                if sys.byteorder == "little":
+                    values = data.cast("d")
+                else:
+                    values = array("d", data.tobytes())
+                    values.byteswap()
+                sections[None if code == _ALL_POSTS else _POST_TYPES[code]] = values
+        except (struct.error, IndexError):
+            buf.close()
+            raise ValueError(f"{path}: truncated percentile index") from None
+        except ValueError:
+            buf.close()
+            raise
+        index = cls(sections, path)
+        index._mmap = buf
+        return index
+
+    def close(self) -> None:
+        """Release the memory map (the index is unusable afterwards)."""
+        if self._mmap is not None:
+            for values in self._sections.values():
+                if isinstance(values, memoryview):
+                    values.release()
+            self._sections = {}
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "PercentileIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._sections.get(None, ()))
+
+    def count(self, post_type: Optional[PostType] = None) -> int:
+        """Reference posts in the section (0 if the type isn't indexed)."""
+        return len(self._sections.get(post_type, ()))
+
+    def post_types(self) -> list:
+        """PostTypes with their own section."""
+        return [key for key in self._sections if key is not None]
+
+    def percentile(self, score: float, post_type: Optional[PostType] = None) -> Optional[float]:
+        """
+        Share of reference posts scoring below score, 0-100 (ties count half).
+
+        Returns None if post_type has no section (or the index is empty).
+        """
+        values = self._sections.get(post_type)
+        if not values:
+            return None
+        below = bisect_left(values, score)
+        ties = bisect_right(values, score, below) - below
+        return 100.0 * (below + ties / 2) / len(values)
+
+    def rank(self, result: AnalysisResult) -> tuple[Optional[float], Optional[float]]:
+        """(percentile among all reference posts, percentile within the result's post type)."""
+        return (
+            self.percentile(result.weighted_score),
+            self.percentile(result.weighted_score, result.post_type),
+        )
+
+
+_percentile_index: Optional[PercentileIndex] = None
+_percentile_index_owned = False  # loaded by enable_percentiles, so closed by it too
+
+
+def _release_percentile_index() -> None:
+    global _percentile_index, _percentile_index_owned
+    if _percentile_index is not None and _percentile_index_owned:
+        _percentile_index.close()
+    _percentile_index = None
+    _percentile_index_owned = False
+
+
+def enable_percentiles(index: Union[str, PercentileIndex]) -> PercentileIndex:
+    """
+    Rank reports and compare_posts against a reference index.
+
+    A path is memory-mapped and owned here: the next enable_percentiles() or
+    disable_percentiles() call closes it. An index object passed in stays
+    the caller's to close.
+    """
+    global _percentile_index, _percentile_index_owned
+    owned = not isinstance(index, PercentileIndex)
+    if owned:
+        index = PercentileIndex.load(index)
+    if index is not _percentile_index:
+        _release_percentile_index()
+    _percentile_index = index
+    _percentile_index_owned = owned or _percentile_index_owned
+    return index
+
+
+def disable_percentiles() -> None:
+    """Stop adding percentiles to reports, closing the index if enable_percentiles() loaded it."""
+    _release_percentile_index()
+
+
+def get_percentile_index() -> Optional[PercentileIndex]:
+    """The active reference index, or None."""
+    return _percentile_index
+
+
+def _ordinal(value: float) -> str:
+    n = max(1, min(int(value), 99))
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
 def format_report(result: AnalysisResult, verbose: bool = True) -> str:
     """Format analysis into readable report."""
+    metrics = _metrics
+    if metrics is None:
+        return _format_report(result, verbose)
+
+    start = time.perf_counter()
+    report = _format_report(result, verbose)
+    metrics.record({"report": time.perf_counter() - start})
+    return report
+
+
+def _format_report(result: AnalysisResult, verbose: bool) -> str:
     lines = []
 
     # Header with verdict
@@ -582,6 +2154,13 @@ def format_report(result: AnalysisResult, verbose: bool = True) -> str:
 
     lines.append(f"{emoji} **Weighted Score: {result.weighted_score:.2f}** ({verdict})")
     lines.append(f"**Post Type Detected**: {result.post_type.value.replace('_', ' ').title()}")
+    index = _percentile_index
+    if index is not None and len(index):
+        overall, within_type = index.rank(result)
+        line = f"**Percentile**: {_ordinal(overall)} of {len(index):,} reference posts"
+        if within_type is not None:
+            line += f" ({_ordinal(within_type)} among {result.post_type.value.replace('_', ' ')} posts)"
+        lines.append(line)
     lines.append("")
 
     if verbose:
@@ -657,40 +2236,315 @@ def format_report(result: AnalysisResult, verbose: bool = True) -> str:
     return "\n".join(lines)
 
 
-def quick_score(text: str, include_media: bool = False) -> float:
+def quick_score(
+    text: str,
+    include_media: bool = False,
+    media_type: Optional[str] = None,
+    media_files=None,
+) -> float:
     """Get just the weighted score without full analysis."""
-    result = analyze_post(text, include_media=include_media)
-    return result.weighted_score
+    return score_post(text, include_media, media_type, media_files).weighted_score
+
 
+def post_args(post: Union[str, dict]) -> tuple:
+    """Compact (text, include_media, media_type, media_files) tuple for a str or post dict."""
+    if isinstance(post, str):
+        return post, False, None, None
+    return post.get("text", ""), post.get("include_media", False), post.get("media_type"), post.get("media_files")
 
-def compare_posts(posts: list[dict]) -> str:
+
+def _warm_worker(profile: Optional[dict] = None, rules: Optional[dict] = None) -> None:
+    """Process-pool initializer: adopt the parent's profile and rules, then run one analysis to warm every lazy path."""
+    if profile is not None:
+        apply_profile(profile)
+    if rules is not None:
+        install_rules(rules)
+    analyze_post("What's your take? 10 tips: https://example.com", True, "image")
+
+
+def _analyze_chunk(chunk: list) -> list:
+    return [analyze_post(text, inc, mt, media_files=files) for text, inc, mt, files in chunk]
+
+
+def analyze_posts(
+    posts: Iterable[Union[str, dict]],
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+    ordered: bool = True,
+) -> Iterator:
     """
-    Compare multiple posts and rank them.
+    Analyze many posts across a process pool.
+
+    Posts are consumed lazily and shipped to workers as chunks of compact
+    tuples; at most two chunks per worker are in flight at a time.
 
     Args:
-        posts: List of dicts with keys: text, include_media (optional), media_type (optional)
+        posts: Post texts, or dicts with keys: text, include_media (optional), media_type (optional),
+            media_files (optional; inspected in the worker)
+        workers: Worker processes (default: os.cpu_count()); 1 runs in-process
+        chunksize: Posts per task sent to a worker
+        ordered: Yield results in input order; if False, yield (index, result)
+            pairs as chunks finish
+
+    Yields:
+        AnalysisResult, or (index, AnalysisResult) when ordered=False
+    """
+    workers = workers or os.cpu_count() or 1
+    args = map(post_args, posts)
+
+    if workers == 1:
+        for index, (text, inc, mt, files) in enumerate(args):
+            result = analyze_post(text, inc, mt, media_files=files)
+            yield result if ordered else (index, result)
+        return
+
+    def chunks():
+        start = 0
+        while chunk := list(islice(args, chunksize)):
+            yield start, chunk
+            start += len(chunk)
+
+    max_in_flight = workers * 2
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_warm_worker,
+        initargs=(current_profile(), None if _RULES is _BUILTIN_RULES else current_rules()),
+    )
+    try:
+        source = chunks()
+        if ordered:
+            pending = deque()
+            for start, chunk in source:
+                pending.append(pool.submit(_analyze_chunk, chunk))
+                if len(pending) >= max_in_flight:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            pending = {}
+            for start, chunk in source:
+                pending[pool.submit(_analyze_chunk, chunk)] = start
+                while len(pending) >= max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from enumerate(future.result(), pending.pop(future))
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from enumerate(future.result(), pending.pop(future))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def rank_posts(
+    posts: Iterable[dict],
+    top_k: Optional[int] = None,
+    workers: int = 1,
+) -> list[tuple[int, dict, AnalysisResult]]:
+    """
+    Analyze posts and rank them by weighted score, best first.
+
+    With top_k, posts are consumed lazily and only the best k are kept (a
+    bounded min-heap), so memory is O(k) however many candidates stream in.
+    Ties keep input order in both modes.
 
     Returns:
-        Formatted comparison report
+        List of (1-based input position, post, AnalysisResult)
     """
-    results = []
-    for i, post in enumerate(posts):
-        result = analyze_post(
-            post.get("text", ""),
-            include_media=post.get("include_media", False),
-            media_type=post.get("media_type"),
-        )
-        results.append((i + 1, post.get("text", "")[:50], result))
+    posts, to_analyze = tee(posts)
+    rows = zip(count(1), posts, analyze_posts(to_analyze, workers=workers))
+
+    if top_k is None:
+        ranked = list(rows)
+        ranked.sort(key=lambda x: x[2].weighted_score, reverse=True)
+        return ranked
+
+    if top_k <= 0:
+        for _ in rows:
+            pass
+        return []
+
+    # Heap entries order by (score, -position): the root is the weakest keeper
+    heap = []
+    for num, post, result in rows:
+        entry = (result.weighted_score, -num, num, post, result)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    heap.sort(reverse=True)
+    return [(num, post, result) for _, _, num, post, result in heap]
+
+
+def compare_posts(posts: Iterable[dict], workers: int = 1, top_k: Optional[int] = None) -> str:
+    """
+    Compare multiple posts and rank them.
 
-    # Sort by weighted score
-    results.sort(key=lambda x: x[2].weighted_score, reverse=True)
+    Args:
+        posts: Iterable of dicts with keys: text, include_media (optional), media_type (optional)
+        workers: Worker processes for analysis (see analyze_posts)
+        top_k: Only keep and render the best k posts (O(k) memory, no full sort)
+
+    Returns:
+        Formatted comparison report (with each post's percentile when a
+        reference index is active, see enable_percentiles)
+    """
+    ranked = rank_posts(posts, top_k=top_k, workers=workers)
+    index = _percentile_index
+    if index is not None and not len(index):
+        index = None
 
     lines = ["### Post Comparison (Ranked by Weighted Score)", ""]
-    for rank, (num, preview, result) in enumerate(results, 1):
+    for rank, (num, post, result) in enumerate(ranked, 1):
+        preview = post.get("text", "")[:50]
         emoji = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else f"{rank}."
         lines.append(f"{emoji} Post {num}: **{result.weighted_score:.2f}** — \"{preview}...\"")
-        lines.append(f"   Type: {result.post_type.value} | Reply: {result.reply_potential} | Safety: {result.negative_signal_safety}")
+        line = f"   Type: {result.post_type.value} | Reply: {result.reply_potential} | Safety: {result.negative_signal_safety}"
+        if index is not None:
+            overall, within_type = index.rank(result)
+            line += f" | Percentile: {_ordinal(overall)}"
+            if within_type is not None:
+                line += f" ({_ordinal(within_type)} among {result.post_type.value.replace('_', ' ')} posts)"
+        lines.append(line)
+
+    return "\n".join(lines)
+
+
+# === THREAD ANALYSIS: every tweet in one pass, plus a thread-level score ===
+
+# Share of the thread score carried by Tweet 1 (the only tweet scored for reach)
+THREAD_HOOK_WEIGHT = 0.6
+
+_CTA_RE = re.compile(r"\b(follow|bookmark|repost|retweet|share|reply|comment|subscribe)\b")
+
+
+@dataclass
+class ThreadAnalysis:
+    """Per-tweet results and the thread-level aggregate."""
+    tweets: list
+    thread_score: float
+    hook_score: float
+    body_score: float
+    weakest_tweet: Optional[int]
+    char_count: int
+    strengths: list = field(default_factory=list)
+    weaknesses: list = field(default_factory=list)
+    suggestions: list = field(default_factory=list)
+
+    @property
+    def hook(self) -> AnalysisResult:
+        return self.tweets[0]
+
+
+def analyze_thread(tweets: list, hook_weight: float = THREAD_HOOK_WEIGHT) -> ThreadAnalysis:
+    """
+    Analyze a whole thread: Tweet 1 as the hook, the rest as delivery.
+
+    The rule keys are checked once against the whole thread, and each tweet
+    then only checks the keys that occur somewhere in it. Repeated tweets
+    (e.g. a recurring CTA) share one analysis. The thread score weights the
+    hook by hook_weight and the mean of the remaining tweets by
+    1 - hook_weight, so cost is linear in the total text length.
+
+    Args:
+        tweets: Tweet texts, or post dicts (text, include_media, media_type, media_files), in order
+        hook_weight: Share of the thread score carried by Tweet 1
 
+    Returns:
+        ThreadAnalysis with one AnalysisResult per tweet
+    """
+    if not tweets:
+        raise ValueError("a thread needs at least one tweet")
+
+    posts = [post_args(tweet) for tweet in tweets]
+    rules = _RULES
+    literal_index = live_literal_index((text.lower() for text, _, _, _ in posts), rules)
+
+    seen = {}
+    results = []
+    for i, (text, include_media, media_type, media_files) in enumerate(posts):
+        media = primary_media(media_files)
+        if media is not None:
+            include_media, media_type = True, media_type or media.media_type
+        key = (text, include_media, media_type, i == 0, media)
+        result = seen.get(key)
+        if result is None:
+            features = extract_features(text, literal_index, rules)
+            result = seen[key] = analyze_features(features, include_media, media_type, i == 0, rules, media)
+        else:
+            result = copy_result(result)
+        results.append(result)
+
+    hook, body = results[0], results[1:]
+    hook_score = hook.weighted_score
+    if body:
+        body_score = sum(r.weighted_score for r in body) / len(body)
+        thread_score = hook_weight * hook_score + (1 - hook_weight) * body_score
+        weakest = min(range(1, len(results)), key=lambda i: results[i].weighted_score)
+    else:
+        body_score = 0.0
+        thread_score = hook_score
+        weakest = None
+
+    strengths, weaknesses, suggestions = [], [], []
+    if body and hook_score >= max(r.weighted_score for r in body):
+        strengths.append("Tweet 1 is the strongest tweet — reach goes to the best hook")
+    elif body:
+        suggestions.append("A later tweet outscores Tweet 1 — consider leading with it")
+
+    if weakest is not None and results[weakest].weighted_score < 0:
+        weaknesses.append(f"Tweet {weakest + 1} scores negative ({results[weakest].weighted_score:.2f}) — it can drag the thread")
+
+    weaknesses.extend(f"Tweet 1: {weakness}" for weakness in hook.weaknesses)
+
+    last = posts[-1][0].lower()
+    if body and _CTA_RE.search(last):
+        strengths.append("Final tweet has a clear call to action")
+    elif body:
+        suggestions.append("End with a CTA (follow, bookmark, reply) and a one-line summary")
+
+    long_tweets = [i + 1 for i, r in enumerate(results) if r.char_count > 280]
+    if long_tweets:
+        weaknesses.append(f"Tweets over 280 chars: {', '.join(map(str, long_tweets))}")
+
+    return ThreadAnalysis(
+        tweets=results,
+        thread_score=thread_score,
+        hook_score=hook_score,
+        body_score=body_score,
+        weakest_tweet=weakest,
+        char_count=sum(r.char_count for r in results),
+        strengths=strengths,
+        weaknesses=weaknesses,
+        suggestions=suggestions,
+    )
+
+
+def format_thread_report(thread: ThreadAnalysis, verbose: bool = False) -> str:
+    """Format a thread analysis: aggregate first, then one line (or full report) per tweet."""
+    lines = [
+        f"### Thread Score: **{thread.thread_score:.2f}** ({len(thread.tweets)} tweets, {thread.char_count} chars)",
+        f"- Hook (Tweet 1): {thread.hook_score:.2f}",
+    ]
+    if len(thread.tweets) > 1:
+        lines.append(f"- Body average: {thread.body_score:.2f}")
+        lines.append(f"- Weakest tweet: {thread.weakest_tweet + 1}")
+    lines.append("")
+
+    for title, items in (("### ✅ Strengths", thread.strengths), ("### ❌ Weaknesses", thread.weaknesses),
+                         ("### 💡 Suggestions", thread.suggestions)):
+        if items:
+            lines.append(title)
+            lines.extend(f"- {item}" for item in items)
+            lines.append("")
+
+    lines.append("### Tweets")
+    for i, result in enumerate(thread.tweets, 1):
+        if verbose:
+            lines.append(f"#### Tweet {i}")
+            lines.append(format_report(result, verbose=False))
+        else:
+            lines.append(f"{i}. {result.weighted_score:.2f} — {result.post_type.value} ({result.char_count} chars)")
     return "\n".join(lines)
 
 
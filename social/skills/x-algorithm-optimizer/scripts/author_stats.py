@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Rolling per-author aggregates of analysis results, in bounded memory.
+
+An AuthorAggregator is fed (author, AnalysisResult, timestamp) one at a time
+and keeps, per author: post counts, the post-type mix, mergeable quantile
+sketches (t-digest) of weighted_score and negative_signal_safety, the mean
+estimated P(block), and per-window block-risk means for the last few windows.
+Everything except the raw post count decays exponentially with a half-life,
+so the stats describe recent drafting rather than the whole history. Memory
+per author is bounded by the sketch compression and the window history.
+
+Snapshots are plain JSON; merge() combines aggregators (or snapshots) from
+different worker processes into the same result as feeding one aggregator.
+
+Usage:
+    python scripts/author_stats.py drafts.jsonl -o snapshot.json --workers 8
+    python scripts/author_stats.py --merge worker1.json worker2.json -o snapshot.json
+
+    from author_stats import AuthorAggregator
+    stats = AuthorAggregator(half_life_days=14)
+    for post, result in iter_analyses(posts):
+        stats.add(post["author"], result, post["posted_at"])
+    print(stats.summary("@acme")["weighted_score"]["p50"])
+    json.dump(stats.snapshot(), open("worker1.json", "w"))
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from itertools import tee
+from typing import Iterable, Optional, Union
+
+from analyze_x_post import AnalysisResult, PostType, analyze_posts
+from corpus_stream import FORMATS, normalize_record, read_records
+from post_index import DATE_FIELDS, to_timestamp
+
+
+# Version of the snapshot() layout
+SNAPSHOT_SCHEMA_VERSION = 1
+
+# Record fields checked, in order, for the author
+AUTHOR_FIELDS = ("author", "author_id", "username", "handle")
+
+DAY = 86_400.0
+
+# Centroids lighter than this (after decay) are dropped
+_MIN_WEIGHT = 1e-9
+
+# Half-lives a landmark may fall behind before the weights are rebased
+_MAX_HALF_LIVES = 64
+
+
+class TDigest:
+    """
+    Merging t-digest: a quantile sketch of weighted values.
+
+    Centroids are merged under the k1 scale function, so tails keep more
+    resolution than the middle and the sketch holds O(compression)
+    centroids however many values are added. Two digests merge into one
+    that summarizes both inputs, and scale() multiplies every weight (for
+    decay) without changing the shape.
+    """
+
+    def __init__(self, compression: float = 100):
+        if compression <= 0:
+            raise ValueError("compression must be positive")
+        self.compression = compression
+        self.means = []
+        self.weights = []
+        self._buffer = []
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def total(self) -> float:
+        return sum(self.weights) + sum(w for _, w in self._buffer)
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        if weight <= 0 or value != value:  # skip NaN
+            return
+        self._buffer.append((value, weight))
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def merge(self, other: "TDigest", scale: float = 1.0) -> None:
+        """Add every centroid of other (weights times scale) to this digest."""
+        other._compress()
+        self._buffer.extend((m, w * scale) for m, w in zip(other.means, other.weights) if w * scale > 0)
+        if other.weights:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self._compress()
+
+    def scale(self, factor: float) -> None:
+        """Multiply every weight by factor, dropping centroids that become negligible."""
+        self._compress()
+        kept = [(m, w * factor) for m, w in zip(self.means, self.weights) if w * factor > _MIN_WEIGHT]
+        self.means = [m for m, _ in kept]
+        self.weights = [w for _, w in kept]
+        if not kept:
+            self.min, self.max = math.inf, -math.inf
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        items = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+        total = sum(w for _, w in items)
+        delta = self.compression
+        # k1(q) = delta / 2π · asin(2q - 1); a centroid may span one unit of k
+        k_of = lambda q: delta / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+        q_of = lambda k: (math.sin(min(k, delta / 4) * 2 * math.pi / delta) + 1) / 2
+
+        means, weights = [], []
+        mean, weight = items[0]
+        done = 0.0
+        limit = q_of(k_of(0.0) + 1) * total
+        for m, w in items[1:]:
+            if done + weight + w <= limit:
+                weight += w
+                mean += (m - mean) * w / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                done += weight
+                limit = q_of(k_of(done / total) + 1) * total
+                mean, weight = m, w
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0-1), or None if empty."""
+        self._compress()
+        means, weights = self.means, self.weights
+        if not means:
+            return None
+        if len(means) == 1 or q <= 0:
+            return means[0] if q > 0 else self.min
+        if q >= 1:
+            return self.max
+        total = sum(weights)
+        target = q * total
+        # Each centroid's weight is centred on its mean; interpolate between centres
+        cumulative = weights[0] / 2
+        if target < cumulative:
+            return self.min + (means[0] - self.min) * target / cumulative
+        for i in range(1, len(means)):
+            step = (weights[i - 1] + weights[i]) / 2
+            if target < cumulative + step:
+                return means[i - 1] + (means[i] - means[i - 1]) * (target - cumulative) / step
+            cumulative += step
+        tail = weights[-1] / 2
+        return means[-1] + (self.max - means[-1]) * min(1.0, (target - cumulative) / tail)
+
+    def to_dict(self) -> dict:
+        self._compress()
+        return {
+            "compression": self.compression,
+            "centroids": [[m, w] for m, w in zip(self.means, self.weights)],
+            "min": self.min if self.means else None,
+            "max": self.max if self.means else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TDigest":
+        digest = cls(data["compression"])
+        digest.means = [m for m, _ in data["centroids"]]
+        digest.weights = [w for _, w in data["centroids"]]
+        if digest.means:
+            digest.min, digest.max = data["min"], data["max"]
+        return digest
+
+
+class _Author:
+    """
+    Decayed state for one author.
+
+    Uses forward decay: a post at time t is added with weight
+    2 ** ((t - landmark) / half_life), so nothing stored has to be touched
+    as time passes and posts may arrive in any order. Decayed sums at time
+    T are the stored sums times 2 ** ((landmark - T) / half_life); ratios
+    (mix, means, quantiles) need no correction at all.
+    """
+
+    __slots__ = ("landmark", "updated", "posts", "weight", "post_types", "p_block", "scores", "safety", "windows")
+
+    def __init__(self, landmark: float, compression: float):
+        self.landmark = landmark
+        self.updated = landmark
+        self.posts = 0
+        self.weight = 0.0
+        self.post_types = {}
+        self.p_block = 0.0
+        self.scores = TDigest(compression)
+        self.safety = TDigest(compression)
+        # window index -> [posts, sum p_block, sum safety, sum weighted_score] (not decayed)
+        self.windows = {}
+
+    def weight_at(self, when: float, half_life: float) -> float:
+        """Forward-decay weight of a post at time when, rebasing first if it would get too large."""
+        if (when - self.landmark) / half_life > _MAX_HALF_LIVES:
+            self.rebase(when, half_life)
+        return 2.0 ** ((when - self.landmark) / half_life)
+
+    def rebase(self, landmark: float, half_life: float) -> None:
+        """Move the landmark, rescaling every decayed sum to match."""
+        factor = 2.0 ** ((self.landmark - landmark) / half_life)
+        self.weight *= factor
+        self.p_block *= factor
+        for name in list(self.post_types):
+            self.post_types[name] *= factor
+            if self.post_types[name] < _MIN_WEIGHT:
+                del self.post_types[name]
+        self.scores.scale(factor)
+        self.safety.scale(factor)
+        self.landmark = landmark
+
+    def trim_windows(self, history: int) -> None:
+        while len(self.windows) > history:
+            del self.windows[min(self.windows)]
+
+    def to_dict(self) -> dict:
+        return {
+            "landmark": self.landmark,
+            "updated": self.updated,
+            "posts": self.posts,
+            "weight": self.weight,
+            "post_types": dict(self.post_types),
+            "p_block": self.p_block,
+            "weighted_score": self.scores.to_dict(),
+            "negative_signal_safety": self.safety.to_dict(),
+            "windows": [[index, *values] for index, values in sorted(self.windows.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "_Author":
+        author = cls(data["landmark"], 1)
+        author.updated = data["updated"]
+        author.posts = data["posts"]
+        author.weight = data["weight"]
+        author.post_types = dict(data["post_types"])
+        author.p_block = data["p_block"]
+        author.scores = TDigest.from_dict(data["weighted_score"])
+        author.safety = TDigest.from_dict(data["negative_signal_safety"])
+        author.windows = {index: list(values) for index, *values in data["windows"]}
+        return author
+
+
+class AuthorAggregator:
+    """
+    Streaming per-author statistics over AnalysisResults.
+
+    Args:
+        half_life_days: Age at which a post counts half in the decayed
+            stats (counts, post-type mix, P(block) mean and both sketches)
+        window_days: Width of each block-risk trend window
+        history: Windows kept per author (older ones are dropped)
+        compression: t-digest compression (about 2x this many centroids
+            at most per sketch)
+
+    Posts may arrive in any time order; an older post simply carries less
+    weight than a newer one. bad_dates counts posts whose timestamp could
+    not be read.
+    """
+
+    def __init__(
+        self,
+        half_life_days: float = 30.0,
+        window_days: float = 1.0,
+        history: int = 30,
+        compression: float = 100,
+    ):
+        if half_life_days <= 0 or window_days <= 0 or history <= 0:
+            raise ValueError("half_life_days, window_days and history must be positive")
+        self.half_life = half_life_days * DAY
+        self.window = window_days * DAY
+        self.history = history
+        self.compression = compression
+        self.bad_dates = 0
+        self._authors = {}
+
+    def __len__(self) -> int:
+        return len(self._authors)
+
+    def authors(self) -> list:
+        return sorted(self._authors)
+
+    def add(self, author: str, result: AnalysisResult, timestamp=None) -> None:
+        """
+        Fold one analysis into the author's stats.
+
+        Args:
+            author: Author key
+            result: The post's AnalysisResult
+            timestamp: Posting time (Unix seconds, ISO-8601 string or
+                datetime; default: now). One that can't be read counts as
+                now, like a missing one, and is counted in bad_dates.
+        """
+        try:
+            when = to_timestamp(timestamp)
+        except ValueError:
+            when = None
+            self.bad_dates += 1
+        if when is None:
+            when = time.time()
+        state = self._authors.get(author)
+        if state is None:
+            state = self._authors[author] = _Author(when, self.compression)
+        weight = state.weight_at(when, self.half_life)
+
+        state.updated = max(state.updated, when)
+        state.posts += 1
+        state.weight += weight
+        name = result.post_type.value
+        state.post_types[name] = state.post_types.get(name, 0.0) + weight
+        state.p_block += result.probabilities.p_block * weight
+        state.scores.add(result.weighted_score, weight)
+        state.safety.add(result.negative_signal_safety, weight)
+
+        index = int(when // self.window)
+        if index not in state.windows and len(state.windows) >= self.history and index < min(state.windows):
+            return  # older than every kept window
+        window = state.windows.setdefault(index, [0, 0.0, 0.0, 0.0])
+        window[0] += 1
+        window[1] += result.probabilities.p_block
+        window[2] += result.negative_signal_safety
+        window[3] += result.weighted_score
+        state.trim_windows(self.history)
+
+    def update(self, rows: Iterable[tuple]) -> int:
+        """add() every (author, result) or (author, result, timestamp) row; returns the row count."""
+        count = 0
+        for row in rows:
+            self.add(*row)
+            count += 1
+        return count
+
+    def merge(self, other: Union["AuthorAggregator", dict]) -> None:
+        """
+        Fold another aggregator (or its snapshot) into this one.
+
+        Both must use the same half-life and window width. Each author's
+        decayed sums are brought to a common landmark and added.
+        """
+        if isinstance(other, dict):
+            other = AuthorAggregator.from_snapshot(other)
+        if not (math.isclose(other.half_life, self.half_life) and math.isclose(other.window, self.window)):
+            raise ValueError("can't merge aggregators with different half-life or window settings")
+        for author, theirs in other._authors.items():
+            mine = self._authors.get(author)
+            if mine is None:
+                mine = self._authors[author] = _Author(theirs.landmark, self.compression)
+            elif theirs.landmark > mine.landmark:
+                mine.rebase(theirs.landmark, self.half_life)
+            scale = 2.0 ** ((theirs.landmark - mine.landmark) / self.half_life)
+            mine.updated = max(mine.updated, theirs.updated)
+            mine.posts += theirs.posts
+            mine.weight += theirs.weight * scale
+            mine.p_block += theirs.p_block * scale
+            for name, weight in theirs.post_types.items():
+                mine.post_types[name] = mine.post_types.get(name, 0.0) + weight * scale
+            mine.scores.merge(theirs.scores, scale)
+            mine.safety.merge(theirs.safety, scale)
+            for index, values in theirs.windows.items():
+                window = mine.windows.setdefault(index, [0, 0.0, 0.0, 0.0])
+                for i, value in enumerate(values):
+                    window[i] += value
+            mine.trim_windows(self.history)
+
+    def summary(self, author: str, now=None, quantiles: tuple = (0.1, 0.5, 0.9)) -> dict:
+        """
+        JSON-ready stats for one author, decayed to now (default: the author's latest post).
+
+        Raises:
+            KeyError: Unknown author
+        """
+        state = self._authors[author]
+        when = state.updated if now is None else max(to_timestamp(now), state.updated)
+        factor = 2.0 ** ((state.landmark - when) / self.half_life)
+        weight = state.weight
+        mix = {
+            post_type.value: round(state.post_types.get(post_type.value, 0.0) / weight, 4) if weight else 0.0
+            for post_type in PostType
+        }
+        return {
+            "author": author,
+            "posts": state.posts,
+            "recent_weight": state.weight * factor,
+            "last_post": state.updated,
+            "post_type_mix": {name: share for name, share in mix.items() if share},
+            "mean_p_block": state.p_block / weight if weight else None,
+            "weighted_score": {f"p{round(q * 100)}": state.scores.quantile(q) for q in quantiles},
+            "negative_signal_safety": {f"p{round(q * 100)}": state.safety.quantile(q) for q in quantiles},
+            "block_risk_trend": [
+                {
+                    "window_start": index * self.window,
+                    "posts": posts,
+                    "mean_p_block": p_block / posts,
+                    "mean_safety": safety / posts,
+                    "mean_score": score / posts,
+                }
+                for index, (posts, p_block, safety, score) in sorted(state.windows.items())
+            ],
+        }
+
+    def snapshot(self) -> dict:
+        """JSON-ready state; AuthorAggregator.from_snapshot() or merge() reads it back."""
+        return {
+            "schema": SNAPSHOT_SCHEMA_VERSION,
+            "half_life_days": self.half_life / DAY,
+            "window_days": self.window / DAY,
+            "history": self.history,
+            "compression": self.compression,
+            "authors": {author: state.to_dict() for author, state in self._authors.items()},
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "AuthorAggregator":
+        if data.get("schema") != SNAPSHOT_SCHEMA_VERSION:
+            raise ValueError(f"unsupported snapshot schema {data.get('schema')!r} (expected {SNAPSHOT_SCHEMA_VERSION})")
+        aggregator = cls(data["half_life_days"], data["window_days"], data["history"], data["compression"])
+        aggregator._authors = {author: _Author.from_dict(state) for author, state in data["authors"].items()}
+        return aggregator
+
+
+def _field(record: dict, names: tuple):
+    return next((record[k] for k in names if record.get(k) not in (None, "")), None)
+
+
+def aggregate_records(
+    records: Iterable[dict],
+    aggregator: Optional[AuthorAggregator] = None,
+    workers: int = 1,
+) -> AuthorAggregator:
+    """
+    Analyze raw records (see corpus_stream.read_records) and aggregate them by author.
+
+    The author comes from AUTHOR_FIELDS and the time from post_index.DATE_FIELDS;
+    records without an author are skipped, and records without a readable date count as now.
+    """
+    if aggregator is None:
+        aggregator = AuthorAggregator()
+    authored = (record for record in records if _field(record, AUTHOR_FIELDS) is not None)
+    records, to_analyze = tee(authored)
+    results = analyze_posts(map(normalize_record, to_analyze), workers=workers)
+    for record, result in zip(records, results):
+        aggregator.add(str(_field(record, AUTHOR_FIELDS)), result, _field(record, DATE_FIELDS))
+    return aggregator
+
+
+def format_summary(summary: dict) -> str:
+    """One-line text view of a summary() dict."""
+    score, safety = summary["weighted_score"], summary["negative_signal_safety"]
+    mix = ", ".join(
+        f"{name} {share:.0%}"
+        for name, share in sorted(summary["post_type_mix"].items(), key=lambda item: -item[1])[:3]
+    )
+    trend = summary["block_risk_trend"]
+    risk = f"{trend[-1]['mean_p_block']:.4f}" if trend else "-"
+    return (
+        f"{summary['author']}: {summary['posts']} posts | score p50 {score.get('p50', 0):+.2f} "
+        f"(p10 {score.get('p10', 0):+.2f}, p90 {score.get('p90', 0):+.2f}) | safety p10 {safety.get('p10', 0):.0f} "
+        f"| P(block) {summary['mean_p_block']:.4f}, last window {risk} | {mix}"
+    )
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-author score distributions, post-type mix and block-risk trend.")
+    parser.add_argument("input", nargs="?", help="JSONL/CSV file (optionally .gz), or - for stdin")
+    parser.add_argument("--merge", nargs="+", metavar="SNAPSHOT", help="Merge snapshot files (instead of or after input)")
+    parser.add_argument("-o", "--output", help="Write the merged snapshot JSON here")
+    parser.add_argument("--format", choices=FORMATS, help="Input format (default: from extension)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for analysis (0 = all cores)")
+    parser.add_argument("--half-life", type=float, default=30.0, help="Decay half-life in days (default: 30; with --merge only, taken from the snapshots)")
+    parser.add_argument("--window", type=float, default=1.0, help="Block-risk trend window in days (default: 1)")
+    parser.add_argument("--history", type=int, default=30, help="Trend windows kept per author (default: 30)")
+    parser.add_argument("--json", action="store_true", help="Print one JSON summary per author")
+    args = parser.parse_args(argv)
+    if args.input is None and not args.merge:
+        parser.error("give an input file, --merge snapshots, or both")
+
+    snapshots = []
+    for path in args.merge or []:
+        with open(path, encoding="utf-8") as f:
+            snapshots.append(json.load(f))
+    if args.input is not None:
+        aggregator = AuthorAggregator(args.half_life, args.window, args.history)
+        aggregate_records(read_records(args.input, args.format), aggregator, workers=args.workers)
+    else:
+        # Merging only: adopt the first snapshot's settings
+        aggregator = AuthorAggregator.from_snapshot(snapshots.pop(0))
+    for snapshot in snapshots:
+        aggregator.merge(snapshot)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(aggregator.snapshot(), f, ensure_ascii=False)
+    for author in aggregator.authors():
+        summary = aggregator.summary(author)
+        print(json.dumps(summary, ensure_ascii=False) if args.json else format_summary(summary))
+    print(f"{len(aggregator)} authors ({aggregator.bad_dates} records with unreadable dates)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
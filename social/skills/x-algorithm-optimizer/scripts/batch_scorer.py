@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Vectorized batch scoring for the X post analyzer (requires NumPy).
+
+The text analyzers still run per post, but probability estimation and the
+weighted sum run over whole arrays: per-type multipliers and caps become
+table lookups, and every post is scored against the ActionWeights vector
+at once. Results match analyze_post() exactly.
+
+Usage:
+    from batch_scorer import component_matrix, estimate_probabilities_batch, weighted_scores_batch
+    components = component_matrix(posts)            # N x 7 int array
+    probs = estimate_probabilities_batch(components)  # N x 12, columns follow ACTIONS
+    scores = weighted_scores_batch(probs)             # N
+
+    # Or all at once
+    probs, scores = score_posts(posts)
+
+    # Weight sweeps: every post under every profile in one matrix product
+    names, weights = weight_matrix(load_weight_profiles("profiles.json"))
+    scores, ranks = sweep(probs, weights)            # both N x M; rank 1 = best
+"""
+
+import json
+import os
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from analyze_x_post import (
+    ACTIONS,
+    ADJUSTED_CAPS,
+    BLOCK_RATIOS,
+    POST_TYPE_CODES,
+    PROBABILITY_DIVISORS,
+    TYPE_ADJUSTMENTS,
+    ActionWeights,
+    PostType,
+    extract_features,
+    get_rules,
+    score_components,
+)
+from media_info import primary_media
+
+
+# Columns of the component matrix built by component_matrix()
+COMPONENT_COLUMNS = (
+    "post_type",
+    "reply_potential",
+    "shareability",
+    "media_optimization",
+    "negative_signal_safety",
+    "include_media",
+    "is_video",
+)
+COL = {name: i for i, name in enumerate(COMPONENT_COLUMNS)}
+
+# Column index of each action in the probability matrix
+ACTION_INDEX = {action: i for i, action in enumerate(ACTIONS)}
+
+
+def default_weights() -> np.ndarray:
+    """The active ActionWeights (see apply_profile) as a vector in ACTIONS order."""
+    return np.array([getattr(ActionWeights, action.upper()) for action in ACTIONS])
+
+
+def _build_type_tables() -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-PostType multiplier and cap tables, shape (len(PostType), len(ACTIONS)).
+
+    Built from the live TYPE_ADJUSTMENTS on each call, so loaded profiles apply.
+    """
+    multipliers = np.ones((len(PostType), len(ACTIONS)))
+    caps = np.full((len(PostType), len(ACTIONS)), np.inf)
+    for post_type, adjustments in TYPE_ADJUSTMENTS.items():
+        row = POST_TYPE_CODES[post_type]
+        for key, mult in adjustments.items():
+            col = ACTION_INDEX[key[2:]]
+            multipliers[row, col] = mult
+            caps[row, col] = ADJUSTED_CAPS[key]
+    return multipliers, caps
+
+
+def component_matrix(posts: Iterable[dict]) -> np.ndarray:
+    """
+    Score each post's components on the score-only fast path (no feedback).
+
+    Args:
+        posts: Dicts with keys: text, include_media (optional), media_type (optional),
+            media_files (optional; inspected as in analyze_post)
+
+    Returns:
+        int64 array of shape (N, len(COMPONENT_COLUMNS))
+    """
+    rules = get_rules()
+    rows = []
+    for post in posts:
+        include_media = post.get("include_media", False)
+        media_type = post.get("media_type")
+        media_info = primary_media(post.get("media_files"))
+        if media_info is not None:
+            include_media, media_type = True, media_type or media_info.media_type
+        post_type, reply, share, media, safety = score_components(
+            extract_features(post.get("text", ""), rules=rules), include_media, media_type, rules, media_info
+        )
+        rows.append((
+            POST_TYPE_CODES[post_type],
+            reply,
+            share,
+            media,
+            safety,
+            bool(include_media),
+            bool(include_media) and media_type == "video",
+        ))
+    return np.array(rows, dtype=np.int64).reshape(-1, len(COMPONENT_COLUMNS))
+
+
+def estimate_probabilities_batch(components: np.ndarray) -> np.ndarray:
+    """
+    Vectorized estimate_probabilities() over a component matrix.
+
+    Returns:
+        float64 array of shape (N, len(ACTIONS)); column order follows ACTIONS
+    """
+    components = np.asarray(components)
+    post_type = components[:, COL["post_type"]]
+    reply = components[:, COL["reply_potential"]]
+    share = components[:, COL["shareability"]]
+    media = components[:, COL["media_optimization"]]
+    safety = components[:, COL["negative_signal_safety"]]
+    include_media = components[:, COL["include_media"]].astype(bool)
+    is_video = components[:, COL["is_video"]].astype(bool)
+
+    probs = np.zeros((len(components), len(ACTIONS)))
+    a = ACTION_INDEX
+    d = PROBABILITY_DIVISORS
+
+    # Base estimates from scores
+    probs[:, a["reply"]] = np.minimum(0.35, reply / d["p_reply"])
+    probs[:, a["repost"]] = np.minimum(0.15, share / d["p_repost"])
+    probs[:, a["quote"]] = np.minimum(0.08, share / d["p_quote"])
+    probs[:, a["like"]] = np.minimum(0.20, (reply + share) / d["p_like"])
+    probs[:, a["bookmark"]] = np.minimum(0.10, share / d["p_bookmark"])
+    probs[:, a["profile_click"]] = np.minimum(0.08, share / d["p_profile_click"])
+    probs[:, a["click"]] = min(0.15, 0.05)
+
+    # Media probabilities
+    probs[:, a["video_view"]] = np.where(is_video, np.minimum(0.25, media / d["p_video_view"]), 0.0)
+    probs[:, a["photo_expand"]] = np.where(include_media & ~is_video, np.minimum(0.20, media / d["p_photo_expand"]), 0.0)
+
+    # Negative signals (mute/report follow the unadjusted block rate)
+    p_block = np.maximum(0.001, (100 - safety) / d["p_block"])
+    probs[:, a["block"]] = p_block
+    probs[:, a["mute"]] = p_block * BLOCK_RATIOS["p_mute"]
+    probs[:, a["report"]] = p_block * BLOCK_RATIOS["p_report"]
+
+    # Post type adjustments as table lookups; untouched cells keep mult 1.0 / cap inf
+    multipliers, caps = _build_type_tables()
+    cols = np.flatnonzero(np.isfinite(caps).any(axis=0))
+    probs[:, cols] = np.minimum(caps[post_type][:, cols], probs[:, cols] * multipliers[post_type][:, cols])
+
+    return probs
+
+
+def weighted_scores_batch(probs: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Score = Σ (w_i × P(action_i)) for every row of a probability matrix.
+
+    weights defaults to the active ActionWeights (default_weights()).
+
+    Terms are accumulated left to right in ACTIONS order, the same order as
+    calculate_weighted_score(), so results are bit-identical to the scalar path
+    (a BLAS dot product may reassociate the sum).
+    """
+    contributions = np.asarray(probs) * (default_weights() if weights is None else weights)
+    total = np.zeros(len(contributions))
+    for col in range(contributions.shape[1]):
+        total += contributions[:, col]
+    return total
+
+
+def score_posts(posts: Iterable[dict]) -> tuple[np.ndarray, np.ndarray]:
+    """Analyze posts and return (probability matrix, weighted scores)."""
+    probs = estimate_probabilities_batch(component_matrix(posts))
+    return probs, weighted_scores_batch(probs)
+
+
+# === Weight profiles and sweeps ===
+
+def weight_vector(overrides: Optional[dict] = None) -> np.ndarray:
+    """
+    The active ActionWeights as a vector in ACTIONS order, with some weights replaced.
+
+    Args:
+        overrides: {action: weight}; keys are action names ("reply") or
+            ActionWeights names ("REPLY"). Unlisted actions keep their default.
+    """
+    weights = default_weights()
+    for key, value in (overrides or {}).items():
+        action = key.lower()
+        if action not in ACTION_INDEX:
+            raise ValueError(f"unknown action {key!r} (expected one of: {', '.join(ACTIONS)})")
+        weights[ACTION_INDEX[action]] = float(value)
+    return weights
+
+
+def load_weight_profiles(path: str) -> dict:
+    """
+    Read weight profiles from JSON.
+
+    The file is either {"profiles": {name: {action: weight}}}, a single
+    {action: weight} mapping, or a full analyzer profile with a "weights"
+    section (see calibrate.py); single profiles are named after the file.
+    Each profile only lists the weights it changes.
+
+    Returns:
+        {name: weight vector in ACTIONS order}
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    if "profiles" in data:
+        profiles = data["profiles"]
+    elif isinstance(data.get("weights"), dict):
+        profiles = {os.path.splitext(os.path.basename(path))[0]: data["weights"]}
+    else:
+        profiles = {os.path.splitext(os.path.basename(path))[0]: data}
+    return {name: weight_vector(overrides) for name, overrides in profiles.items()}
+
+
+def weight_matrix(profiles: Union[dict, Iterable]) -> tuple[list, np.ndarray]:
+    """
+    Stack profiles into an M x len(ACTIONS) weight matrix.
+
+    Args:
+        profiles: {name: weight vector or overrides dict}, or a sequence of
+            weight vectors (named by position)
+
+    Returns:
+        (names, weights)
+    """
+    if not isinstance(profiles, dict):
+        profiles = dict(enumerate(profiles))
+    names = list(profiles)
+    rows = [
+        weight_vector(profile) if isinstance(profile, dict) else np.asarray(profile, dtype=float)
+        for profile in profiles.values()
+    ]
+    weights = np.array(rows, dtype=float).reshape(-1, len(ACTIONS))
+    return names, weights
+
+
+def perturbed_weights(count: int, spread: float = 0.25, base: Optional[np.ndarray] = None, seed: int = 0) -> np.ndarray:
+    """
+    Random weight variants for sensitivity analysis.
+
+    Each weight is scaled by an independent uniform factor in
+    [1 - spread, 1 + spread], so signs are preserved. base defaults to
+    the active ActionWeights.
+
+    Returns:
+        count x len(ACTIONS) weight matrix
+    """
+    base = default_weights() if base is None else base
+    rng = np.random.default_rng(seed)
+    return base * rng.uniform(1 - spread, 1 + spread, size=(count, len(base)))
+
+
+def rank_columns(scores: np.ndarray) -> np.ndarray:
+    """Rank of each row within each column (1 = highest score; ties keep input order)."""
+    scores = np.asarray(scores)
+    order = np.argsort(-scores, axis=0, kind="stable")
+    ranks = np.empty(scores.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, np.arange(1, len(scores) + 1)[:, None], axis=0)
+    return ranks
+
+
+def sweep(probs: np.ndarray, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score every post under every weight profile.
+
+    The probability matrix does not depend on the weights, so it is computed
+    once and multiplied by the weight matrix. The product may differ from
+    weighted_scores_batch() in the last bit, because BLAS can sum the terms
+    in a different order.
+
+    Args:
+        probs: N x len(ACTIONS) matrix from estimate_probabilities_batch()
+        weights: M x len(ACTIONS) matrix from weight_matrix() or perturbed_weights()
+
+    Returns:
+        (scores, ranks), both N x M
+    """
+    scores = np.asarray(probs) @ np.atleast_2d(weights).T
+    return scores, rank_columns(scores)
+
+
+def sweep_posts(posts: Iterable[dict], profiles: Union[dict, Iterable]) -> tuple[list, np.ndarray, np.ndarray]:
+    """Analyze posts once and return (profile names, scores, ranks) under every profile."""
+    names, weights = weight_matrix(profiles)
+    probs = estimate_probabilities_batch(component_matrix(posts))
+    scores, ranks = sweep(probs, weights)
+    return names, scores, ranks
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmarks for the X post analyzer.
+
+Generates a seeded synthetic corpus that covers every PostType, several
+length bands and every media combination, including adversarial long and
+emoji-heavy posts. Then it times analyze_post, quick_score, compare_posts
+and format_report. Results (posts/sec, p50/p99/mean latency) are saved as
+JSON so runs from different versions can be compared.
+
+Usage:
+    python scripts/benchmark.py --posts 5000 --seed 42 -o bench.json
+    python scripts/benchmark.py -o new.json --compare bench.json --threshold 0.10
+
+    from benchmark import generate_corpus, run_benchmarks
+    corpus = generate_corpus(1000, seed=7)
+    report = run_benchmarks(corpus)
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Optional
+
+from analyze_x_post import PostType, analyze_post, compare_posts, format_report, quick_score
+
+
+# === Synthetic corpus ===
+
+TOPICS = ["hiring", "pricing", "cold email", "fundraising", "remote work", "SEO", "onboarding", "writing", "churn"]
+NOUNS = ["founders", "marketers", "engineers", "creators", "PMs", "designers"]
+FILLER = (
+    "most teams overthink this and ship too late while the real work happens in small loops "
+    "you learn more from ten conversations than from a hundred dashboards and the data agrees"
+).split()
+EMOJI = ["🚀", "🔥", "💡", "📈", "🧠", "✅", "👇", "😅", "🎯", "🙌"]
+
+# One generator per PostType; each returns the core text for that format
+TEMPLATES = {
+    PostType.FILL_BLANK: lambda r: f"The most underrated skill for {r.choice(NOUNS)} is ___",
+    PostType.OPEN_QUESTION: lambda r: f"What's your biggest {r.choice(TOPICS)} lesson from this year?",
+    PostType.CONTRARIAN: lambda r: (
+        f"Unpopular opinion: {r.choice(TOPICS)} is overrated."
+        + (" But here's the nuance: context matters." if r.random() < 0.5 else "")
+    ),
+    PostType.THREAD_HOOK: lambda r: f"Here's the playbook we used to fix {r.choice(TOPICS)} 🧵",
+    PostType.DATA_DROP: lambda r: (
+        f"I analyzed {r.randint(100, 90000)} posts. {r.randint(5, 95)}% of reach came from {r.randint(2, 30)}% of them."
+    ),
+    PostType.FRAMEWORK: lambda r: f"The {r.choice(['ICE', 'RICE', 'AARRR', 'JTBD'])} framework for {r.choice(TOPICS)}:",
+    PostType.MISTAKE_ADMISSION: lambda r: f"Biggest mistake I made with {r.choice(TOPICS)}: waiting too long.",
+    PostType.LIST: lambda r: f"{r.randint(3, 12)} {r.choice(['tips', 'lessons', 'things', 'ways'])} for {r.choice(NOUNS)}",
+    PostType.LINK_DUMP: lambda r: f"New post: https://example.com/{r.choice(TOPICS).replace(' ', '-')}",
+    PostType.GENERIC: lambda r: " ".join(r.choice(FILLER) for _ in range(r.randint(6, 14))),
+}
+
+# Target character lengths per band (adversarial = worst case for scanning)
+LENGTH_BANDS = {
+    "short": (10, 49),
+    "optimal": (71, 100),
+    "medium": (101, 280),
+    "long": (281, 1200),
+    "adversarial": (3500, 4000),
+}
+
+MEDIA_COMBOS = [(False, None), (True, "image"), (True, "video"), (True, "gif")]
+
+
+# Near-miss fragments: they hit the literal index but fail the confirming regex
+NEAR_MISSES = ["framewor", "threa", "analyz", "percen", "50", "tip", "biggest", "hot", "what's"]
+
+
+def _filler_word(r: random.Random, post_type: PostType, emoji_heavy: bool) -> str:
+    if post_type is PostType.LINK_DUMP:
+        # Padding with more links keeps the post a link dump at every length
+        return f"https://example.com/{r.randint(0, 10**9)}"
+    if emoji_heavy and r.random() < 0.5:
+        return r.choice(EMOJI) * r.randint(1, 3)
+    return r.choice(FILLER)
+
+
+def _fit_length(r: random.Random, text: str, post_type: PostType, band: str, emoji_heavy: bool) -> str:
+    lo, hi = LENGTH_BANDS[band]
+    target = r.randint(lo, hi)
+    words = []
+    while len(text) + sum(len(w) + 1 for w in words) < target:
+        if band == "adversarial" and post_type is not PostType.LINK_DUMP and r.random() < 0.2:
+            # Shouting and near-miss phrases keep every rule group busy
+            words.append(r.choice(NEAR_MISSES).upper())
+        else:
+            words.append(_filler_word(r, post_type, emoji_heavy))
+    padded = text + (" " + " ".join(words) if words else "")
+    return padded[:hi]
+
+
+def generate_corpus(n: int, seed: int = 0) -> list[dict]:
+    """
+    Seeded synthetic posts cycling through every PostType, length band and media combo.
+
+    Each post dict has text, include_media, media_type plus the template,
+    band and emoji_heavy labels it was generated from.
+    """
+    r = random.Random(seed)
+    types = list(TEMPLATES)
+    bands = list(LENGTH_BANDS)
+    corpus = []
+    for i in range(n):
+        post_type = types[i % len(types)]
+        band = bands[(i // len(types)) % len(bands)]
+        include_media, media_type = MEDIA_COMBOS[(i // (len(types) * len(bands))) % len(MEDIA_COMBOS)]
+        emoji_heavy = r.random() < 0.2
+        text = _fit_length(r, TEMPLATES[post_type](r), post_type, band, emoji_heavy)
+        corpus.append({
+            "text": text,
+            "include_media": include_media,
+            "media_type": media_type,
+            "template": post_type.value,
+            "band": band,
+            "emoji_heavy": emoji_heavy,
+        })
+    return corpus
+
+
+# === Timing ===
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def measure(fn: Callable, calls: list, items_per_call: int = 1, warmup: int = 50) -> dict:
+    """
+    Time fn(*args) for each args tuple in calls.
+
+    Returns posts/sec plus p50/p99/mean latency per call in microseconds.
+    """
+    for args in calls[:warmup]:
+        fn(*args)
+    latencies = []
+    clock = time.perf_counter_ns
+    start = clock()
+    for args in calls:
+        t0 = clock()
+        fn(*args)
+        latencies.append(clock() - t0)
+    elapsed = (clock() - start) / 1e9
+    latencies.sort()
+    return {
+        "calls": len(calls),
+        "posts_per_sec": len(calls) * items_per_call / elapsed if elapsed else 0.0,
+        "p50_us": _percentile(latencies, 0.50) / 1e3,
+        "p99_us": _percentile(latencies, 0.99) / 1e3,
+        "mean_us": sum(latencies) / len(latencies) / 1e3 if latencies else 0.0,
+    }
+
+
+def run_benchmarks(corpus: list[dict], compare_size: int = 20) -> dict:
+    """Benchmark every entry point over the corpus."""
+    post_args = [(p["text"], p["include_media"], p["media_type"]) for p in corpus]
+    results = [analyze_post(*args) for args in post_args]
+    groups = [(corpus[i:i + compare_size],) for i in range(0, len(corpus), compare_size)]
+
+    return {
+        "analyze_post": measure(analyze_post, post_args),
+        "quick_score": measure(quick_score, post_args),
+        "compare_posts": measure(compare_posts, groups, items_per_call=compare_size, warmup=2),
+        "format_report": measure(format_report, [(r,) for r in results]),
+    }
+
+
+def compare_reports(current: dict, baseline: dict, threshold: float = 0.10) -> tuple[list, bool]:
+    """
+    Compare two saved reports.
+
+    Returns (lines, regressed) where regressed is True if any benchmark's
+    throughput dropped by more than threshold.
+    """
+    lines = [f"{'benchmark':<16}{'baseline/s':>14}{'current/s':>14}{'change':>10}"]
+    regressed = False
+    for name, now in current["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before:
+            continue
+        change = now["posts_per_sec"] / before["posts_per_sec"] - 1 if before["posts_per_sec"] else 0.0
+        flag = ""
+        if change < -threshold:
+            regressed = True
+            flag = "  REGRESSION"
+        lines.append(f"{name:<16}{before['posts_per_sec']:>14.0f}{now['posts_per_sec']:>14.0f}{change:>+10.1%}{flag}")
+    return lines, regressed
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the X post analyzer.")
+    parser.add_argument("--posts", type=int, default=5000, help="Corpus size (default: 5000)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed (default: 0)")
+    parser.add_argument("--label", default="current", help="Name stored with the results")
+    parser.add_argument("-o", "--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Throughput drop flagged as regression")
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.posts, args.seed)
+    report = {
+        "label": args.label,
+        "posts": args.posts,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": run_benchmarks(corpus),
+    }
+
+    print(f"{'benchmark':<16}{'posts/s':>12}{'p50 us':>10}{'p99 us':>10}")
+    for name, stats in report["benchmarks"].items():
+        print(f"{name:<16}{stats['posts_per_sec']:>12.0f}{stats['p50_us']:>10.1f}{stats['p99_us']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressed = compare_reports(report, baseline, args.threshold)
+        print()
+        print("\n".join(lines))
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
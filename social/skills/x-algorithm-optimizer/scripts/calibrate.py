@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Calibrate the probability model and action weights against engagement logs (requires NumPy).
+
+Streams historical posts with observed engagement from JSONL or CSV
+(optionally gzipped) and fits the constants behind estimate_probabilities():
+the score divisors (reply_score / 300, share_score / 700, ...), the per-type
+multipliers in TYPE_ADJUSTMENTS and the mute/report ratios. With a target
+column it also fits ActionWeights. The result is a profile JSON that
+load_profile() (or batch_scorer.load_weight_profiles) reads.
+
+Each record needs text, impressions and engagement counts in columns named
+after ACTIONS (reply, repost, quote, like, video_view, photo_expand,
+bookmark, click, profile_click, block, mute, report); include_media and
+media_type are optional, and missing count columns are skipped. Rows are
+processed in mini-batches. Every fit is a least-squares problem whose
+sufficient statistics are summed batch by batch, so memory depends on the
+batch size, not on the row count.
+
+Usage:
+    python scripts/calibrate.py engagement.jsonl.gz -o profile.json
+    python scripts/calibrate.py engagement.csv -o profile.json --target follows --batch 50000
+
+    from calibrate import Calibrator
+    calibrator = Calibrator()
+    for batch in batches:
+        calibrator.update(batch)
+    profile = calibrator.profile()
+"""
+
+import argparse
+import json
+import sys
+from itertools import islice
+from typing import Iterable, Optional
+
+import numpy as np
+
+from analyze_x_post import (
+    ACTIONS,
+    ADJUSTED_CAPS,
+    BLOCK_RATIOS,
+    POST_TYPE_CODES,
+    TYPE_ADJUSTMENTS,
+    PostType,
+    current_profile,
+)
+from batch_scorer import COL, component_matrix, default_weights, estimate_probabilities_batch
+from corpus_stream import FORMATS, normalize_record, read_records
+
+
+# Actions whose probability is driver / divisor; the rest are constant (click)
+# or follow the block rate (mute, report)
+DRIVEN_ACTIONS = ("reply", "repost", "quote", "like", "bookmark", "profile_click", "video_view", "photo_expand", "block")
+_DRIVEN_INDEX = {action: i for i, action in enumerate(DRIVEN_ACTIONS)}
+
+# Caps estimate_probabilities() applies before type adjustments
+BASE_CAPS = {
+    "p_reply": 0.35,
+    "p_repost": 0.15,
+    "p_quote": 0.08,
+    "p_like": 0.20,
+    "p_bookmark": 0.10,
+    "p_profile_click": 0.08,
+    "p_video_view": 0.25,
+    "p_photo_expand": 0.20,
+    "p_block": 1.0,
+}
+
+
+def _cap_table() -> np.ndarray:
+    """Effective cap per (post type, driven action) under the current TYPE_ADJUSTMENTS."""
+    caps = np.empty((len(PostType), len(DRIVEN_ACTIONS)))
+    for post_type in PostType:
+        adjustments = TYPE_ADJUSTMENTS.get(post_type, {})
+        for action, col in _DRIVEN_INDEX.items():
+            key = f"p_{action}"
+            cap = BASE_CAPS[key]
+            if key in adjustments:
+                cap = min(ADJUSTED_CAPS[key], cap * adjustments[key])
+            caps[POST_TYPE_CODES[post_type], col] = cap
+    return caps
+
+
+def _drivers(components: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Driver value for each DRIVEN_ACTIONS column and whether it applies.
+
+    Returns:
+        (x, applies), both N x len(DRIVEN_ACTIONS)
+    """
+    reply = components[:, COL["reply_potential"]].astype(float)
+    share = components[:, COL["shareability"]].astype(float)
+    media = components[:, COL["media_optimization"]].astype(float)
+    safety = components[:, COL["negative_signal_safety"]].astype(float)
+    include_media = components[:, COL["include_media"]].astype(bool)
+    is_video = components[:, COL["is_video"]].astype(bool)
+
+    x = np.column_stack([reply, share, share, reply + share, share, share, media, media, 100 - safety])
+    applies = np.ones(x.shape, dtype=bool)
+    applies[:, _DRIVEN_INDEX["video_view"]] = is_video
+    applies[:, _DRIVEN_INDEX["photo_expand"]] = include_media & ~is_video
+    return x, applies
+
+
+class Calibrator:
+    """
+    Mini-batch accumulator for the probability model and, optionally, the weights.
+
+    Probabilities: for every (post type, driven action) the impression-weighted
+    sums Σ w·x·r and Σ w·x² are kept, where x is the driver score and r the
+    observed rate; the least-squares slope r ≈ s·x is their ratio. The
+    divisor is 1 / slope pooled over the types with no adjustment for that
+    action, and a type's multiplier is its own slope over that base slope.
+    Rows whose modelled probability for an action is already at its cap
+    carry no slope information (the model no longer follows the driver
+    there) and are skipped for that action; mute and report ratios come from
+    types without a block adjustment, since they follow the unadjusted block
+    rate. Count cells that are blank or not numbers ("n/a", "1,204") are
+    treated as missing, and rows with unreadable cells are counted.
+
+    Weights: when a target is given, the target is turned into a rate like
+    the counts, and the impression-weighted Xᵀ W X and Xᵀ W y over the rate
+    vectors X and target rates y are kept. They are solved as ridge
+    regression pulled toward the current ActionWeights, so the fitted
+    weights do not depend on audience size.
+    """
+
+    def __init__(self, target: Optional[str] = None):
+        self.target = target
+        n_types, n_driven = len(PostType), len(DRIVEN_ACTIONS)
+        self.rows = 0
+        self.skipped = 0
+        self.malformed = 0
+        self.impressions = 0.0
+        self.sxy = np.zeros((n_types, n_driven))
+        self.sxx = np.zeros((n_types, n_driven))
+        self.support = np.zeros((n_types, n_driven))
+        self.type_totals = np.zeros((n_types, len(ACTIONS)))
+        self._caps = _cap_table()
+        self.xtx = np.zeros((len(ACTIONS), len(ACTIONS)))
+        self.xty = np.zeros(len(ACTIONS))
+        self.target_rows = 0
+
+    def update(self, records: Iterable[dict]) -> None:
+        """Add one mini-batch of raw records (text, impressions, counts per action)."""
+        posts, impressions, counts, targets = [], [], [], []
+        for record in records:
+            try:
+                shown = float(record.get("impressions") or 0)
+            except (TypeError, ValueError):
+                shown = 0.0
+            if shown <= 0:
+                self.skipped += 1
+                continue
+            posts.append(normalize_record(record))
+            impressions.append(shown)
+            columns = ACTIONS if self.target is None else (*ACTIONS, self.target)
+            values = [_count(record.get(column)) for column in columns]
+            if any(np.isnan(v) and record.get(c) not in (None, "") for c, v in zip(columns, values)):
+                self.malformed += 1
+            counts.append(values[:len(ACTIONS)])
+            if self.target is not None:
+                targets.append(values[-1])
+        if not posts:
+            return
+
+        w = np.array(impressions)
+        counts = np.array(counts)  # N x len(ACTIONS), NaN where the column is missing
+        rates = counts / w[:, None]
+        components = component_matrix(posts)
+        types = components[:, COL["post_type"]]
+        x, applies = _drivers(components)
+        model = estimate_probabilities_batch(components)
+
+        n_types = len(PostType)
+        for action, col in _DRIVEN_INDEX.items():
+            r = rates[:, ACTIONS.index(action)]
+            capped = model[:, ACTIONS.index(action)] >= self._caps[types, col] * (1 - 1e-9)
+            ok = applies[:, col] & ~np.isnan(r) & ~capped
+            self.sxy[:, col] += np.bincount(types[ok], weights=(w * x[:, col] * r)[ok], minlength=n_types)
+            self.sxx[:, col] += np.bincount(types[ok], weights=(w * x[:, col] ** 2)[ok], minlength=n_types)
+            self.support[:, col] += np.bincount(types[ok], weights=w[ok], minlength=n_types)
+
+        np.add.at(self.type_totals, types, np.nan_to_num(counts))
+
+        if self.target is not None:
+            # Missing count columns count as zero here; the ridge keeps their weights near w0
+            y = np.array(targets) / w
+            ok = ~np.isnan(y)
+            X = np.nan_to_num(rates[ok])
+            self.xtx += X.T @ (w[ok, None] * X)
+            self.xty += X.T @ (w[ok] * y[ok])
+            self.target_rows += int(ok.sum())
+
+        self.rows += len(posts)
+        self.impressions += float(w.sum())
+
+    def fit_probability_model(self, min_impressions: float = 10_000, min_effect: float = 0.05) -> dict:
+        """
+        Fitted divisors, type multipliers and block ratios as profile sections.
+
+        Multipliers need min_impressions of support. A multiplier is emitted
+        when the pair is already adjusted in TYPE_ADJUSTMENTS, or when it
+        differs from 1 by at least min_effect.
+        """
+        divisors, adjustments = {}, {}
+        for action, col in _DRIVEN_INDEX.items():
+            key = f"p_{action}"
+            adjusted = np.array([key in TYPE_ADJUSTMENTS.get(t, {}) for t in PostType])
+            base_xx = self.sxx[~adjusted, col].sum()
+            base_xy = self.sxy[~adjusted, col].sum()
+            if base_xx <= 0 or base_xy <= 0:
+                continue
+            base_slope = base_xy / base_xx
+            divisors[key] = 1 / base_slope
+
+            if key not in ADJUSTED_CAPS:
+                continue
+            for post_type in PostType:
+                row = POST_TYPE_CODES[post_type]
+                if self.support[row, col] < min_impressions or self.sxx[row, col] <= 0:
+                    continue
+                mult = (self.sxy[row, col] / self.sxx[row, col]) / base_slope
+                if adjusted[row] or abs(mult - 1) >= min_effect:
+                    adjustments.setdefault(post_type.value, {})[key] = round(mult, 4)
+
+        ratios = {}
+        unadjusted = np.array(["p_block" not in TYPE_ADJUSTMENTS.get(t, {}) for t in PostType])
+        totals = dict(zip(ACTIONS, self.type_totals[unadjusted].sum(axis=0)))
+        if totals["block"] > 0:
+            for key in BLOCK_RATIOS:
+                ratios[key] = float(totals[key[2:]] / totals["block"])
+
+        return {
+            "probability_divisors": {key: round(value, 3) for key, value in divisors.items()},
+            "block_ratios": {key: round(value, 4) for key, value in ratios.items()},
+            "type_adjustments": adjustments,
+        }
+
+    def fit_weights(self, ridge: float = 1.0) -> dict:
+        """
+        ActionWeights fitted to the target, or {} without one.
+
+        Solves (XᵀWX + λI) b = XᵀWy + λ b₀ with λ = ridge × mean(diag XᵀWX),
+        so actions the data can't separate stay near their current weights b₀.
+        """
+        if self.target is None or self.target_rows == 0:
+            return {}
+        prior = default_weights()
+        lam = ridge * np.trace(self.xtx) / len(ACTIONS)
+        weights = np.linalg.solve(self.xtx + lam * np.eye(len(ACTIONS)), self.xty + lam * prior)
+        return {action: round(float(value), 4) for action, value in zip(ACTIONS, weights)}
+
+    def profile(self, min_impressions: float = 10_000, min_effect: float = 0.05, ridge: float = 1.0) -> dict:
+        """Complete profile: the current settings overlaid with everything fitted."""
+        profile = current_profile()
+        fitted = self.fit_probability_model(min_impressions, min_effect)
+        profile["probability_divisors"].update(fitted["probability_divisors"])
+        profile["block_ratios"].update(fitted["block_ratios"])
+        for name, adj in fitted["type_adjustments"].items():
+            profile["type_adjustments"].setdefault(name, {}).update(adj)
+        weights = self.fit_weights(ridge)
+        profile["weights"].update(weights)
+        profile["calibration"] = {
+            "rows": self.rows,
+            "skipped": self.skipped,
+            "malformed": self.malformed,
+            "impressions": self.impressions,
+            "target": self.target if weights else None,
+            "fitted_divisors": sorted(fitted["probability_divisors"]),
+            "support": {
+                action: float(self.support[:, col].sum()) for action, col in _DRIVEN_INDEX.items()
+            },
+        }
+        return profile
+
+
+def _count(value) -> float:
+    """Numeric column value, or NaN if it is missing, blank or not a number."""
+    if value is None or value == "":
+        return float("nan")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def calibrate(records: Iterable[dict], batch_size: int = 10_000, target: Optional[str] = None, **fit_kwargs) -> dict:
+    """Stream records through a Calibrator in mini-batches and return the fitted profile."""
+    calibrator = Calibrator(target=target)
+    records = iter(records)
+    while batch := list(islice(records, batch_size)):
+        calibrator.update(batch)
+    return calibrator.profile(**fit_kwargs)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fit analyzer coefficients and weights from engagement logs.")
+    parser.add_argument("input", help="JSONL/CSV file (optionally .gz), or - for stdin")
+    parser.add_argument("-o", "--output", required=True, help="Profile JSON to write")
+    parser.add_argument("--format", choices=FORMATS, help="Input format (default: from extension)")
+    parser.add_argument("--target", help="Outcome column to fit ActionWeights against (default: keep weights)")
+    parser.add_argument("--batch", type=int, default=10_000, help="Rows per mini-batch (default: 10000)")
+    parser.add_argument("--min-impressions", type=float, default=10_000, help="Support needed to fit a type multiplier")
+    parser.add_argument("--min-effect", type=float, default=0.05, help="Smallest new multiplier effect to emit")
+    parser.add_argument("--ridge", type=float, default=1.0, help="Pull of fitted weights toward the current ones")
+    args = parser.parse_args(argv)
+
+    profile = calibrate(
+        read_records(args.input, args.format),
+        batch_size=args.batch,
+        target=args.target,
+        min_impressions=args.min_impressions,
+        min_effect=args.min_effect,
+        ridge=args.ridge,
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    info = profile["calibration"]
+    print(
+        f"Calibrated on {info['rows']} rows ({info['skipped']} skipped, {info['malformed']} with unreadable counts); "
+        f"wrote {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
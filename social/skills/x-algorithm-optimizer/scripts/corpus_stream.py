@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Streaming corpus analysis for the X post analyzer.
+
+Reads posts lazily from JSONL or CSV (optionally gzipped) or stdin, analyzes
+them one at a time, and writes one JSON result per line as it goes. Memory
+use stays constant regardless of corpus size.
+
+Records use the same keys as compare_posts(): text, include_media (optional),
+media_type (optional), media_files (optional; a JSON list, or ";"-separated
+paths in CSV). An "id" field, if present, is copied to the output.
+
+Usage:
+    python scripts/corpus_stream.py posts.jsonl -o results.jsonl
+    cat posts.csv | python scripts/corpus_stream.py - --format csv
+
+    from corpus_stream import read_posts, iter_analyses
+    for post, result in iter_analyses(read_posts("posts.jsonl")):
+        ...
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+from itertools import tee
+from typing import IO, Iterable, Iterator, Optional, Union
+
+from analyze_x_post import AnalysisResult, analyze_posts
+
+
+FORMATS = ("jsonl", "csv")
+_TRUE_STRINGS = {"1", "true", "yes", "y", "t"}
+
+
+def _detect_format(name: str) -> str:
+    name = name.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def _open_text(path: str) -> IO[str]:
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE_STRINGS
+    return bool(value)
+
+
+def normalize_record(record: dict) -> dict:
+    """Coerce a raw record to the compare_posts() shape."""
+    post = {
+        "text": record.get("text") or "",
+        "include_media": _as_bool(record.get("include_media", False)),
+        "media_type": record.get("media_type") or None,
+    }
+    media_files = record.get("media_files")
+    if isinstance(media_files, str):
+        media_files = [path.strip() for path in media_files.split(";") if path.strip()]
+    if media_files:
+        post["media_files"] = media_files
+    if record.get("id") not in (None, ""):
+        post["id"] = record["id"]
+    return post
+
+
+def read_posts(source: Union[str, IO[str]], fmt: Optional[str] = None) -> Iterator[dict]:
+    """
+    Lazily yield post dicts from a JSONL/CSV path, "-" for stdin, or an open text file.
+
+    Blank JSONL lines are skipped.
+    """
+    return map(normalize_record, read_records(source, fmt))
+
+
+def read_records(source: Union[str, IO[str]], fmt: Optional[str] = None) -> Iterator[dict]:
+    """Lazily yield raw records (every column, unconverted) from the same sources as read_posts."""
+    if isinstance(source, str):
+        fmt = fmt or ("jsonl" if source == "-" else _detect_format(source))
+        handle = _open_text(source)
+        close = source != "-"
+    else:
+        fmt = fmt or _detect_format(getattr(source, "name", ""))
+        handle = source
+        close = False
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+
+    try:
+        if fmt == "csv":
+            csv.field_size_limit(sys.maxsize)
+            for record in csv.DictReader(handle):
+                yield record
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if close:
+            handle.close()
+
+
+def iter_analyses(
+    posts: Iterable[dict],
+    workers: int = 1,
+    chunksize: int = 256,
+) -> Iterator[tuple[dict, AnalysisResult]]:
+    """Analyze posts in input order, yielding (post, result) pairs."""
+    posts, to_analyze = tee(posts)
+    yield from zip(posts, analyze_posts(to_analyze, workers=workers, chunksize=chunksize))
+
+
+def result_record(post: dict, result: AnalysisResult) -> dict:
+    """Flat, JSON-ready summary of one analysis."""
+    record = {"id": post["id"]} if "id" in post else {}
+    record.update({
+        "weighted_score": result.weighted_score,
+        "overall_score": result.overall_score,
+        "post_type": result.post_type.value,
+        "reply_potential": result.reply_potential,
+        "shareability": result.shareability,
+        "media_optimization": result.media_optimization,
+        "negative_signal_safety": result.negative_signal_safety,
+        "char_count": result.char_count,
+        "word_count": result.word_count,
+    })
+    return record
+
+
+def stream_analyze(
+    source: Union[str, IO[str]],
+    out: IO[str],
+    fmt: Optional[str] = None,
+    buffer_lines: int = 1000,
+    workers: int = 1,
+) -> int:
+    """
+    Analyze every post in source and write one JSON result per line to out.
+
+    At most buffer_lines results are held before being written. With
+    workers > 1, posts are analyzed across a process pool (see analyze_posts).
+
+    Returns:
+        Number of posts analyzed
+    """
+    buffer = []
+    count = 0
+    for post, result in iter_analyses(read_posts(source, fmt), workers=workers):
+        buffer.append(json.dumps(result_record(post, result), ensure_ascii=False) + "\n")
+        count += 1
+        if len(buffer) >= buffer_lines:
+            out.writelines(buffer)
+            buffer.clear()
+    out.writelines(buffer)
+    out.flush()
+    return count
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream-analyze a corpus of X posts.")
+    parser.add_argument("input", help="JSONL/CSV file (optionally .gz), or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Output JSONL file (default: stdout)")
+    parser.add_argument("--format", choices=FORMATS, help="Input format (default: from extension)")
+    parser.add_argument("--buffer", type=int, default=1000, help="Results buffered per write")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = all cores)")
+    args = parser.parse_args(argv)
+
+    if args.output == "-":
+        count = stream_analyze(args.input, sys.stdout, args.format, args.buffer, args.workers)
+    else:
+        with open(args.output, "w", encoding="utf-8") as out:
+            count = stream_analyze(args.input, out, args.format, args.buffer, args.workers)
+
+    print(f"Analyzed {count} posts", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate clustering for draft pools (requires NumPy).
+
+Generated drafts often differ by a word or two. Each post is reduced to
+character shingles and a MinHash signature, and an LSH index (banded
+signature buckets) finds near-duplicates without comparing every pair. Only
+one representative per cluster is analyzed, so rankings are not flooded
+with copies and analyze_post() runs once per distinct idea. Posts with
+different media settings or attached files (by format, dimensions and
+duration) never share a cluster, since media changes the score.
+
+Usage:
+    from dedupe import cluster_posts, compare_posts_deduped, score_posts_deduped
+    clusters = cluster_posts(posts, threshold=0.8)      # [[0, 3, 7], [1], ...]
+    print(compare_posts_deduped(posts, top_k=10))
+    reps, sizes, probs, scores = score_posts_deduped(posts)
+
+    index = NearDuplicateIndex(threshold=0.8)
+    for post in stream:
+        representative = index.add(post["text"])      # index of the first similar post
+"""
+
+import re
+from typing import Hashable, Iterable, Optional
+
+import numpy as np
+
+from analyze_x_post import AnalysisResult, post_args, rank_posts
+from media_info import primary_media
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _canonical_bytes(text: str, size: int) -> bytes:
+    """Lowercased UTF-8 with whitespace runs collapsed, padded to at least one shingle."""
+    data = _WHITESPACE_RE.sub(" ", text.lower()).strip().encode("utf-8")
+    return data.ljust(size, b"\0")
+
+
+def shingle_hashes(texts: list, size: int = 5) -> tuple[np.ndarray, np.ndarray]:
+    """
+    32-bit hashes of the character shingles of many texts at once.
+
+    Texts are normalized (see _canonical_bytes) and concatenated; every byte window
+    of the given size that lies inside one text is hashed with a vectorized
+    polynomial hash.
+
+    Returns:
+        (hashes, starts): all window hashes, and the offset of each text's
+        first window in hashes
+    """
+    encoded = [_canonical_bytes(text, size) for text in texts]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint32)
+
+    windows = lengths - size + 1
+    text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    # Window start offsets in data, text by text
+    window_starts = np.repeat(text_starts - np.concatenate(([0], np.cumsum(windows)[:-1])), windows)
+    window_starts += np.arange(len(window_starts))
+
+    hashes = np.zeros(len(window_starts), dtype=np.uint32)
+    for col in range(size):
+        hashes = hashes * np.uint32(16777619) + data[window_starts + col]
+    return hashes, np.concatenate(([0], np.cumsum(windows)[:-1]))
+
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash LSH index over cluster representatives.
+
+    The first post of each cluster is its representative and is the only
+    member stored in the LSH buckets, so bucket sizes stay bounded by the
+    number of distinct clusters however many copies arrive. add() puts a
+    post in the earliest cluster whose representative has an estimated
+    Jaccard similarity (of shingle sets) >= threshold, or starts a new one.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Odd multipliers make each x -> a*x + b (mod 2**32) a permutation
+        self._a = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint32) * np.uint32(2) + np.uint32(1)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint32)
+        self._band_mix = rng.integers(1, 1 << 63, size=self.rows, dtype=np.uint64)
+        self._buckets = {}
+        self._rep_signatures = np.empty((64, num_perm), dtype=np.uint32)
+        self._reps = []
+        self._cluster_of = []
+
+    def signatures(self, texts: list, chunk_windows: int = 1 << 16) -> np.ndarray:
+        """
+        MinHash signatures (N x num_perm): the minimum of each hash permutation
+        over a text's shingles, computed for a chunk of texts at a time.
+        """
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(texts):
+            # Grow the chunk until it holds about chunk_windows shingles
+            stop, windows = start, 0
+            while stop < len(texts) and (windows < chunk_windows or stop == start):
+                windows += max(len(texts[stop]), self.shingle_size)
+                stop += 1
+            hashes, starts = shingle_hashes(texts[start:stop], self.shingle_size)
+            # num_perm x shingles, so each reduction runs over contiguous memory
+            permuted = self._a[:, None] * hashes + self._b[:, None]
+            out[start:stop] = np.minimum.reduceat(permuted, starts, axis=1).T
+            start = stop
+        return out
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of one text."""
+        return self.signatures([text])[0]
+
+    def add(self, text: str, key: Hashable = None, signature: Optional[np.ndarray] = None) -> int:
+        """
+        Index a post and return its representative's position.
+
+        Args:
+            text: Post text
+            key: Posts only cluster with posts that have the same key
+                (e.g. their media settings)
+            signature: Precomputed signature (see signatures()), if any
+        """
+        sig = self.signature(text) if signature is None else signature
+        position = len(self._cluster_of)
+
+        # One 64-bit bucket key per band; collisions only cost a similarity check
+        band_keys = [
+            (key, band, band_key)
+            for band, band_key in enumerate(
+                (sig.reshape(self.bands, self.rows).astype(np.uint64) * self._band_mix).sum(axis=1).tolist()
+            )
+        ]
+
+        candidates = set()
+        for band_key in band_keys:
+            candidates.update(self._buckets.get(band_key, ()))
+        if candidates:
+            # Check every candidate at once; the earliest representative wins
+            slots = np.fromiter(sorted(candidates), dtype=np.int64, count=len(candidates))
+            similar = (self._rep_signatures[slots] == sig).mean(axis=1) >= self.threshold
+            if similar.any():
+                rep = self._reps[slots[similar.argmax()]]
+                self._cluster_of.append(rep)
+                return rep
+
+        # New cluster: this post represents it
+        slot = len(self._reps)
+        if slot == len(self._rep_signatures):
+            self._rep_signatures = np.concatenate((self._rep_signatures, np.empty_like(self._rep_signatures)))
+        self._rep_signatures[slot] = sig
+        self._reps.append(position)
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, []).append(slot)
+        self._cluster_of.append(position)
+        return position
+
+    def clusters(self) -> list[list[int]]:
+        """Every cluster as a list of positions, ordered by representative."""
+        groups = {}
+        for position, rep in enumerate(self._cluster_of):
+            groups.setdefault(rep, []).append(position)
+        return list(groups.values())
+
+    def __len__(self) -> int:
+        return len(self._cluster_of)
+
+
+def _media_key(include_media: bool, media_type: Optional[str], media_files) -> tuple:
+    """Media settings as analyze_post() resolves them, plus the primary file's signature."""
+    media = primary_media(media_files)
+    if media is None:
+        return bool(include_media), media_type, None
+    return True, media_type or media.media_type, media.signature
+
+
+def cluster_posts(posts: Iterable, threshold: float = 0.8, **index_kwargs) -> list[list[int]]:
+    """
+    Group posts (texts or post dicts) into near-duplicate clusters.
+
+    Returns:
+        Clusters as lists of input positions; each cluster's first member is
+        its representative, and clusters are ordered by representative
+    """
+    index = NearDuplicateIndex(threshold=threshold, **index_kwargs)
+    args = [post_args(post) for post in posts]
+    signatures = index.signatures([text for text, _, _, _ in args])
+    for (text, include_media, media_type, media_files), signature in zip(args, signatures):
+        index.add(text, key=_media_key(include_media, media_type, media_files), signature=signature)
+    return index.clusters()
+
+
+def representatives(posts: list, threshold: float = 0.8, **index_kwargs) -> tuple[list, list]:
+    """Return (representative posts, clusters) for a list of posts."""
+    clusters = cluster_posts(posts, threshold, **index_kwargs)
+    return [posts[members[0]] for members in clusters], clusters
+
+
+def rank_posts_deduped(
+    posts: Iterable,
+    top_k: Optional[int] = None,
+    workers: int = 1,
+    threshold: float = 0.8,
+    **index_kwargs,
+) -> list[tuple[int, dict, AnalysisResult, int]]:
+    """
+    rank_posts() over one representative per near-duplicate cluster.
+
+    Returns:
+        List of (1-based input position, post, AnalysisResult, cluster size)
+    """
+    posts = list(posts)
+    reps, clusters = representatives(posts, threshold, **index_kwargs)
+    ranked = rank_posts(reps, top_k=top_k, workers=workers)
+    return [
+        (clusters[num - 1][0] + 1, post, result, len(clusters[num - 1]))
+        for num, post, result in ranked
+    ]
+
+
+def compare_posts_deduped(
+    posts: Iterable,
+    top_k: Optional[int] = None,
+    workers: int = 1,
+    threshold: float = 0.8,
+    **index_kwargs,
+) -> str:
+    """compare_posts() that ranks one post per near-duplicate cluster and shows cluster sizes."""
+    ranked = rank_posts_deduped(posts, top_k, workers, threshold, **index_kwargs)
+
+    lines = ["### Post Comparison (Ranked by Weighted Score, near-duplicates merged)", ""]
+    for rank, (num, post, result, size) in enumerate(ranked, 1):
+        preview = (post if isinstance(post, str) else post.get("text", ""))[:50]
+        emoji = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else f"{rank}."
+        similar = f" (+{size - 1} near-duplicates)" if size > 1 else ""
+        lines.append(f"{emoji} Post {num}: **{result.weighted_score:.2f}** — \"{preview}...\"{similar}")
+        lines.append(f"   Type: {result.post_type.value} | Reply: {result.reply_potential} | Safety: {result.negative_signal_safety}")
+
+    return "\n".join(lines)
+
+
+def score_posts_deduped(posts: Iterable, threshold: float = 0.8, **index_kwargs) -> tuple:
+    """
+    batch_scorer.score_posts() over one representative per cluster.
+
+    Returns:
+        (representative positions, cluster sizes, probability matrix, scores);
+        the arrays have one row per cluster
+    """
+    from batch_scorer import score_posts
+
+    posts = [post if isinstance(post, dict) else {"text": post} for post in posts]
+    reps, clusters = representatives(posts, threshold, **index_kwargs)
+    probs, scores = score_posts(reps)
+    return (
+        np.array([members[0] for members in clusters], dtype=np.int64),
+        np.array([len(members) for members in clusters], dtype=np.int64),
+        probs,
+        scores,
+    )
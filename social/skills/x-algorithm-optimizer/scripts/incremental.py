@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Incremental re-analysis for live draft editing.
+
+An IncrementalAnalyzer holds a draft and its extracted features. Each edit
+(insert, delete or replace a span) updates only what the edit can change:
+caps are counted in the edited spans, words and digit runs are recounted in
+the surrounding tokens, list markers are rechecked at the touched line
+starts, and pattern groups are searched in a small window around the edit.
+Results are identical to analyze_post() on the current text.
+
+Usage:
+    from incremental import IncrementalAnalyzer
+    session = IncrementalAnalyzer("Hot take: remote work is dead", include_media=True, media_type="image")
+    session.insert(len(session.text), ". But here's the nuance...")
+    session.delete(0, 10)
+    print(session.score().weighted_score)   # fast, numbers only
+    print(format_report(session.result()))  # full AnalysisResult
+"""
+
+from typing import Optional
+
+from analyze_x_post import (
+    AnalysisResult,
+    PostFeatures,
+    ScoreResult,
+    _DIGIT_RUN_RE,
+    _LIST_MARKER_RE,
+    _URL_RE,
+    analyze_features,
+    get_rules,
+    score_components,
+    weighted_score_from_components,
+)
+
+
+def _token_bounds(text: str, start: int, end: int) -> tuple[int, int]:
+    """Widen [start, end) to whitespace (or text) boundaries."""
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    n = len(text)
+    while end < n and not text[end].isspace():
+        end += 1
+    return start, end
+
+
+def _digit_bounds(text: str, start: int, end: int) -> tuple[int, int]:
+    """Widen [start, end) so no run of decimal digits crosses either edge."""
+    while start > 0 and text[start - 1].isdecimal():
+        start -= 1
+    n = len(text)
+    while end < n and text[end].isdecimal():
+        end += 1
+    return start, end
+
+
+def _count_list_markers(text: str, start: int, upto: int) -> int:
+    """List markers at line starts in [line start of `start`, upto]."""
+    count = 0
+    pos = text.rfind("\n", 0, start) + 1
+    while pos <= upto:
+        if _LIST_MARKER_RE.match(text, pos):
+            count += 1
+        pos = text.find("\n", pos, upto)
+        if pos == -1:
+            break
+        pos += 1
+    return count
+
+
+def _rule_window(text: str, start: int, end: int, max_spaces: int) -> tuple[int, int]:
+    """
+    Window around [start, end) that contains every match able to touch it.
+
+    max_spaces bounds the whitespace inside any single pattern match (see
+    Ruleset.max_match_spaces, computed from the parsed patterns), so a match
+    containing more cannot exist.
+    """
+    spaces = 0
+    lo = start - 1
+    while lo > 0:
+        if text[lo].isspace():
+            spaces += 1
+            if spaces > max_spaces:
+                break
+        lo -= 1
+    lo = max(lo, 0)
+
+    n = len(text)
+    spaces = 0
+    hi = end
+    while hi < n:
+        if text[hi].isspace():
+            spaces += 1
+            if spaces > max_spaces:
+                break
+        hi += 1
+    return lo, min(hi + 1, n)
+
+
+def _search_window(rx, text: str, lo: int, hi: int) -> Optional[tuple[int, int]]:
+    """
+    Span of a real match of group regex rx starting in [lo, hi), or None.
+
+    The windowed search can report false matches at the artificial end of
+    the window (\\b, $), so each candidate is re-checked against the full text.
+    """
+    pos = lo
+    while (m := rx.search(text, pos, hi)) is not None:
+        full = rx.match(text, m.start())
+        if full is not None:
+            return full.span()
+        pos = m.start() + 1
+    return None
+
+
+class IncrementalAnalyzer:
+    """
+    Draft session that keeps features current across small edits.
+
+    The session follows install_rules(): if the active ruleset changed since
+    the last edit, pattern groups are rescanned under the new one.
+    """
+
+    def __init__(
+        self,
+        text: str = "",
+        include_media: bool = False,
+        media_type: Optional[str] = None,
+        is_thread_start: bool = False,
+    ):
+        self.include_media = include_media
+        self.media_type = media_type
+        self.is_thread_start = is_thread_start
+        self.set_text(text)
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def set_text(self, text: str) -> None:
+        """Replace the whole draft and recompute every feature."""
+        self._text = text
+        self._lower = text.lower()
+        self._caps = sum(map(str.isupper, text))
+        self._words = len(text.split())
+        self._digit_runs = len(_DIGIT_RUN_RE.findall(text))
+        self._list_markers = len(_LIST_MARKER_RE.findall(text))
+        self._rules = get_rules()
+        self._rescan_groups()
+        self._features = None
+
+    def insert(self, pos: int, s: str) -> None:
+        self.replace(pos, pos, s)
+
+    def delete(self, start: int, end: int) -> None:
+        self.replace(start, end, "")
+
+    def replace(self, start: int, end: int, s: str) -> None:
+        """Replace text[start:end] with s."""
+        old = self._text
+        n = len(old)
+        if not 0 <= start <= end <= n:
+            raise IndexError(f"edit span [{start}, {end}) outside text of length {n}")
+        if start == end and not s:
+            return
+        new = old[:start] + s + old[end:]
+        delta = len(s) - (end - start)
+
+        # Caps: only the removed and inserted characters change the count
+        self._caps += sum(map(str.isupper, s)) - sum(map(str.isupper, old[start:end]))
+
+        # Words and digit runs: recount the enclosing tokens
+        a, b = _token_bounds(old, start, end)
+        self._words += len(new[a:b + delta].split()) - len(old[a:b].split())
+
+        a, b = _digit_bounds(old, start, end)
+        self._digit_runs += (
+            len(_DIGIT_RUN_RE.findall(new, a, b + delta)) - len(_DIGIT_RUN_RE.findall(old, a, b))
+        )
+
+        # A list marker only depends on its own line start and the text after
+        # it, so only line starts up to the end of the edit can change
+        self._list_markers += (
+            _count_list_markers(new, start, start + len(s)) - _count_list_markers(old, start, end)
+        )
+
+        # Anchors are only valid offsets if the old text lowercased to the same length
+        old_aligned = len(self._lower) == n
+        self._text = new
+        self._lower = new.lower()
+        self._features = None
+
+        if self._rules is not get_rules():
+            self._rules = get_rules()
+            self._rescan_groups()
+        elif not old_aligned or len(self._lower) != len(new):
+            # Lowercasing changed lengths (e.g. 'İ') before or after the edit,
+            # so offsets no longer line up
+            self._rescan_groups()
+        elif self._rules.max_match_spaces is None:
+            # Some pattern can span any amount of whitespace, so no window is safe
+            self._rescan_groups()
+        else:
+            self._update_groups(start, end, len(s), delta)
+
+    def _rescan_groups(self) -> None:
+        anchors = {}
+        for name, rx in self._rules.groups.items():
+            m = rx.search(self._lower)
+            if m is not None:
+                anchors[name] = m.span()
+        self._anchors = anchors
+
+    def _update_groups(self, start: int, end: int, inserted: int, delta: int) -> None:
+        lower = self._lower
+        rules = self._rules
+        lo, hi = _rule_window(lower, start, start + inserted, rules.max_match_spaces)
+        anchors = {}
+        for name, rx in rules.groups.items():
+            span = self._anchors.get(name)
+            if span is not None:
+                a, b = span
+                # A match survives if the edit misses it and its one-char context
+                if end <= a - 1:
+                    anchors[name] = (a + delta, b + delta)
+                    continue
+                if start >= b + 1 and name not in rules.end_anchored:
+                    anchors[name] = span
+                    continue
+            found = _search_window(rx, lower, lo, hi)
+            if found is None and span is not None:
+                # The only known match was edited away; look elsewhere
+                m = rx.search(lower)
+                found = m.span() if m is not None else None
+            if found is not None:
+                anchors[name] = found
+        self._anchors = anchors
+
+    def features(self) -> PostFeatures:
+        """Current features, identical to extract_features(self.text)."""
+        if self._rules is not get_rules():
+            self._rules = get_rules()
+            self._rescan_groups()
+            self._features = None
+        if self._features is None:
+            text = self._text
+            urls = _URL_RE.findall(text)
+            self._features = PostFeatures(
+                text=text,
+                text_lower=self._lower,
+                char_count=len(text),
+                word_count=self._words,
+                question_count=text.count("?"),
+                caps_ratio=self._caps / max(len(text), 1),
+                digit_runs=self._digit_runs,
+                urls=urls,
+                non_url_length=len(_URL_RE.sub("", text).strip()) if urls else len(text.strip()),
+                list_markers=self._list_markers,
+                has_thread_emoji="🧵" in text,
+                hits=frozenset(self._anchors),
+            )
+        return self._features
+
+    def result(self) -> AnalysisResult:
+        """Full analysis of the current text."""
+        features = self.features()
+        return analyze_features(features, self.include_media, self.media_type, self.is_thread_start, self._rules)
+
+    def score(self) -> ScoreResult:
+        """Numbers-only analysis of the current text (see score_post)."""
+        features = self.features()
+        post_type, reply, share, media, safety = score_components(
+            features, self.include_media, self.media_type, self._rules
+        )
+        return ScoreResult(
+            weighted_score=weighted_score_from_components(
+                post_type, reply, share, media, safety, self.include_media, self.media_type
+            ),
+            overall_score=int(reply * 0.40 + share * 0.25 + media * 0.15 + safety * 0.20),
+            post_type=post_type,
+            reply_potential=reply,
+            shareability=share,
+            media_optimization=media,
+            negative_signal_safety=safety,
+        )
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Media inspection: dimensions and duration from container headers.
+
+Only the header bytes are read (through mmap, so a video's moov atom is
+found by skipping box sizes, not by reading the media data). Nothing is
+decoded and no codec library is needed. analyze_post(..., media_files=[...])
+uses inspect_media on the first file; analyze_x_post re-exports the public
+names.
+
+Usage:
+    from media_info import inspect_media, inspect_media_files
+    info = inspect_media("clip.mp4")
+    print(info.width, info.height, info.duration, info.aspect_ratio)
+    for info in inspect_media_files(paths, strict=False):
+        ...
+"""
+
+import mmap
+import os
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers (C4 DHT, C8 JPG and CC DAC share the range)
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """What the container headers say about one media file."""
+    path: str
+    format: str                # "png", "jpeg", "gif" or "mp4"
+    media_type: str            # "image", "gif" or "video" (as analyze_post's media_type)
+    width: int                 # display size, after EXIF / track rotation
+    height: int
+    duration: float = 0.0      # seconds; 0 for still images
+    frames: int = 1            # GIF frames (1 for other formats)
+
+    @property
+    def aspect_ratio(self) -> float:
+        """Width / height (below 1 is vertical); 0 if the height is unknown."""
+        return self.width / self.height if self.height else 0.0
+
+    @property
+    def signature(self) -> tuple:
+        """(format, width, height, duration): what identifies the file's content for caching and grouping."""
+        return self.format, self.width, self.height, self.duration
+
+
+def _png_info(buf, path: str) -> MediaInfo:
+    if len(buf) < 24 or buf[12:16] != b"IHDR":
+        raise ValueError(f"{path}: PNG without an IHDR chunk")
+    width, height = struct.unpack_from(">II", buf, 16)
+    return MediaInfo(path, "png", "image", width, height)
+
+
+def _jpeg_orientation(buf, start: int, end: int) -> int:
+    """EXIF orientation tag (1-8) from an APP1 segment body, 1 if absent."""
+    if buf[start:start + 6] != b"Exif\x00\x00":
+        return 1
+    tiff = start + 6
+    order = {b"II": "<", b"MM": ">"}.get(bytes(buf[tiff:tiff + 2]))
+    if order is None or tiff + 8 > end:
+        return 1
+    ifd = tiff + struct.unpack_from(order + "I", buf, tiff + 4)[0]
+    if ifd + 2 > end:
+        return 1
+    (entries,) = struct.unpack_from(order + "H", buf, ifd)
+    for pos in range(ifd + 2, min(ifd + 2 + entries * 12, end - 11), 12):
+        tag, kind = struct.unpack_from(order + "HH", buf, pos)
+        if tag == 0x0112 and kind == 3:
+            return struct.unpack_from(order + "H", buf, pos + 8)[0]
+    return 1
+
+
+def _jpeg_info(buf, path: str) -> MediaInfo:
+    pos, size = 2, len(buf)
+    orientation = 1
+    while pos + 4 <= size:
+        if buf[pos] != 0xFF:
+            raise ValueError(f"{path}: corrupt JPEG marker at byte {pos}")
+        marker = buf[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # no length field
+            pos += 2
+            continue
+        (length,) = struct.unpack_from(">H", buf, pos + 2)
+        body = pos + 4
+        if marker in _JPEG_SOF:
+            if body + 5 > size:
+                break
+            height, width = struct.unpack_from(">HH", buf, body + 1)
+            if orientation >= 5:  # rotated 90° either way
+                width, height = height, width
+            return MediaInfo(path, "jpeg", "image", width, height)
+        if marker == 0xE1 and orientation == 1:
+            orientation = _jpeg_orientation(buf, body, min(pos + 2 + length, size))
+        if marker in (0xD9, 0xDA):  # end of image / start of scan before any frame header
+            break
+        pos += 2 + length
+    raise ValueError(f"{path}: JPEG without a frame header")
+
+
+def _gif_skip_blocks(buf, pos: int) -> int:
+    """Position after a chain of data sub-blocks starting at pos."""
+    size = len(buf)
+    while pos < size:
+        length = buf[pos]
+        pos += 1 + length
+        if length == 0:
+            return pos
+    raise ValueError("truncated GIF")
+
+
+def _gif_info(buf, path: str) -> MediaInfo:
+    if len(buf) < 13:
+        raise ValueError(f"{path}: truncated GIF header")
+    width, height = struct.unpack_from("<HH", buf, 6)
+    pos = 13
+    if buf[10] & 0x80:  # global color table
+        pos += 3 << ((buf[10] & 0x07) + 1)
+    frames = 0
+    delay = 0
+    size = len(buf)
+    try:
+        while pos < size:
+            block = buf[pos]
+            if block == 0x3B:  # trailer
+                break
+            if block == 0x21:  # extension: graphic control carries the frame delay
+                if buf[pos + 1] == 0xF9 and buf[pos + 2] >= 4:
+                    delay += struct.unpack_from("<H", buf, pos + 4)[0]
+                pos = _gif_skip_blocks(buf, pos + 2)
+            elif block == 0x2C:  # image descriptor, then LZW data left undecoded
+                frames += 1
+                packed = buf[pos + 9]
+                pos += 10
+                if packed & 0x80:  # local color table
+                    pos += 3 << ((packed & 0x07) + 1)
+                pos = _gif_skip_blocks(buf, pos + 1)
+            else:
+                raise ValueError(f"{path}: unknown GIF block 0x{block:02x}")
+    except (IndexError, struct.error, ValueError) as exc:
+        if frames == 0:
+            raise ValueError(f"{path}: corrupt GIF ({exc})") from None
+    frames = max(frames, 1)
+    return MediaInfo(path, "gif", "gif", width, height, delay / 100 if frames > 1 else 0.0, frames)
+
+
+def _mp4_boxes(buf, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """(type, body start, body end) of each box in [start, end), reading headers only."""
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", buf, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            (size,) = struct.unpack_from(">Q", buf, pos + 8)
+            header = 16
+        elif size == 0:  # runs to the end of the enclosing box
+            size = end - pos
+        if size < header:
+            return
+        yield kind, pos + header, min(pos + size, end)
+        pos += size
+
+
+def _mp4_info(buf, path: str) -> MediaInfo:
+    moov = next((box for box in _mp4_boxes(buf, 0, len(buf)) if box[0] == b"moov"), None)
+    if moov is None:
+        raise ValueError(f"{path}: MP4 without a moov atom")
+    width = height = 0
+    duration = 0.0
+    for kind, body, end in _mp4_boxes(buf, moov[1], moov[2]):
+        if kind == b"mvhd" and body + 32 <= end:
+            if buf[body] == 1:
+                timescale, length = struct.unpack_from(">IQ", buf, body + 20)
+            else:
+                timescale, length = struct.unpack_from(">II", buf, body + 12)
+            duration = length / timescale if timescale else 0.0
+        elif kind == b"trak" and not width:
+            for child, child_body, child_end in _mp4_boxes(buf, body, end):
+                if child != b"tkhd":
+                    continue
+                # Width and height (16.16 fixed point) follow the 36-byte
+                # matrix; audio tracks are 0 x 0
+                offset = child_body + (88 if buf[child_body] == 1 else 76)
+                if offset + 8 <= child_end:
+                    a, b = struct.unpack_from(">ii", buf, offset - 36)
+                    w, h = (v >> 16 for v in struct.unpack_from(">II", buf, offset))
+                    if w and h:
+                        width, height = (h, w) if a == 0 and b != 0 else (w, h)
+                break
+    return MediaInfo(path, "mp4", "video", width, height, duration)
+
+
+def inspect_media(path: str) -> MediaInfo:
+    """
+    Read a media file's dimensions (and duration for video and animated GIF).
+
+    Supports PNG (IHDR), JPEG (SOF, plus EXIF orientation), GIF (screen
+    descriptor, frame delays) and MP4/MOV (moov: mvhd duration, tkhd size
+    and rotation). Only headers are read; pixel and sample data is skipped.
+
+    Raises:
+        ValueError: Unsupported or corrupt file
+        OSError: The file can't be read
+    """
+    path = os.fspath(path)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{path}: empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            try:
+                if buf[:8] == _PNG_SIGNATURE:
+                    return _png_info(buf, path)
+                if buf[:2] == b"\xff\xd8":
+                    return _jpeg_info(buf, path)
+                if buf[:6] in (b"GIF87a", b"GIF89a"):
+                    return _gif_info(buf, path)
+                if buf[4:8] in (b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip"):
+                    return _mp4_info(buf, path)
+            except (IndexError, struct.error):
+                raise ValueError(f"{path}: truncated header") from None
+    raise ValueError(f"{path}: unsupported media format (expected PNG, JPEG, GIF or MP4)")
+
+
+def inspect_media_files(
+    paths: Iterable[str],
+    workers: int = 16,
+    strict: bool = True,
+) -> Iterator[Optional[MediaInfo]]:
+    """
+    inspect_media over many files on a thread pool, in input order.
+
+    Header reads are small and I/O bound, so threads (not processes) keep
+    many reads in flight.
+
+    Args:
+        paths: File paths, consumed lazily
+        workers: Concurrent reads; 1 reads in this thread
+        strict: If False, unreadable or unsupported files yield None
+            instead of raising
+
+    Yields:
+        MediaInfo (or None) per path
+    """
+    def inspect(path):
+        try:
+            return inspect_media(path)
+        except (OSError, ValueError):
+            if strict:
+                raise
+            return None
+
+    if workers <= 1:
+        yield from map(inspect, paths)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(inspect, path))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def primary_media(media_files) -> Optional[MediaInfo]:
+    """MediaInfo of the first attached file (the one the feed crops and autoplays)."""
+    if media_files is None:
+        return None
+    if isinstance(media_files, (str, os.PathLike)):
+        media_files = [media_files]
+    for path in media_files:
+        return path if isinstance(path, MediaInfo) else inspect_media(path)
+    return None
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Build and query the reference score index behind report percentiles.
+
+Analyzes a reference corpus (your past posts), or reads an existing
+result_store.py table, and writes the sorted weighted scores overall and
+per PostType as a PercentileIndex file. enable_percentiles() memory-maps it,
+after which format_report() and compare_posts() show where each draft falls
+in that history.
+
+Usage:
+    python scripts/percentile_index.py build history.jsonl -o reference.pidx --workers 8
+    python scripts/percentile_index.py build --from-store results.npy -o reference.pidx
+    python scripts/percentile_index.py rank reference.pidx "Draft text to place"
+
+    from analyze_x_post import analyze_posts, enable_percentiles, PercentileIndex
+    PercentileIndex.build(analyze_posts(posts)).save("reference.pidx")
+    index = enable_percentiles("reference.pidx")
+    overall, within_type = index.rank(analyze_post("Draft text"))
+"""
+
+import argparse
+import sys
+from typing import Optional
+
+from analyze_x_post import PercentileIndex, analyze_post, analyze_posts
+from corpus_stream import FORMATS, read_posts
+
+
+def build_from_store(path: str, per_type: bool = True, min_type_count: int = 100) -> PercentileIndex:
+    """Index the weighted_score and post_type columns of a result_store.py table (requires NumPy)."""
+    from result_store import load_results
+
+    table = load_results(path)
+    return PercentileIndex.build(
+        zip(table["post_type"].tolist(), table["weighted_score"].tolist()),
+        per_type=per_type,
+        min_type_count=min_type_count,
+    )
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Reference score index for draft percentiles.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build an index from a corpus or a result table")
+    build.add_argument("input", nargs="?", help="JSONL/CSV file (optionally .gz), or - for stdin")
+    build.add_argument("--from-store", metavar="NPY", help="Read scores from a result_store.py table instead")
+    build.add_argument("-o", "--output", required=True, help="Index file to write")
+    build.add_argument("--format", choices=FORMATS, help="Input format (default: from extension)")
+    build.add_argument("--workers", type=int, default=1, help="Worker processes for analysis (0 = all cores)")
+    build.add_argument("--no-per-type", action="store_true", help="Only index all posts together")
+    build.add_argument("--min-type-count", type=int, default=100, help="Smallest post-type section kept (default: 100)")
+
+    rank = commands.add_parser("rank", help="Percentile of a draft against an index")
+    rank.add_argument("index", help="Index file")
+    rank.add_argument("text", help="Draft text")
+    rank.add_argument("--media", choices=["image", "video", "gif"], help="Assume attached media of this type")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if (args.input is None) == (args.from_store is None):
+            parser.error("build needs exactly one of an input file or --from-store")
+        per_type = not args.no_per_type
+        if args.from_store:
+            index = build_from_store(args.from_store, per_type, args.min_type_count)
+        else:
+            results = analyze_posts(read_posts(args.input, args.format), workers=args.workers)
+            index = PercentileIndex.build(results, per_type, args.min_type_count)
+        index.save(args.output)
+        types = ", ".join(f"{t.value} {index.count(t)}" for t in index.post_types())
+        print(f"Indexed {len(index)} scores ({types or 'no per-type sections'}); wrote {args.output}", file=sys.stderr)
+        return 0
+
+    with PercentileIndex.load(args.index) as index:
+        result = analyze_post(args.text, include_media=bool(args.media), media_type=args.media)
+        overall, within_type = index.rank(result)
+        if overall is None:
+            print("Index is empty", file=sys.stderr)
+            return 1
+        line = f"{result.weighted_score:+.3f}  {overall:.1f} percentile of {len(index)}"
+        if within_type is not None:
+            line += f"  ({within_type:.1f} among {index.count(result.post_type)} {result.post_type.value})"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite index of analyzed posts, re-analyzing only what changed.
+
+Every post is stored with a content hash (text, media settings and the
+primary attachment's format, size and duration) and the fingerprint of the
+scoring setup that produced its result: the analyzer source, the active
+profile (weights and probability model), the active rules and the result
+schema. update() skips a post when both still match.
+A nightly run over an archive therefore analyzes only new and edited posts,
+unless the scoring setup itself changed, in which case everything is stale.
+
+Rows keep the full result (serialize.py binary encoding) plus indexed
+columns for post type, weighted score and posting date.
+
+Posts without an id are keyed by their content hash, so editing one stores
+a new row and the old revision stays behind. When the input is a full
+export, update(..., prune=True) (--prune) deletes every stored row the
+input no longer contains, old revisions included.
+
+Usage:
+    python scripts/post_index.py update archive.jsonl --db posts.db --workers 8
+    python scripts/post_index.py update full_export.jsonl --db posts.db --prune
+    python scripts/post_index.py query --db posts.db --type data_drop --min-score 1.0 --since 2026-01-01 --limit 20
+
+    from post_index import PostIndex
+    with PostIndex("posts.db") as index:
+        stats = index.update(read_records("archive.jsonl"))   # {"new": 120, "changed": 4, "unchanged": 98210, ...}
+        for post in index.query(post_type="data_drop", min_score=1.0, since="2026-01-01"):
+            print(post.post_id, post.weighted_score, post.result.strengths)
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice, tee
+from typing import Iterable, Iterator, Optional, Union
+
+import analyze_x_post
+import media_info
+from analyze_x_post import (
+    POST_TYPE_CODES,
+    RESULT_SCHEMA_VERSION,
+    AnalysisCache,
+    AnalysisResult,
+    PostType,
+    analyze_posts,
+    current_profile,
+    current_rules,
+)
+from corpus_stream import FORMATS, normalize_record, read_records
+from media_info import MediaInfo, primary_media
+from serialize import decode_binary, encode_binary
+
+
+# Record fields checked, in order, for the posting date
+DATE_FIELDS = ("posted_at", "created_at", "date")
+
+_POST_TYPES = tuple(PostType)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    post_id TEXT PRIMARY KEY,
+    content_hash BLOB NOT NULL,
+    fingerprint TEXT NOT NULL,
+    text TEXT NOT NULL,
+    posted_at REAL,
+    analyzed_at REAL NOT NULL,
+    post_type INTEGER NOT NULL,
+    weighted_score REAL NOT NULL,
+    overall_score INTEGER NOT NULL,
+    result BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_by_type ON posts (post_type, weighted_score);
+CREATE INDEX IF NOT EXISTS posts_by_score ON posts (weighted_score);
+CREATE INDEX IF NOT EXISTS posts_by_date ON posts (posted_at);
+"""
+
+_UPSERT = """
+INSERT INTO posts (post_id, content_hash, fingerprint, text, posted_at, analyzed_at,
+                   post_type, weighted_score, overall_score, result)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (post_id) DO UPDATE SET
+    content_hash = excluded.content_hash,
+    fingerprint = excluded.fingerprint,
+    text = excluded.text,
+    posted_at = excluded.posted_at,
+    analyzed_at = excluded.analyzed_at,
+    post_type = excluded.post_type,
+    weighted_score = excluded.weighted_score,
+    overall_score = excluded.overall_score,
+    result = excluded.result
+"""
+
+# Placeholders per lookup query (SQLite's default variable limit is 999+)
+_LOOKUP_BATCH = 500
+
+
+def fingerprint() -> str:
+    """
+    Hash of everything that determines a result: the analyzer source
+    (analyze_x_post.py and media_info.py), the active profile and rules,
+    and RESULT_SCHEMA_VERSION.
+
+    Any edit to either source file counts as a new version; that is coarse
+    but never misses a scoring change.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for module in (analyze_x_post, media_info):
+        with open(module.__file__, "rb") as f:
+            h.update(f.read())
+    h.update(json.dumps(
+        {"schema": RESULT_SCHEMA_VERSION, "profile": current_profile(), "rules": current_rules()},
+        sort_keys=True,
+        ensure_ascii=False,
+    ).encode("utf-8"))
+    return h.hexdigest()
+
+
+def content_hash(
+    text: str,
+    include_media: bool,
+    media_type: Optional[str],
+    media: Optional[MediaInfo] = None,
+) -> bytes:
+    """
+    Hash of the inputs to analyze_post (same text digest as the result cache).
+
+    media is the inspected primary attachment (see inspect_media); its
+    format, dimensions and duration are part of the hash, so replacing the
+    file behind a post marks it changed.
+    """
+    digest, include_media, media_type = AnalysisCache.make_key(text, include_media, media_type, False)[:3]
+    key = digest + bytes([include_media]) + (media_type or "").encode("utf-8")
+    if media is not None:
+        key += json.dumps(media.signature).encode("utf-8")
+    return key
+
+
+def to_timestamp(value) -> Optional[float]:
+    """Unix seconds from a number, an ISO-8601 string or a datetime (naive means UTC); None if empty."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return float(value)
+        except ValueError:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    raise ValueError(f"can't read a date from {value!r}")
+
+
+@dataclass
+class IndexedPost:
+    """One stored post; result is decoded on first access."""
+    post_id: str
+    text: str
+    post_type: PostType
+    weighted_score: float
+    overall_score: int
+    posted_at: Optional[float]
+    analyzed_at: float
+    _blob: bytes
+
+    @property
+    def result(self) -> AnalysisResult:
+        return decode_binary(self._blob)[0]
+
+
+class PostIndex:
+    """SQLite-backed store of analysis results keyed by post id."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _stored(self, post_ids: list) -> dict:
+        """{post_id: (content_hash, fingerprint)} for the ids already stored."""
+        stored = {}
+        for start in range(0, len(post_ids), _LOOKUP_BATCH):
+            batch = post_ids[start:start + _LOOKUP_BATCH]
+            rows = self._conn.execute(
+                f"SELECT post_id, content_hash, fingerprint FROM posts WHERE post_id IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+            stored.update((post_id, (digest, fp)) for post_id, digest, fp in rows)
+        return stored
+
+    def update(
+        self,
+        records: Iterable[dict],
+        workers: int = 1,
+        batch_size: int = 2000,
+        prune: bool = False,
+    ) -> dict:
+        """
+        Analyze and store every record that is new, edited or scored under an
+        older fingerprint; leave the rest untouched.
+
+        Args:
+            records: Dicts with text, include_media, media_type and optionally
+                media_files, id and a date (see DATE_FIELDS); posts without
+                an id are keyed by content hash, and a date to_timestamp()
+                can't read is stored as no date
+            workers: Worker processes for analysis (see analyze_posts)
+            batch_size: Records looked up, and results written, per transaction
+            prune: Records are a full export; afterwards delete every stored
+                post not among them (including old revisions of id-less posts)
+
+        Returns:
+            {"new": n, "changed": n, "unchanged": n, "bad_dates": n, "pruned": n}
+        """
+        fp = fingerprint()
+        counts = {"new": 0, "changed": 0, "unchanged": 0, "bad_dates": 0, "pruned": 0}
+        if prune:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen (post_id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM seen")
+
+        def stale():
+            records_iter = iter(records)
+            while batch := list(islice(records_iter, batch_size)):
+                entries = []
+                for record in batch:
+                    post = normalize_record(record)
+                    media = primary_media(post.get("media_files"))
+                    if media is not None:
+                        # Analyze from the inspected header instead of reading the file again
+                        post["media_files"] = [media]
+                    digest = content_hash(post["text"], post["include_media"], post["media_type"], media)
+                    post_id = str(post["id"]) if "id" in post else digest.hex()
+                    date = next((record[k] for k in DATE_FIELDS if record.get(k) not in (None, "")), None)
+                    try:
+                        posted_at = to_timestamp(date)
+                    except ValueError:
+                        posted_at = None
+                        counts["bad_dates"] += 1
+                    entries.append((post_id, digest, post, posted_at))
+                stored = self._stored([entry[0] for entry in entries])
+                if prune:
+                    self._conn.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((entry[0],) for entry in entries))
+                for entry in entries:
+                    previous = stored.get(entry[0])
+                    if previous == (entry[1], fp):
+                        counts["unchanged"] += 1
+                        continue
+                    counts["new" if previous is None else "changed"] += 1
+                    yield entry
+
+        entries, to_analyze = tee(stale())
+        results = analyze_posts((entry[2] for entry in to_analyze), workers=workers)
+        rows = []
+        for (post_id, digest, post, posted_at), result in zip(entries, results):
+            rows.append((
+                post_id,
+                digest,
+                fp,
+                post["text"],
+                posted_at,
+                time.time(),
+                POST_TYPE_CODES[result.post_type],
+                result.weighted_score,
+                result.overall_score,
+                encode_binary(result),
+            ))
+            if len(rows) >= batch_size:
+                self._write(rows)
+        self._write(rows)
+        if prune:
+            with self._conn:
+                counts["pruned"] = self._conn.execute(
+                    "DELETE FROM posts WHERE post_id NOT IN (SELECT post_id FROM seen)"
+                ).rowcount
+                self._conn.execute("DELETE FROM seen")
+        return counts
+
+    def _write(self, rows: list) -> None:
+        with self._conn:
+            self._conn.executemany(_UPSERT, rows)
+        rows.clear()
+
+    def query(
+        self,
+        post_type: Union[PostType, str, None] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        since=None,
+        until=None,
+        order: str = "score",
+        limit: Optional[int] = None,
+    ) -> Iterator[IndexedPost]:
+        """
+        Stored posts matching every given filter, from the indexed columns.
+
+        Args:
+            post_type: PostType or its string value
+            min_score / max_score: Inclusive weighted-score bounds
+            since / until: Posting date bounds (inclusive / exclusive), as
+                anything to_timestamp() reads; posts without a date are
+                excluded when either is set
+            order: "score" (best first), "date" (newest first) or "id"
+            limit: Maximum rows
+        """
+        orders = {"score": "weighted_score DESC", "date": "posted_at DESC", "id": "post_id"}
+        if order not in orders:
+            raise ValueError(f"unknown order {order!r}; expected one of {', '.join(orders)}")
+        clauses, params = [], []
+        if post_type is not None:
+            clauses.append("post_type = ?")
+            params.append(POST_TYPE_CODES[PostType(post_type)])
+        for column, op, value in (
+            ("weighted_score", ">=", min_score),
+            ("weighted_score", "<=", max_score),
+            ("posted_at", ">=", to_timestamp(since)),
+            ("posted_at", "<", to_timestamp(until)),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        sql = (
+            "SELECT post_id, text, post_type, weighted_score, overall_score, posted_at, analyzed_at, result FROM posts"
+            + (" WHERE " + " AND ".join(clauses) if clauses else "")
+            + f" ORDER BY {orders[order]}"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        for post_id, text, code, score, overall, posted_at, analyzed_at, blob in self._conn.execute(sql, params):
+            yield IndexedPost(post_id, text, _POST_TYPES[code], score, overall, posted_at, analyzed_at, blob)
+
+    def stats(self) -> dict:
+        """Row count and how many rows are stale under the current fingerprint."""
+        total, current = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(fingerprint = ?), 0) FROM posts", (fingerprint(),)
+        ).fetchone()
+        by_type = {
+            _POST_TYPES[code].value: count
+            for code, count in self._conn.execute("SELECT post_type, COUNT(*) FROM posts GROUP BY post_type")
+        }
+        return {"posts": total, "stale": total - current, "post_types": by_type}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Persistent index of analyzed X posts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Analyze new and changed posts from a JSONL/CSV export")
+    update.add_argument("input", help="JSONL/CSV file (optionally .gz), or - for stdin")
+    update.add_argument("--db", required=True, help="SQLite index file")
+    update.add_argument("--format", choices=FORMATS, help="Input format (default: from extension)")
+    update.add_argument("--workers", type=int, default=1, help="Worker processes (0 = all cores)")
+    update.add_argument("--prune", action="store_true", help="Input is a full export: delete stored posts it no longer contains")
+
+    query = commands.add_parser("query", help="List stored posts as JSON lines")
+    query.add_argument("--db", required=True, help="SQLite index file")
+    query.add_argument("--type", choices=[t.value for t in PostType], help="Post type")
+    query.add_argument("--min-score", type=float, help="Minimum weighted score")
+    query.add_argument("--max-score", type=float, help="Maximum weighted score")
+    query.add_argument("--since", help="Posted at or after (ISO date or unix seconds)")
+    query.add_argument("--until", help="Posted before (ISO date or unix seconds)")
+    query.add_argument("--order", choices=("score", "date", "id"), default="score")
+    query.add_argument("--limit", type=int, help="Maximum rows")
+
+    args = parser.parse_args(argv)
+    with PostIndex(args.db) as index:
+        if args.command == "update":
+            start = time.perf_counter()
+            counts = index.update(read_records(args.input, args.format), workers=args.workers, prune=args.prune)
+            print(
+                f"{counts['new']} new, {counts['changed']} changed, {counts['unchanged']} unchanged, "
+                f"{counts['pruned']} pruned ({counts['bad_dates']} with unreadable dates) "
+                f"in {time.perf_counter() - start:.1f}s",
+                file=sys.stderr,
+            )
+        else:
+            for post in index.query(
+                args.type, args.min_score, args.max_score, args.since, args.until, args.order, args.limit
+            ):
+                print(json.dumps({
+                    "id": post.post_id,
+                    "post_type": post.post_type.value,
+                    "weighted_score": post.weighted_score,
+                    "overall_score": post.overall_score,
+                    "posted_at": post.posted_at,
+                    "text": post.text,
+                }, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Columnar storage for batch analysis results (requires NumPy).
+
+Each post becomes one fixed-size record in a NumPy structured array: the
+component scores, the PostType code, the twelve probabilities, the weighted
+score and the char/word counts. Arrays are saved as .npy files and reopened
+by memory mapping, so dashboards can slice millions of scored posts without
+parsing or re-running analyze_post().
+
+Usage:
+    python scripts/result_store.py posts.jsonl -o results.npy --workers 8
+
+    from result_store import save_results, load_results, post_type_of
+    save_results("results.npy", analyze_posts(posts))
+    table = load_results("results.npy")          # memory-mapped, read-only
+    strong = table[table["weighted_score"] >= 2.0]
+    print(post_type_of(strong["post_type"][0]))
+"""
+
+import argparse
+import os
+import sys
+from typing import Iterable, Optional
+
+import numpy as np
+
+from analyze_x_post import ACTIONS, POST_TYPE_CODES, AnalysisResult, PostType, analyze_posts
+
+
+POST_TYPES = list(PostType)
+
+RESULT_DTYPE = np.dtype(
+    [
+        ("weighted_score", "<f8"),
+        ("post_type", "u1"),
+        ("reply_potential", "u1"),
+        ("shareability", "u1"),
+        ("media_optimization", "u1"),
+        ("negative_signal_safety", "u1"),
+        ("overall_score", "u1"),
+        ("has_question", "?"),
+        ("has_media", "?"),
+        ("char_count", "<u4"),
+        ("word_count", "<u4"),
+    ]
+    + [(f"p_{action}", "<f8") for action in ACTIONS]
+)
+
+
+def post_type_of(code: int) -> PostType:
+    """PostType for a stored post_type code."""
+    return POST_TYPES[int(code)]
+
+
+def result_row(result: AnalysisResult) -> tuple:
+    """One AnalysisResult as a record tuple matching RESULT_DTYPE."""
+    p = result.probabilities
+    return (
+        result.weighted_score,
+        POST_TYPE_CODES[result.post_type],
+        result.reply_potential,
+        result.shareability,
+        result.media_optimization,
+        result.negative_signal_safety,
+        result.overall_score,
+        result.has_question,
+        result.has_media,
+        result.char_count,
+        result.word_count,
+        p.p_reply,
+        p.p_repost,
+        p.p_quote,
+        p.p_like,
+        p.p_video_view,
+        p.p_photo_expand,
+        p.p_bookmark,
+        p.p_click,
+        p.p_profile_click,
+        p.p_block,
+        p.p_mute,
+        p.p_report,
+    )
+
+
+def results_to_array(results: Iterable[AnalysisResult]) -> np.ndarray:
+    """Collect results into an in-memory structured array."""
+    return np.array([result_row(r) for r in results], dtype=RESULT_DTYPE)
+
+
+def save_results(path: str, results: Iterable[AnalysisResult], chunk_rows: int = 65536) -> int:
+    """
+    Stream results into a .npy file, holding at most chunk_rows records in memory.
+
+    Records are spooled to a temporary raw file first (the .npy header needs
+    the final row count), then copied into the memory-mapped output.
+
+    Returns:
+        Number of records written
+    """
+    spool_path = path + ".partial"
+    count = 0
+    try:
+        with open(spool_path, "wb") as spool:
+            chunk = []
+            for result in results:
+                chunk.append(result_row(result))
+                if len(chunk) >= chunk_rows:
+                    np.array(chunk, dtype=RESULT_DTYPE).tofile(spool)
+                    count += len(chunk)
+                    chunk.clear()
+            if chunk:
+                np.array(chunk, dtype=RESULT_DTYPE).tofile(spool)
+                count += len(chunk)
+
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=RESULT_DTYPE, shape=(count,))
+        with open(spool_path, "rb") as spool:
+            for start in range(0, count, chunk_rows):
+                block = np.fromfile(spool, dtype=RESULT_DTYPE, count=min(chunk_rows, count - start))
+                out[start:start + len(block)] = block
+        out.flush()
+        del out
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+    return count
+
+
+def load_results(path: str, mmap: bool = True) -> np.ndarray:
+    """Open a saved result table; memory-mapped read-only unless mmap=False."""
+    table = np.load(path, mmap_mode="r" if mmap else None)
+    if table.dtype != RESULT_DTYPE:
+        raise ValueError(f"{path} does not contain analysis results (dtype {table.dtype})")
+    return table
+
+
+def main(argv: Optional[list] = None) -> int:
+    from corpus_stream import FORMATS, read_posts
+
+    parser = argparse.ArgumentParser(description="Analyze a corpus into a columnar .npy result table.")
+    parser.add_argument("input", help="JSONL/CSV file (optionally .gz), or - for stdin")
+    parser.add_argument("-o", "--output", required=True, help="Output .npy file")
+    parser.add_argument("--format", choices=FORMATS, help="Input format (default: from extension)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = all cores)")
+    args = parser.parse_args(argv)
+
+    count = save_results(args.output, analyze_posts(read_posts(args.input, args.format), workers=args.workers))
+    print(f"Wrote {count} results to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
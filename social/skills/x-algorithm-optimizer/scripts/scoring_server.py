@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Resident scoring daemon for the X post analyzer.
+
+Keeps one warm interpreter (imports done, patterns compiled, optional result
+cache) and serves requests over a Unix socket or localhost TCP. The protocol
+is newline-delimited JSON: one request object per line, one response per
+line, in request order. Clients may pipeline many requests without waiting.
+
+Requests:
+    {"id": 1, "op": "analyze", "post": {"text": "...", "include_media": true, "media_type": "image"}}
+    {"id": 6, "op": "analyze", "post": {"text": "...", "media_files": ["clips/launch.mp4"]}}   # needs --media-root
+    {"id": 2, "op": "analyze", "posts": [{...}, {...}], "report": true}
+    {"id": 3, "op": "quick_score", "post": {"text": "..."}}      # or "posts": [...]
+    {"id": 4, "op": "compare", "posts": [{...}, {...}], "top_k": 5}
+    {"id": 5, "op": "ping"}
+
+Responses:
+    {"id": 1, "ok": true, "result": {...}}
+    {"id": 9, "ok": false, "error": "unknown op 'x'"}
+
+Usage:
+    python scripts/scoring_server.py --socket /tmp/x-analyzer.sock
+    python scripts/scoring_server.py --port 8765 --cache 50000
+    python scripts/scoring_server.py --socket /tmp/x-analyzer.sock --rules rules.json   # kill -HUP reloads rules.json
+    python scripts/scoring_server.py --port 8765 --media-root ~/drafts/media
+
+    from scoring_server import ScoringClient
+    with ScoringClient(socket_path="/tmp/x-analyzer.sock") as client:
+        score = client.request("quick_score", post={"text": "What's your take?"})["result"]
+
+media_files are refused unless the server runs with --media-root; relative
+paths resolve under it, and paths that resolve outside it are rejected.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from analyze_x_post import (
+    AnalysisResult,
+    analyze_post,
+    compare_posts,
+    enable_cache,
+    format_report,
+    get_rules,
+    load_rules,
+    quick_score,
+)
+
+
+DEFAULT_QUEUE_SIZE = 1024
+MAX_LINE_BYTES = 1 << 20
+
+
+def result_payload(result: AnalysisResult) -> dict:
+    """JSON-ready dict of an AnalysisResult (PostType as its string value)."""
+    payload = result.to_dict()
+    payload["post_type"] = result.post_type.value
+    return payload
+
+
+def _media_files(paths, media_root: Optional[str]) -> Optional[list]:
+    """Resolve client media paths under media_root; refuse them if there is none or they escape it."""
+    if not paths:
+        return None
+    if media_root is None:
+        raise ValueError("media_files are disabled; start the server with --media-root to allow them")
+    if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+        raise ValueError("media_files must be a list of paths")
+    root = os.path.realpath(os.path.expanduser(media_root))
+    resolved = []
+    for path in paths:
+        full = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, full]) != root:
+            raise ValueError(f"media file {path!r} is outside the media root")
+        resolved.append(full)
+    return resolved
+
+
+def _post_kwargs(post, media_root: Optional[str] = None) -> dict:
+    if isinstance(post, str):
+        return {"text": post}
+    if not isinstance(post, dict):
+        raise ValueError("post must be an object or a string")
+    return {
+        "text": post.get("text", ""),
+        "include_media": bool(post.get("include_media", False)),
+        "media_type": post.get("media_type"),
+        "media_files": _media_files(post.get("media_files"), media_root),
+    }
+
+
+def _posts(request: dict, media_root: Optional[str] = None) -> tuple[list, bool]:
+    """Return (posts, batched) from a request's "post" or "posts" field."""
+    if "posts" in request:
+        if not isinstance(request["posts"], list):
+            raise ValueError("posts must be a list")
+        return [_post_kwargs(p, media_root) for p in request["posts"]], True
+    if "post" in request:
+        return [_post_kwargs(request["post"], media_root)], False
+    raise ValueError("request needs a 'post' or 'posts' field")
+
+
+def handle_request(request: dict, media_root: Optional[str] = None):
+    """
+    Run one decoded request and return its result (raises ValueError on bad input).
+
+    media_files are only opened under media_root; without one they are refused.
+    """
+    op = request.get("op")
+
+    if op == "ping":
+        return "pong"
+
+    if op == "analyze":
+        posts, batched = _posts(request, media_root)
+        out = []
+        for kwargs in posts:
+            result = analyze_post(**kwargs)
+            payload = result_payload(result)
+            if request.get("report"):
+                payload["report"] = format_report(result, verbose=request.get("verbose", True))
+            out.append(payload)
+        return out if batched else out[0]
+
+    if op == "quick_score":
+        posts, batched = _posts(request, media_root)
+        scores = [quick_score(**kwargs) for kwargs in posts]
+        return scores if batched else scores[0]
+
+    if op == "compare":
+        posts, _ = _posts(request, media_root)
+        return compare_posts(posts, top_k=request.get("top_k"))
+
+    raise ValueError(f"unknown op {op!r}")
+
+
+class ScoringServer:
+    """
+    asyncio server: per-connection pipelining, one bounded work queue.
+
+    Requests run one at a time on a single worker thread, so the event loop
+    keeps accepting connections and reading requests while one is scored.
+    Analysis itself is not parallel; run several servers for that.
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE, media_root: Optional[str] = None):
+        self.queue_size = queue_size
+        self.media_root = media_root
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._connections = set()
+        self._stopping = None
+
+    async def start(self, socket_path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._stopping = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="x-analyzer")
+        self._worker = asyncio.create_task(self._work())
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self._server = await asyncio.start_unix_server(self._accept, path=socket_path, limit=MAX_LINE_BYTES)
+        else:
+            self._server = await asyncio.start_server(self._accept, host=host, port=port, limit=MAX_LINE_BYTES)
+        return self._server
+
+    def run_exclusive(self, fn, *args) -> asyncio.Future:
+        """Run fn on the worker thread, between requests."""
+        return asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _work(self) -> None:
+        """Run queued requests one at a time on the worker thread, off the event loop."""
+        while True:
+            request, future = await self._queue.get()
+            try:
+                result = await self.run_exclusive(handle_request, request, self.media_root)
+                if not future.cancelled():
+                    future.set_result({"id": request.get("id"), "ok": True, "result": result})
+            except Exception as exc:  # report to the client, keep serving
+                if not future.cancelled():
+                    future.set_result({"id": request.get("id"), "ok": False, "error": str(exc)})
+            finally:
+                self._queue.task_done()
+
+    def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve each connection in a task of our own, so stop() can cancel and await it."""
+        task = asyncio.create_task(self._serve(reader, writer))
+        self._connections.add(task)
+        task.add_done_callback(self._connections.discard)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        pending = asyncio.Queue(maxsize=self.queue_size)
+        responder = asyncio.create_task(self._respond(pending, writer))
+        loop = asyncio.get_running_loop()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    future = loop.create_future()
+                    future.set_result({"id": None, "ok": False, "error": "request line too long"})
+                    await pending.put(future)
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                future = loop.create_future()
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as exc:
+                    future.set_result({"id": None, "ok": False, "error": f"bad request: {exc}"})
+                    await pending.put(future)
+                    continue
+                # Both puts block when full, which stops reading from this client
+                await self._queue.put((request, future))
+                await pending.put(future)
+            # Flush the responses still owed to this client
+            await pending.put(None)
+            await responder
+        except ConnectionError:
+            pass
+        finally:
+            # On cancellation (server stop) the responder is cancelled too and
+            # CancelledError propagates once the connection is closed
+            responder.cancel()
+            await asyncio.gather(responder, return_exceptions=True)
+            writer.close()
+
+    async def _respond(self, pending: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        """Write responses in request order as they complete."""
+        while (future := await pending.get()) is not None:
+            response = await future
+            writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            if pending.empty():
+                await writer.drain()
+        await writer.drain()
+
+    async def stop(self) -> None:
+        """Stop accepting, finish queued work, and close every connection."""
+        self._stopping.set()
+        if self._server is not None:
+            self._server.close()
+        await self._queue.join()
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+
+def reload_rules(path: str) -> None:
+    """Compile and install a rules file; on error keep serving with the current rules."""
+    try:
+        ruleset = load_rules(path)
+    except (OSError, ValueError) as exc:
+        print(f"Rules reload failed, keeping version {get_rules().version!r}: {exc}", file=sys.stderr)
+        return
+    print(f"Loaded rules version {ruleset.version!r} from {path}", file=sys.stderr)
+
+
+async def serve(
+    socket_path: Optional[str],
+    host: str,
+    port: int,
+    queue_size: int,
+    rules_path: Optional[str] = None,
+    media_root: Optional[str] = None,
+) -> None:
+    server = ScoringServer(queue_size=queue_size, media_root=media_root)
+    listener = await server.start(socket_path=socket_path, host=host, port=port)
+    where = socket_path or "%s:%d" % listener.sockets[0].getsockname()[:2]
+    print(f"X analyzer listening on {where}", file=sys.stderr)
+
+    done = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, done.set)
+    if rules_path:
+        # Runs on the worker thread between requests, so no request sees two rulesets
+        loop.add_signal_handler(signal.SIGHUP, server.run_exclusive, reload_rules, rules_path)
+    await done.wait()
+
+    print("Shutting down...", file=sys.stderr)
+    await server.stop()
+    if socket_path and os.path.exists(socket_path):
+        os.remove(socket_path)
+
+
+class ScoringClient:
+    """Minimal blocking client; request_many() pipelines a batch of requests."""
+
+    def __init__(self, socket_path: Optional[str] = None, host: str = "127.0.0.1", port: int = 8765):
+        if socket_path:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(socket_path)
+        else:
+            self._sock = socket.create_connection((host, port))
+        self._file = self._sock.makefile("rwb")
+        self._next_id = 0
+
+    def request_many(self, requests: list[dict]) -> list[dict]:
+        for request in requests:
+            if "id" not in request:
+                self._next_id += 1
+                request = {**request, "id": self._next_id}
+            self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+        self._file.flush()
+        return [json.loads(self._file.readline()) for _ in requests]
+
+    def request(self, op: str, **fields) -> dict:
+        return self.request_many([{"op": op, **fields}])[0]
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the X post analyzer over a local socket.")
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--socket", help="Unix socket path")
+    where.add_argument("--port", type=int, default=8765, help="TCP port on --host (default: 8765)")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE_SIZE, help="Max queued requests")
+    parser.add_argument("--cache", type=int, default=0, help="Enable an LRU result cache of this size")
+    parser.add_argument("--rules", help="Rules JSON file to load at start and reload on SIGHUP")
+    parser.add_argument("--media-root", help="Allow media_files in requests, resolved under this directory")
+    args = parser.parse_args(argv)
+
+    if args.cache:
+        enable_cache(maxsize=args.cache)
+    if args.rules:
+        load_rules(args.rules)
+    asyncio.run(serve(args.socket, args.host, args.port, args.queue, args.rules, args.media_root))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Machine-readable encodings of AnalysisResult: JSON Lines and a compact binary format.
+
+Both follow the AnalysisResult.to_dict() schema (RESULT_SCHEMA_VERSION):
+every field in declaration order, post_type as its POST_TYPE_CODES code and
+the probabilities as a flat p_* object. Batch writers encode straight from
+the result objects to the output handle, with no per-post dict, and flush in
+buffered blocks.
+
+Binary layout (little-endian): a stream header (MAGIC, u16 schema version),
+then one record per result. A record is a u32 body length followed by the
+body: the numeric fields as one fixed struct (weighted_score, score_breakdown
+and probabilities as f64 in ACTIONS order, scores as u8, counts as u32),
+then media_type, detected_patterns, strengths, weaknesses and suggestions,
+each as a u32 item count (0xFFFFFFFF for a None media_type) plus u32
+byte lengths and UTF-8 bytes.
+
+Usage:
+    python scripts/serialize.py posts.jsonl -o results.jsonl
+    python scripts/serialize.py posts.jsonl -o results.xar --format binary --workers 8
+
+    from serialize import write_jsonl, write_binary, read_binary
+    with open("results.xar", "wb") as out:
+        write_binary(analyze_posts(posts), out)
+    with open("results.xar", "rb") as f:
+        for result in read_binary(f):
+            ...
+"""
+
+import argparse
+import json
+import struct
+import sys
+from operator import attrgetter, itemgetter
+from typing import IO, Iterable, Iterator, Optional
+
+from analyze_x_post import (
+    ACTIONS,
+    POST_TYPE_CODES,
+    RESULT_SCHEMA_VERSION,
+    AnalysisResult,
+    PostType,
+    ProbabilityEstimates,
+    analyze_posts,
+)
+
+
+MAGIC = b"XPAR"
+FORMATS = ("jsonl", "binary")
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_POST_TYPES = tuple(PostType)
+_PROBABILITY_KEYS = tuple(f"p_{action}" for action in ACTIONS)
+_breakdown_values = itemgetter(*ACTIONS)
+_probability_values = attrgetter(*_PROBABILITY_KEYS)
+_JSON_BOOLS = ("false", "true")
+
+# One JSON line per result, laid out exactly as AnalysisResult.to_json()
+_JSON_TEMPLATE = (
+    '{"weighted_score":%r,"score_breakdown":{'
+    + ",".join(f'"{action}":%r' for action in ACTIONS)
+    + '},"reply_potential":%r,"shareability":%r,"media_optimization":%r,'
+    '"negative_signal_safety":%r,"overall_score":%r,"post_type":%d,"detected_patterns":%s,'
+    '"probabilities":{'
+    + ",".join(f'"{key}":%r' for key in _PROBABILITY_KEYS)
+    + '},"strengths":%s,"weaknesses":%s,"suggestions":%s,'
+    '"char_count":%r,"word_count":%r,"has_question":%s,"has_media":%s,"media_type":%s}'
+)
+
+_HEADER = struct.Struct("<4sH")
+_LENGTH = struct.Struct("<I")
+_FIXED = struct.Struct(f"<d{len(ACTIONS)}d6B2?2I{len(ACTIONS)}d")
+_NONE = 0xFFFFFFFF
+
+
+# === JSON Lines ===
+
+def json_line(result: AnalysisResult) -> str:
+    """AnalysisResult.to_json() without building the intermediate dict."""
+    if list(result.score_breakdown) != list(ACTIONS):
+        return result.to_json()
+    return _JSON_TEMPLATE % (
+        result.weighted_score,
+        *_breakdown_values(result.score_breakdown),
+        result.reply_potential,
+        result.shareability,
+        result.media_optimization,
+        result.negative_signal_safety,
+        result.overall_score,
+        POST_TYPE_CODES[result.post_type],
+        _encode(result.detected_patterns),
+        *_probability_values(result.probabilities),
+        _encode(result.strengths),
+        _encode(result.weaknesses),
+        _encode(result.suggestions),
+        result.char_count,
+        result.word_count,
+        _JSON_BOOLS[bool(result.has_question)],
+        _JSON_BOOLS[bool(result.has_media)],
+        _encode(result.media_type),
+    )
+
+
+def write_jsonl(results: Iterable[AnalysisResult], out: IO[str], buffer_lines: int = 1000) -> int:
+    """
+    Write one json_line() per result to a text handle.
+
+    Returns:
+        Number of results written
+    """
+    buffer = []
+    count = 0
+    for result in results:
+        buffer.append(json_line(result) + "\n")
+        count += 1
+        if len(buffer) >= buffer_lines:
+            out.writelines(buffer)
+            buffer.clear()
+    out.writelines(buffer)
+    out.flush()
+    return count
+
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[AnalysisResult]:
+    """Decode results from JSON lines (e.g. an open file); blank lines are skipped."""
+    for line in lines:
+        if line.strip():
+            yield AnalysisResult.from_dict(json.loads(line))
+
+
+# === Binary ===
+
+def _pack_strings(items: list) -> bytes:
+    encoded = [item.encode("utf-8") for item in items]
+    return struct.pack(f"<I{len(encoded)}I", len(encoded), *map(len, encoded)) + b"".join(encoded)
+
+
+def _unpack_strings(data: bytes, offset: int) -> tuple[Optional[list], int]:
+    (count,) = _LENGTH.unpack_from(data, offset)
+    offset += 4
+    if count == _NONE:
+        return None, offset
+    lengths = struct.unpack_from(f"<{count}I", data, offset)
+    offset += 4 * count
+    items = []
+    for length in lengths:
+        items.append(data[offset:offset + length].decode("utf-8"))
+        offset += length
+    return items, offset
+
+
+def encode_binary(result: AnalysisResult) -> bytes:
+    """One length-prefixed binary record."""
+    media_type = struct.pack("<I", _NONE) if result.media_type is None else _pack_strings([result.media_type])
+    body = b"".join((
+        _FIXED.pack(
+            result.weighted_score,
+            *_breakdown_values(result.score_breakdown),
+            POST_TYPE_CODES[result.post_type],
+            result.reply_potential,
+            result.shareability,
+            result.media_optimization,
+            result.negative_signal_safety,
+            result.overall_score,
+            result.has_question,
+            result.has_media,
+            result.char_count,
+            result.word_count,
+            *_probability_values(result.probabilities),
+        ),
+        media_type,
+        _pack_strings(result.detected_patterns),
+        _pack_strings(result.strengths),
+        _pack_strings(result.weaknesses),
+        _pack_strings(result.suggestions),
+    ))
+    return _LENGTH.pack(len(body)) + body
+
+
+def decode_binary(data: bytes, offset: int = 0) -> tuple[AnalysisResult, int]:
+    """
+    Decode the record starting at offset.
+
+    Returns:
+        (result, offset of the next record)
+    """
+    (length,) = _LENGTH.unpack_from(data, offset)
+    end = offset + 4 + length
+    values = _FIXED.unpack_from(data, offset + 4)
+    n = len(ACTIONS)
+    post_type, reply, share, media, safety, overall, has_question, has_media, chars, words = values[1 + n:11 + n]
+
+    position = offset + 4 + _FIXED.size
+    media_type, position = _unpack_strings(data, position)
+    patterns, position = _unpack_strings(data, position)
+    strengths, position = _unpack_strings(data, position)
+    weaknesses, position = _unpack_strings(data, position)
+    suggestions, position = _unpack_strings(data, position)
+    if position != end:
+        raise ValueError(f"corrupt record at byte {offset}")
+
+    result = AnalysisResult(
+        weighted_score=values[0],
+        score_breakdown=dict(zip(ACTIONS, values[1:1 + n])),
+        reply_potential=reply,
+        shareability=share,
+        media_optimization=media,
+        negative_signal_safety=safety,
+        overall_score=overall,
+        post_type=_POST_TYPES[post_type],
+        detected_patterns=patterns,
+        probabilities=ProbabilityEstimates(*values[11 + n:]),
+        strengths=strengths,
+        weaknesses=weaknesses,
+        suggestions=suggestions,
+        char_count=chars,
+        word_count=words,
+        has_question=has_question,
+        has_media=has_media,
+        media_type=media_type[0] if media_type else None,
+    )
+    return result, end
+
+
+def write_binary(results: Iterable[AnalysisResult], out: IO[bytes], buffer_bytes: int = 1 << 20) -> int:
+    """
+    Write the stream header and one record per result to a binary handle.
+
+    Returns:
+        Number of results written
+    """
+    buffer = bytearray(_HEADER.pack(MAGIC, RESULT_SCHEMA_VERSION))
+    count = 0
+    for result in results:
+        buffer += encode_binary(result)
+        count += 1
+        if len(buffer) >= buffer_bytes:
+            out.write(buffer)
+            buffer.clear()
+    out.write(buffer)
+    out.flush()
+    return count
+
+
+def read_binary(handle: IO[bytes], chunk_bytes: int = 1 << 20) -> Iterator[AnalysisResult]:
+    """Decode a write_binary() stream incrementally, chunk_bytes at a time."""
+    header = handle.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError("not an analysis result stream")
+    magic, version = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("not an analysis result stream")
+    if version != RESULT_SCHEMA_VERSION:
+        raise ValueError(f"unsupported schema version {version} (expected {RESULT_SCHEMA_VERSION})")
+
+    data = b""
+    while True:
+        chunk = handle.read(chunk_bytes)
+        data += chunk
+        offset = 0
+        # Decode every complete record in the buffer
+        while len(data) - offset >= 4:
+            (length,) = _LENGTH.unpack_from(data, offset)
+            if len(data) - offset - 4 < length:
+                break
+            result, offset = decode_binary(data, offset)
+            yield result
+        data = data[offset:]
+        if not chunk:
+            if data:
+                raise ValueError("truncated record at end of stream")
+            return
+
+
+def main(argv: Optional[list] = None) -> int:
+    from corpus_stream import FORMATS as INPUT_FORMATS, read_posts
+
+    parser = argparse.ArgumentParser(description="Analyze posts and write full results as JSON Lines or binary.")
+    parser.add_argument("input", help="JSONL/CSV file (optionally .gz), or - for stdin")
+    parser.add_argument("-o", "--output", required=True, help="Output file")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, help="Input format (default: from extension)")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl", help="Output encoding (default: jsonl)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = all cores)")
+    args = parser.parse_args(argv)
+
+    results = analyze_posts(read_posts(args.input, args.input_format), workers=args.workers)
+    if args.format == "binary":
+        with open(args.output, "wb") as out:
+            count = write_binary(results, out)
+    else:
+        with open(args.output, "w", encoding="utf-8") as out:
+            count = write_jsonl(results, out)
+
+    print(f"Wrote {count} results to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo confidence intervals for weighted scores (requires NumPy).
+
+The action weights are estimates quoted as ranges (reply ~15-20x, repost
+~12-15x, ...), and estimate_probabilities() returns point estimates. This
+module samples both and reports each post's weighted-score distribution:
+the mean, CI bounds and P(score < 0). All draws for a batch of posts are
+one array computation, with no Python loop per draw.
+
+Weights are drawn once per draw and shared by every post, so rankings
+compare posts under the same weight hypothesis. By default each weight is
+drawn from a symmetric triangular band around its active ActionWeights
+value (see default_weight_spec), so intervals stay centered on the weights
+weighted_score uses, including after apply_profile(). Each probability is drawn
+from a Beta distribution whose mean is the point estimate; a higher
+concentration means less noise.
+
+Usage:
+    from uncertainty import score_intervals, compare_posts_with_intervals
+    stats = score_intervals(probs, draws=4000, ci=0.9)   # probs: N x 12 from batch_scorer
+    print(stats["mean"], stats["lower"], stats["upper"], stats["p_negative"])
+
+    print(compare_posts_with_intervals(posts, by="lower", top_k=5))
+
+    # Custom distributions: fixed value, ("uniform", lo, hi), ("normal", mean, sd),
+    # ("triangular", lo, mode, hi)
+    stats = score_intervals(probs, weight_spec={**default_weight_spec(), "block": ("uniform", -1500, -500)})
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+from analyze_x_post import ACTIONS, AnalysisResult, ActionWeights, analyze_posts
+
+
+# Relative half-width of each action's weight band; widths follow the ranges
+# in references/weighted-scorer.md (reply ~15-20x, repost ~12-15x, ...)
+WEIGHT_SPREAD = {
+    "reply": 0.15,
+    "repost": 0.12,
+    "quote": 0.10,
+    "like": 0.2,
+    "video_view": 0.17,
+    "photo_expand": 0.2,
+    "bookmark": 0.2,
+    "click": 0.33,
+    "profile_click": 0.25,
+    "block": 0.25,
+    "mute": 0.25,
+    "report": 0.25,
+}
+
+# Beta concentration for probability draws (mean stays at the point estimate)
+DEFAULT_CONCENTRATION = 50.0
+
+# Upper bound on floats held per chunk of posts x draws x actions
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def default_weight_spec(spread: Optional[dict] = None) -> dict:
+    """
+    Triangular weight distributions peaked at the active ActionWeights.
+
+    Args:
+        spread: {action: relative half-width} (default WEIGHT_SPREAD);
+            unlisted actions stay fixed
+    """
+    spread = WEIGHT_SPREAD if spread is None else spread
+    spec = {}
+    for action, width in spread.items():
+        weight = getattr(ActionWeights, action.upper())
+        band = abs(weight) * width
+        spec[action] = ("triangular", weight - band, weight, weight + band)
+    return spec
+
+
+def sample_weights(draws: int, spec: Optional[dict] = None, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Draw weight vectors from per-action distributions.
+
+    Args:
+        draws: Number of weight vectors
+        spec: {action: float | ("uniform", lo, hi) | ("normal", mean, sd) |
+            ("triangular", lo, mode, hi)} (default: default_weight_spec());
+            unlisted actions stay fixed at their ActionWeights value
+
+    Returns:
+        draws x len(ACTIONS) matrix, columns in ACTIONS order
+    """
+    rng = rng or np.random.default_rng()
+    spec = default_weight_spec() if spec is None else spec
+    unknown = set(spec) - set(ACTIONS)
+    if unknown:
+        raise ValueError(f"unknown actions in weight spec: {', '.join(sorted(unknown))}")
+
+    weights = np.empty((draws, len(ACTIONS)))
+    for col, action in enumerate(ACTIONS):
+        dist = spec.get(action, getattr(ActionWeights, action.upper()))
+        if isinstance(dist, (int, float)):
+            weights[:, col] = dist
+            continue
+        kind, *params = dist
+        if kind == "uniform":
+            weights[:, col] = rng.uniform(*params, size=draws)
+        elif kind == "normal":
+            weights[:, col] = rng.normal(*params, size=draws)
+        elif kind == "triangular":
+            weights[:, col] = rng.triangular(*params, size=draws)
+        else:
+            raise ValueError(f"unknown distribution {kind!r} for {action}")
+    return weights
+
+
+def sample_probabilities(
+    probs: np.ndarray,
+    draws: int,
+    concentration: float = DEFAULT_CONCENTRATION,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Draw probabilities around point estimates: Beta(c·p, c·(1 - p)) per cell.
+
+    Cells with p of exactly 0 or 1 (e.g. no media) stay fixed.
+
+    Returns:
+        N x draws x len(ACTIONS) array
+    """
+    rng = rng or np.random.default_rng()
+    p = np.broadcast_to(np.asarray(probs, dtype=float)[:, None, :], (len(probs), draws, len(ACTIONS)))
+    out = p.copy()
+    live = (p > 0) & (p < 1)
+    out[live] = rng.beta(concentration * p[live], concentration * (1 - p[live]))
+    return out
+
+
+def score_intervals(
+    probs: np.ndarray,
+    draws: int = 2000,
+    ci: float = 0.9,
+    weight_spec: Optional[dict] = None,
+    concentration: Optional[float] = DEFAULT_CONCENTRATION,
+    seed: Optional[int] = 0,
+) -> dict:
+    """
+    Monte Carlo weighted-score statistics for every row of a probability matrix.
+
+    Args:
+        probs: N x len(ACTIONS) point estimates (estimate_probabilities_batch
+            or probability_matrix)
+        draws: Draws per post
+        ci: Central interval width (0.9 -> 5th and 95th percentiles)
+        weight_spec: Weight distributions (default: default_weight_spec())
+        concentration: Beta concentration for probabilities; None keeps the
+            point estimates and samples weights only
+        seed: RNG seed (None for fresh entropy)
+
+    Returns:
+        {"mean", "std", "lower", "upper", "p_negative"}: arrays of length N
+    """
+    probs = np.asarray(probs, dtype=float).reshape(-1, len(ACTIONS))
+    rng = np.random.default_rng(seed)
+    weights = sample_weights(draws, weight_spec, rng)
+    tail = (1 - ci) / 2
+
+    n = len(probs)
+    stats = {key: np.empty(n) for key in ("mean", "std", "lower", "upper", "p_negative")}
+    chunk = max(1, _CHUNK_ELEMENTS // (draws * len(ACTIONS)))
+    for start in range(0, n, chunk):
+        block = probs[start:start + chunk]
+        if concentration is None:
+            scores = block @ weights.T
+        else:
+            sampled = sample_probabilities(block, draws, concentration, rng)
+            scores = np.einsum("ndk,dk->nd", sampled, weights)
+        rows = slice(start, start + len(block))
+        stats["mean"][rows] = scores.mean(axis=1)
+        stats["std"][rows] = scores.std(axis=1)
+        stats["lower"][rows], stats["upper"][rows] = np.quantile(scores, [tail, 1 - tail], axis=1)
+        stats["p_negative"][rows] = (scores < 0).mean(axis=1)
+    return stats
+
+
+def probability_matrix(results: Iterable[AnalysisResult]) -> np.ndarray:
+    """N x len(ACTIONS) matrix of the probabilities in AnalysisResults."""
+    rows = [[getattr(r.probabilities, f"p_{action}") for action in ACTIONS] for r in results]
+    return np.array(rows, dtype=float).reshape(-1, len(ACTIONS))
+
+
+def compare_posts_with_intervals(
+    posts: Iterable[dict],
+    by: str = "mean",
+    top_k: Optional[int] = None,
+    workers: int = 1,
+    **interval_kwargs,
+) -> str:
+    """
+    compare_posts() with a Monte Carlo interval for every post.
+
+    Args:
+        posts: Iterable of dicts with keys: text, include_media (optional), media_type (optional)
+        by: Ranking key: "mean", "lower" (pessimistic), "upper" or "point"
+            (the deterministic weighted_score)
+        top_k: Only render the best k posts
+        workers: Worker processes for analysis (see analyze_posts)
+        **interval_kwargs: Passed to score_intervals (draws, ci, weight_spec, ...)
+
+    Returns:
+        Formatted comparison report
+    """
+    if by not in ("mean", "lower", "upper", "point"):
+        raise ValueError(f"unknown ranking key {by!r}")
+    posts = list(posts)
+    results = list(analyze_posts(posts, workers=workers))
+    stats = score_intervals(probability_matrix(results), **interval_kwargs)
+    ci = interval_kwargs.get("ci", 0.9)
+
+    key = np.array([r.weighted_score for r in results]) if by == "point" else stats[by]
+    order = np.argsort(-key, kind="stable")[:top_k]
+
+    lines = [f"### Post Comparison (Ranked by {by} weighted score, {ci:.0%} CI)", ""]
+    for rank, i in enumerate(order, 1):
+        result = results[i]
+        preview = posts[i].get("text", "")[:50]
+        emoji = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else f"{rank}."
+        lines.append(
+            f"{emoji} Post {i + 1}: **{stats['mean'][i]:.2f}** "
+            f"[{stats['lower'][i]:.2f}, {stats['upper'][i]:.2f}] — \"{preview}...\""
+        )
+        lines.append(
+            f"   Type: {result.post_type.value} | Point: {result.weighted_score:.2f} | "
+            f"P(score < 0): {stats['p_negative'][i]:.1%}"
+        )
+    return "\n".join(lines)
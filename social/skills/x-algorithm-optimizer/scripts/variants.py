@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+Combinatorial variant search: score every hook × body × CTA assembly.
+
+Each slot holds alternative texts; an assembly takes one text per slot and
+joins the non-empty ones with a separator. Per-part work is done once:
+uppercase, word, digit-run, URL and list-marker counts, which literal keys
+each part contains, and which pattern groups match inside it far enough from
+its edges that no join can change the match. Per assembly only the joins are
+new: counts are corrected per join pair, and a group is checked in the text
+around each join (memoized by the two parts). The full text is searched only
+when a match could reach past both parts of a join. Scores are identical to
+score_post() on the joined text.
+
+Small searches are exhaustive; pass beam_width to keep only the best partial
+assemblies after each slot instead.
+
+Usage:
+    python scripts/variants.py brief.json --top 10
+    python scripts/variants.py brief.json --beam 200 --media image --json
+
+    brief.json: {"hook": ["...", "..."], "body": ["..."], "cta": ["...", ""]}
+    (slots in order; "" leaves the slot out of that assembly)
+
+    from variants import VariantSearch
+    search = VariantSearch([hooks, bodies, ctas], include_media=True, media_type="image")
+    for variant in search.top(10):
+        print(variant.score.weighted_score, variant.parts, variant.text)
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import sys
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterator, Optional, Sequence
+
+from analyze_x_post import (
+    _DIGIT_RUN_RE,
+    _LIST_MARKER_RE,
+    _URL_RE,
+    AnalysisResult,
+    PostFeatures,
+    ScoreResult,
+    analyze_features,
+    extract_features,
+    get_rules,
+    score_components,
+    weighted_score_from_components,
+)
+
+
+@dataclass
+class Variant:
+    """One assembly: the chosen index in each slot, its text and scores."""
+    parts: tuple
+    text: str
+    score: ScoreResult
+
+
+class _Part:
+    """Per-part facts reused by every assembly containing the part."""
+    __slots__ = (
+        "text", "lower", "caps", "questions", "thread", "counts", "solid", "sigma", "padded",
+        "candidates", "sure_first", "sure_middle", "sure_last", "cuts", "_features",
+    )
+
+    def __init__(self, text: str, rules):
+        self.text = text
+        self.lower = lower = text.lower()
+        self.caps = sum(map(str.isupper, text))
+        self.questions = text.count("?")
+        self.thread = "🧵" in text
+        self.counts = _counts(text)
+        # No whitespace: a word, URL, digit run or list marker can run through it
+        self.solid = bool(text) and not any(map(str.isspace, text))
+        # Capital sigma lowercases by context, which a join can change
+        self.sigma = "Σ" in text
+        # (leading, trailing) whitespace lengths, or None if the part is all whitespace
+        self.padded = (len(text) - len(text.lstrip()), len(text) - len(text.rstrip())) if text.strip() else None
+        self.candidates = _key_groups(lower, rules)
+
+        # Regex groups with a match no neighbour can change, by where the
+        # part sits: the match starts after the part's first char (or the
+        # part comes first) and everything it reads ends inside the part (or
+        # the part comes last). cuts[name] bounds the window a join needs to
+        # see of this part, on its left and on its right (see _join_match)
+        spaces = [i for i, c in enumerate(lower) if c.isspace()]
+        n = len(lower)
+        first, middle, last = set(), set(), set()
+        self.cuts = {}
+        for name, rx in rules.groups.items():
+            if name in rules.plain_groups:
+                continue
+            width, most = rules.match_widths[name], rules.match_spaces[name]
+            m = rx.search(lower, 1)
+            if m is not None:
+                last.add(name)
+                end = _read_end(spaces, m.start(), width, most)
+                if end is not None and end <= n:
+                    middle.add(name)
+            m = rx.search(lower)
+            if m is not None:
+                end = _read_end(spaces, m.start(), width, most)
+                if end is not None and end <= n:
+                    first.add(name)
+            if width is None and most is None:
+                continue
+            # Left of a join: a match reading into it starts after this
+            starts = []
+            if width is not None:
+                starts.append(n - width - 2)
+            if most is not None:
+                i = bisect_right(spaces, n - 2) - 1 - most
+                if i >= 0:
+                    starts.append(spaces[i])
+            left = max(starts) if starts else -1
+            # Right of a join: a match starting at or before it reads up to this
+            right = _read_end(spaces, 0, width, most)
+            self.cuts[name] = (
+                left if left >= 0 else None,
+                right if right is not None and right <= n else None,
+            )
+        self.sure_first, self.sure_middle, self.sure_last = frozenset(first), frozenset(middle), frozenset(last)
+        self._features = None
+
+    def features(self, rules) -> PostFeatures:
+        """extract_features() of the part on its own."""
+        if self._features is None:
+            self._features = extract_features(self.text, rules=rules)
+        return self._features
+
+
+class _Prefix:
+    """All parts of an assembly but the last, summed so each last part only adds one join."""
+    __slots__ = ("parts", "text", "lower", "counts", "caps", "questions", "thread", "candidates", "sure", "joins", "exact")
+
+
+def _read_end(spaces: list, start: int, width: Optional[int], most: Optional[int]) -> Optional[int]:
+    """
+    Bound on the chars a match attempt at `start` reads (exclusive), or None.
+
+    An attempt consumes at most `width` chars, or stops before the whitespace
+    char after its `most` allowed ones, and checks \\b / $ up to two chars
+    beyond where it stands.
+    """
+    ends = []
+    if width is not None:
+        ends.append(start + width + 2)
+    if most is not None:
+        i = bisect_left(spaces, start) + most
+        if i < len(spaces):
+            ends.append(spaces[i] + 2)
+    return min(ends) if ends else None
+
+
+def _counts(text: str) -> tuple:
+    """(words, digit runs, URLs, list markers) as extract_features counts them."""
+    return (
+        len(text.split()),
+        len(_DIGIT_RUN_RE.findall(text)),
+        len(_URL_RE.findall(text)),
+        len(_LIST_MARKER_RE.findall(text)),
+    )
+
+
+def _key_groups(text_lower: str, rules) -> frozenset:
+    """Groups with at least one literal key in the text (match_pattern_groups' candidates)."""
+    candidates = set()
+    for key, names in rules.literal_index:
+        if key in text_lower:
+            candidates.update(names)
+    return frozenset(candidates)
+
+
+class VariantSearch:
+    """
+    Scores assemblies of per-slot alternatives under one ruleset.
+
+    The active ruleset is captured at construction; build a new search
+    after install_rules().
+
+    Args:
+        slots: One sequence of alternative texts per slot, in assembly order
+        include_media / media_type: Media settings shared by every assembly
+        separator: Placed between consecutive non-empty parts
+    """
+
+    def __init__(
+        self,
+        slots: Sequence[Sequence[str]],
+        include_media: bool = False,
+        media_type: Optional[str] = None,
+        separator: str = "\n\n",
+    ):
+        if not slots or not all(slots):
+            raise ValueError("every slot needs at least one alternative")
+        self.include_media = include_media
+        self.media_type = media_type
+        self.separator = separator
+        self._rules = rules = get_rules()
+        self._slots = [[_Part(text, rules) for text in slot] for slot in slots]
+        self._sep = _Part(separator, rules)
+        # A separator with whitespace at both ends ends every token at the join
+        self._sep_breaks = bool(separator) and separator[0].isspace() and separator[-1].isspace()
+        # A literal key crossing a join lies within this many chars of it
+        self._reach = max((len(key) for key, _ in rules.literal_index), default=1) - 1
+        self._joins = {}    # window around a join -> groups with a key in it
+        self._pairs = {}    # (left part, right part) -> count corrections at their join
+        self._matches = {}  # (group, left part, right part, first, last) -> see _join_match
+        self._scores = {}   # components -> weighted score
+
+    @property
+    def combinations(self) -> int:
+        """Number of assemblies an exhaustive search scores."""
+        count = 1
+        for slot in self._slots:
+            count *= len(slot)
+        return count
+
+    def _pair(self, left: _Part, right: _Part) -> tuple:
+        """
+        What joining left and right adds to their _counts(), and the groups
+        with a literal key crossing the join (None if the left part is
+        shorter than a key, so the window reaches further back).
+        """
+        joined = _counts(left.text + self.separator + right.text)
+        pair = tuple(j - l - s - r for j, l, s, r in zip(joined, left.counts, self._sep.counts, right.counts))
+        groups = None
+        if len(left.lower) >= self._reach:
+            groups = self._window_groups(left.lower[len(left.lower) - self._reach:] + self._sep.lower + right.lower[:self._reach])
+        pair = self._pairs[left, right] = pair + (groups,)
+        return pair
+
+    def _window_groups(self, window: str) -> frozenset:
+        """Groups with a literal key in the window around a join, memoized by the window."""
+        groups = self._joins.get(window)
+        if groups is None:
+            groups = self._joins[window] = _key_groups(window, self._rules)
+        return groups
+
+    def _join_match(self, name: str, left: _Part, right: _Part, first: bool, last: bool) -> Optional[bool]:
+        """
+        Whether group `name` matches across the join between two parts.
+
+        True or False if the window the join needs (see _Part.cuts) lies
+        within the two parts, where first and last say whether they are at
+        the ends of the text; None if it runs past them and only a full
+        search can tell. Memoized, since it depends on nothing else.
+        """
+        key = (name, left, right, first, last)
+        if key in self._matches:
+            return self._matches[key]
+        start, _ = left.cuts[name]
+        _, end = right.cuts[name]
+        found = None
+        if (start is not None or first) and (end is not None or last):
+            start = start or 0
+            end = len(right.lower) if end is None else end
+            window = left.lower[start:] + self._sep.lower + right.lower[:end]
+            m = self._rules.groups[name].search(window, 0 if first and start == 0 else 1)
+            # Later starts are inside the right part and are its own business
+            found = m is not None and m.start() <= len(left.lower) - start + len(self._sep.lower)
+        self._matches[key] = found
+        return found
+
+    def _prefix(self, parts: list) -> _Prefix:
+        """
+        Running sums over non-empty parts that are all followed by one more.
+
+        Words, digit runs, URLs and list markers are per-part counts plus a
+        correction per join (see _pair). That only holds while every token
+        crosses at most one join; if some middle part has no whitespace and
+        the separator doesn't stop tokens, or lowercasing depends on
+        context, exact is False and the whole text is scanned instead.
+        """
+        sep = self._sep
+        prefix = _Prefix()
+        prefix.parts = parts
+        prefix.text = self.separator.join(part.text for part in parts)
+        prefix.lower = sep.lower.join(part.lower for part in parts)
+        prefix.exact = not (
+            sep.sigma
+            or any(part.sigma for part in parts)
+            or (not self._sep_breaks and any(part.solid for part in parts[1:]))
+        )
+        joined = len(parts) - 1
+        counts = [count * joined for count in sep.counts]
+        for part in parts:
+            for i, count in enumerate(part.counts):
+                counts[i] += count
+        for left, right in zip(parts, parts[1:]):
+            for i, count in enumerate((self._pairs.get((left, right)) or self._pair(left, right))[:4]):
+                counts[i] += count
+        prefix.counts = counts
+        prefix.caps = sep.caps * joined + sum(part.caps for part in parts)
+        prefix.questions = sep.questions * joined + sum(part.questions for part in parts)
+        prefix.thread = (sep.thread and joined > 0) or any(part.thread for part in parts)
+
+        candidates = set(parts[0].candidates)
+        sure = set(parts[0].sure_first | self._rules.plain_groups)
+        offset = len(parts[0].lower)
+        for before, part in zip(parts, parts[1:]):
+            groups = self._pairs[before, part][4]
+            if groups is None:
+                groups = self._window_groups(prefix.lower[max(0, offset - self._reach):offset + len(sep.lower) + self._reach])
+            candidates |= groups
+            candidates |= part.candidates
+            sure |= part.sure_middle
+            offset += len(sep.lower) + len(part.lower)
+        prefix.candidates = candidates
+        prefix.sure = sure
+        prefix.joins = [(left, right, i == 0, False) for i, (left, right) in enumerate(zip(parts, parts[1:]))]
+        return prefix
+
+    def _extend(self, prefix: _Prefix, part: _Part) -> PostFeatures:
+        """extract_features() of prefix + separator + part (part non-empty)."""
+        rules = self._rules
+        sep = self._sep
+        text = prefix.text + self.separator + part.text
+        if not prefix.exact or part.sigma:
+            return extract_features(text, rules=rules)
+        left = len(prefix.lower)
+        lower = prefix.lower + sep.lower + part.lower
+
+        words, digit_runs, url_count, list_markers = prefix.counts
+        before = prefix.parts[-1]
+        pair = self._pairs.get((before, part)) or self._pair(before, part)
+        words += sep.counts[0] + part.counts[0] + pair[0]
+        digit_runs += sep.counts[1] + part.counts[1] + pair[1]
+        url_count += sep.counts[2] + part.counts[2] + pair[2]
+        list_markers += sep.counts[3] + part.counts[3] + pair[3]
+
+        # A candidate group is a hit if it is a plain phrase, if some part
+        # has a match no join can change (sure), or if a join has one across
+        # it; the full text is only searched when a join's window runs past
+        # its two parts
+        groups = pair[4]
+        if groups is None:
+            groups = self._window_groups(lower[max(0, left - self._reach):left + len(sep.lower) + self._reach])
+        candidates = prefix.candidates | part.candidates | groups
+        sure = prefix.sure | part.sure_last
+        hits = candidates & sure
+        joins = None
+        for name in candidates - sure:
+            if name in part.cuts:
+                if joins is None:
+                    joins = prefix.joins + [(before, part, len(prefix.parts) == 1, True)]
+                for join in joins:
+                    found = self._join_match(name, *join)
+                    if found is not False:
+                        break
+            else:
+                found = None
+            if found is None:
+                found = rules.groups[name].search(lower) is not None
+            if found:
+                hits.add(name)
+
+        char_count = len(text)
+        if url_count:
+            urls = _URL_RE.findall(text)
+            non_url_length = len(_URL_RE.sub("", text).strip())
+        else:
+            urls = []
+            first, last = prefix.parts[0].padded, part.padded
+            non_url_length = len(text.strip()) if first is None or last is None else char_count - first[0] - last[1]
+        return PostFeatures(
+            text=text,
+            text_lower=lower,
+            char_count=char_count,
+            word_count=words,
+            question_count=prefix.questions + sep.questions + part.questions,
+            caps_ratio=(prefix.caps + sep.caps + part.caps) / max(char_count, 1),
+            digit_runs=digit_runs,
+            urls=urls,
+            non_url_length=non_url_length,
+            list_markers=list_markers,
+            has_thread_emoji=prefix.thread or sep.thread or part.thread,
+            hits=frozenset(hits),
+        )
+
+    def _features(self, parts: list) -> PostFeatures:
+        """extract_features() of the assembly, built from the cached parts."""
+        parts = [part for part in parts if part.text]
+        if not parts:
+            return extract_features("", rules=self._rules)
+        if len(parts) == 1:
+            return parts[0].features(self._rules)
+        return self._extend(self._prefix(parts[:-1]), parts[-1])
+
+    def _weighted(self, features: PostFeatures) -> float:
+        components = score_components(features, self.include_media, self.media_type, self._rules)
+        score = self._scores.get(components)
+        if score is None:
+            score = self._scores[components] = weighted_score_from_components(
+                *components, self.include_media, self.media_type
+            )
+        return score
+
+    def _weighted_each(self, head: list, slot: list) -> Iterator[float]:
+        """Weighted score of head + each part of slot, sharing the work on head."""
+        head = [part for part in head if part.text]
+        prefix = self._prefix(head) if head else None
+        alone = None  # head on its own, for empty parts
+        for part in slot:
+            if prefix is not None and part.text:
+                yield self._weighted(self._extend(prefix, part))
+            elif part.text:
+                yield self._weighted(part.features(self._rules))
+            else:
+                if alone is None:
+                    alone = self._weighted(self._features(head))
+                yield alone
+
+    def _parts(self, indices: Sequence[int]) -> list:
+        return [slot[i] for slot, i in zip(self._slots, indices)]
+
+    def text(self, indices: Sequence[int]) -> str:
+        """The assembled text for one index per slot."""
+        return self.separator.join(part.text for part in self._parts(indices) if part.text)
+
+    def score(self, indices: Sequence[int]) -> ScoreResult:
+        """score_post() of one assembly."""
+        post_type, reply, share, media, safety = score_components(
+            self._features(self._parts(indices)), self.include_media, self.media_type, self._rules
+        )
+        return ScoreResult(
+            weighted_score=weighted_score_from_components(
+                post_type, reply, share, media, safety, self.include_media, self.media_type
+            ),
+            overall_score=int(reply * 0.40 + share * 0.25 + media * 0.15 + safety * 0.20),
+            post_type=post_type,
+            reply_potential=reply,
+            shareability=share,
+            media_optimization=media,
+            negative_signal_safety=safety,
+        )
+
+    def analyze(self, indices: Sequence[int]) -> AnalysisResult:
+        """Full analyze_post() result (with feedback) for one assembly."""
+        return analyze_features(
+            self._features(self._parts(indices)), self.include_media, self.media_type, rules=self._rules
+        )
+
+    def scores(self) -> Iterator[tuple[float, tuple]]:
+        """(weighted score, indices) for every assembly, in itertools.product order."""
+        *heads, last = self._slots
+        self._scores.clear()  # weights may have changed since the last search
+        for head in itertools.product(*(range(len(slot)) for slot in heads)):
+            scores = self._weighted_each([slot[i] for slot, i in zip(heads, head)], last)
+            for i, score in enumerate(scores):
+                yield score, head + (i,)
+
+    def _beam(self, width: int) -> list:
+        """Best (score, indices) after extending the width best prefixes one slot at a time."""
+        beam = [()]
+        self._scores.clear()
+        for depth, slot in enumerate(self._slots):
+            scored = (
+                (score, prefix + (i,))
+                for prefix in beam
+                for i, score in enumerate(self._weighted_each(self._parts(prefix), slot))
+            )
+            keep = heapq.nlargest(width, scored, key=lambda item: item[0])
+            if depth == len(self._slots) - 1:
+                return keep
+            beam = [indices for _, indices in keep]
+        return []
+
+    def top(self, k: int = 10, beam_width: Optional[int] = None) -> list:
+        """
+        The k best assemblies by weighted score (ties keep enumeration order).
+
+        Args:
+            k: Number of variants to return
+            beam_width: None scores every combination; otherwise keep only
+                the max(beam_width, k) best partial assemblies after each
+                slot, with prefixes scored as posts on their own
+
+        Returns:
+            List of Variant, best first
+        """
+        if beam_width is None:
+            best = heapq.nlargest(k, self.scores(), key=lambda item: item[0])
+        else:
+            best = self._beam(max(beam_width, k))[:k]
+        return [Variant(indices, self.text(indices), self.score(indices)) for _, indices in best]
+
+
+def search_variants(
+    slots: Sequence[Sequence[str]],
+    k: int = 10,
+    include_media: bool = False,
+    media_type: Optional[str] = None,
+    separator: str = "\n\n",
+    beam_width: Optional[int] = None,
+) -> list:
+    """VariantSearch(...).top(k, beam_width) in one call."""
+    return VariantSearch(slots, include_media, media_type, separator).top(k, beam_width)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Find the best-scoring hook/body/CTA assemblies.")
+    parser.add_argument("brief", help='JSON object of slot name -> list of texts, in assembly order')
+    parser.add_argument("--top", type=int, default=10, help="Variants to show (default: 10)")
+    parser.add_argument("--beam", type=int, help="Beam width (default: score every combination)")
+    parser.add_argument("--separator", default="\n\n", help="Text between parts (default: blank line)")
+    parser.add_argument("--media", choices=["image", "video", "gif"], help="Assume attached media of this type")
+    parser.add_argument("--json", action="store_true", help="Print JSON lines instead of a table")
+    args = parser.parse_args(argv)
+
+    with open(args.brief, encoding="utf-8") as f:
+        brief = json.load(f)
+    if not isinstance(brief, dict) or not all(isinstance(texts, list) for texts in brief.values()):
+        parser.error(f"{args.brief}: expected a JSON object of slot name -> list of texts")
+
+    names = list(brief)
+    search = VariantSearch(list(brief.values()), bool(args.media), args.media, args.separator)
+    variants = search.top(args.top, args.beam)
+    for rank, variant in enumerate(variants, 1):
+        if args.json:
+            print(json.dumps({
+                "rank": rank,
+                "weighted_score": variant.score.weighted_score,
+                "overall_score": variant.score.overall_score,
+                "post_type": variant.score.post_type.value,
+                "parts": dict(zip(names, variant.parts)),
+                "text": variant.text,
+            }, ensure_ascii=False))
+        else:
+            picks = ", ".join(f"{name}={i}" for name, i in zip(names, variant.parts))
+            print(f"#{rank}  {variant.score.weighted_score:+.3f}  {variant.score.post_type.value}  ({picks})")
+            print("    " + variant.text.replace("\n", "\n    "))
+    mode = f"beam {max(args.beam, args.top)}" if args.beam else "exhaustive"
+    print(f"{search.combinations} combinations ({mode})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
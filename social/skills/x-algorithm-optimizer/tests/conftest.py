@@ -0,0 +1,41 @@
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import analyze_x_post  # noqa: E402
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+@pytest.fixture(scope="session")
+def baseline():
+    """
+    Fixed corpus with the results the original analyzer gave for it.
+
+    baseline_results.json.gz holds [{"post": {text, include_media,
+    media_type}, "expected": AnalysisResult as a dict}] for 200 seeded
+    benchmark.generate_corpus(seed=1) posts plus hand-picked edge cases,
+    produced by scripts/analyze_x_post.py as of the first commit.
+    """
+    with gzip.open(os.path.join(DATA, "baseline_results.json.gz"), "rt", encoding="utf-8") as f:
+        rows = json.load(f)
+    return [(row["post"], analyze_x_post.AnalysisResult.from_dict(row["expected"])) for row in rows]
+
+
+@pytest.fixture(autouse=True)
+def restore_globals():
+    """Undo profile, rules, cache and percentile changes a test makes."""
+    profile = analyze_x_post.current_profile()
+    rules = analyze_x_post.get_rules()
+    yield
+    analyze_x_post.disable_cache()
+    analyze_x_post.disable_percentiles()
+    if analyze_x_post.get_rules() is not rules:
+        analyze_x_post.install_rules(rules)
+    if analyze_x_post.current_profile() != profile:
+        analyze_x_post.apply_profile(profile)
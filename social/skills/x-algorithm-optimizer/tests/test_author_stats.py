@@ -0,0 +1,84 @@
+"""TDigest accuracy and AuthorAggregator merges against a single pass."""
+
+import bisect
+import random
+
+import pytest
+
+from author_stats import DAY, AuthorAggregator, TDigest
+
+
+def rank_error(values, estimate, q):
+    """How far estimate's rank in the sorted values lies from q, as a fraction."""
+    return abs(bisect.bisect_left(values, estimate) / len(values) - q)
+
+
+@pytest.mark.parametrize("draw", [random.Random.random, random.Random.expovariate])
+def test_quantiles_close_to_exact(draw):
+    rng = random.Random(5)
+    values = [draw(rng) if draw is random.Random.random else draw(rng, 1.0) for _ in range(20_000)]
+    digest = TDigest(compression=100)
+    for value in values:
+        digest.add(value)
+    values.sort()
+    assert digest.quantile(0) == values[0]
+    assert digest.quantile(1) == values[-1]
+    for q in (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99):
+        assert rank_error(values, digest.quantile(q), q) < 0.01
+    assert len(digest.means) <= 2 * digest.compression
+    assert digest.total == pytest.approx(len(values))
+
+
+def test_merged_digests_match_one_digest():
+    rng = random.Random(9)
+    values = [rng.gauss(0, 1) for _ in range(10_000)]
+    whole, left, right = TDigest(), TDigest(), TDigest()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 3 else right).add(value)
+    left.merge(TDigest.from_dict(right.to_dict()))
+    values.sort()
+    for q in (0.05, 0.5, 0.95):
+        assert rank_error(values, left.quantile(q), q) < 0.01
+        assert left.quantile(q) == pytest.approx(whole.quantile(q), abs=0.05)
+    assert left.total == pytest.approx(whole.total)
+
+
+def test_merging_snapshots_matches_one_aggregator(baseline):
+    rng = random.Random(3)
+    start = 1_767_225_600.0
+    rows = [
+        (rng.choice("abc"), result, start + rng.uniform(0, 20 * DAY))
+        for _, result in baseline
+    ]
+    single = AuthorAggregator(half_life_days=7)
+    single.update(rows)
+    parts = [AuthorAggregator(half_life_days=7) for _ in range(3)]
+    for i, row in enumerate(rows):
+        parts[i % 3].add(*row)
+    merged = AuthorAggregator(half_life_days=7)
+    for part in parts:
+        merged.merge(part.snapshot())
+
+    assert merged.authors() == single.authors()
+    for author in single.authors():
+        got, want = merged.summary(author), single.summary(author)
+        assert got["posts"] == want["posts"]
+        assert got["last_post"] == want["last_post"]
+        assert got["recent_weight"] == pytest.approx(want["recent_weight"])
+        assert got["mean_p_block"] == pytest.approx(want["mean_p_block"])
+        assert got["post_type_mix"] == pytest.approx(want["post_type_mix"], abs=1e-4)
+        assert len(got["block_risk_trend"]) == len(want["block_risk_trend"])
+        for got_window, want_window in zip(got["block_risk_trend"], want["block_risk_trend"]):
+            assert got_window == pytest.approx(want_window)
+        for key in ("weighted_score", "negative_signal_safety"):
+            for q, value in want[key].items():
+                assert got[key][q] == pytest.approx(value, rel=0.05, abs=0.5)
+
+
+def test_unreadable_date_counts_as_now(baseline):
+    aggregator = AuthorAggregator()
+    aggregator.add("a", baseline[0][1], "not a date")
+    aggregator.add("a", baseline[1][1], "2026-01-01T00:00:00Z")
+    assert aggregator.bad_dates == 1
+    assert aggregator.summary("a")["posts"] == 2
@@ -0,0 +1,65 @@
+"""Every analysis path against the original analyzer's results on a fixed corpus."""
+
+import pytest
+
+import analyze_x_post
+from analyze_x_post import (
+    PostType,
+    analyze_features,
+    analyze_post,
+    analyze_posts,
+    extract_features,
+    quick_score,
+    score_post,
+)
+
+
+def test_analyze_post_matches_baseline(baseline):
+    for post, expected in baseline:
+        assert analyze_post(post["text"], post["include_media"], post["media_type"]) == expected, post["text"][:60]
+
+
+def test_analyze_features_matches_baseline(baseline):
+    for post, expected in baseline:
+        features = extract_features(post["text"])
+        assert analyze_features(features, post["include_media"], post["media_type"]) == expected
+
+
+def test_score_post_matches_baseline(baseline):
+    for post, expected in baseline:
+        score = score_post(post["text"], post["include_media"], post["media_type"])
+        assert score.weighted_score == expected.weighted_score
+        assert score.overall_score == expected.overall_score
+        assert score.post_type == expected.post_type
+        assert (score.reply_potential, score.shareability, score.media_optimization, score.negative_signal_safety) == (
+            expected.reply_potential,
+            expected.shareability,
+            expected.media_optimization,
+            expected.negative_signal_safety,
+        )
+        assert quick_score(post["text"], post["include_media"], post["media_type"]) == expected.weighted_score
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_analyze_posts_matches_baseline(baseline, workers):
+    posts = [post for post, _ in baseline]
+    results = list(analyze_posts(posts, workers=workers, chunksize=16))
+    assert results == [expected for _, expected in baseline]
+
+
+def test_literal_index_finds_every_group(baseline):
+    rules = analyze_x_post.get_rules()
+    for post, _ in baseline:
+        lower = post["text"].lower()
+        expected = {name for name, rx in rules.groups.items() if rx.search(lower)}
+        assert extract_features(post["text"]).hits == expected
+
+
+def test_recompiled_default_rules_match_baseline(baseline):
+    analyze_x_post.install_rules(analyze_x_post.current_rules())
+    for post, expected in baseline[::5]:
+        assert analyze_post(post["text"], post["include_media"], post["media_type"]) == expected
+
+
+def test_corpus_covers_every_post_type(baseline):
+    assert {expected.post_type for _, expected in baseline} == set(PostType)
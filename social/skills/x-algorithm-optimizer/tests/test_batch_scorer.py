@@ -0,0 +1,24 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analyze_x_post import ACTIONS, analyze_post  # noqa: E402
+from batch_scorer import score_posts, sweep, weight_matrix  # noqa: E402
+
+
+def test_batch_scores_bit_identical_to_analyze_post(baseline):
+    posts = [post for post, _ in baseline]
+    probs, scores = score_posts(posts)
+    for row, score, (_, expected) in zip(probs, scores, baseline):
+        assert score == expected.weighted_score
+        assert list(row) == [getattr(expected.probabilities, f"p_{action}") for action in ACTIONS]
+
+
+def test_sweep_with_default_weights_matches_scalar_scores(baseline):
+    posts = [post for post, _ in baseline[:40]]
+    probs, _ = score_posts(posts)
+    names, weights = weight_matrix({"default": {}})
+    scores, _ = sweep(probs, weights)
+    assert names == ["default"]
+    # BLAS may sum in another order, so only the last bits can differ
+    assert scores[:, 0] == pytest.approx([analyze_post(**post).weighted_score for post in posts], rel=1e-12, abs=1e-12)
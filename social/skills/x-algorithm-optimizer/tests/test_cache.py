@@ -0,0 +1,58 @@
+"""The result cache hands out copies and never serves results across settings."""
+
+import analyze_x_post
+from analyze_x_post import AnalysisCache, analyze_post, current_rules, enable_cache, install_rules
+
+TEXT = "Hot take: most productivity advice is wrong. What do you think?"
+
+
+def mutate(result):
+    result.score_breakdown["reply_potential"] = -1
+    result.detected_patterns.append("mutated")
+    result.probabilities.p_reply = -1.0
+    result.strengths.clear()
+    result.suggestions.append("mutated")
+
+
+def test_mutating_returned_results_leaves_cache_intact():
+    expected = analyze_post(TEXT)
+    cache = enable_cache()
+    mutate(analyze_post(TEXT))
+    hit = analyze_post(TEXT)
+    assert hit == expected
+    mutate(hit)
+    assert analyze_post(TEXT) == expected
+    assert cache.stats()["hits"] == 2
+
+
+def test_get_and_put_copy():
+    cache = AnalysisCache()
+    key = AnalysisCache.make_key(TEXT, False, None, True)
+    original = analyze_post(TEXT)
+    stored = analyze_post(TEXT)
+    cache.put(key, stored)
+    mutate(stored)
+    assert cache.get(key) == original
+    mutate(cache.get(key))
+    assert cache.get(key) == original
+
+
+def test_key_follows_rules_and_profile():
+    key = AnalysisCache.make_key(TEXT, False, None, True)
+    install_rules(current_rules())
+    after_rules = AnalysisCache.make_key(TEXT, False, None, True)
+    assert after_rules != key
+    analyze_x_post.apply_profile({"weights": {"reply": 20.0}})
+    after_profile = AnalysisCache.make_key(TEXT, False, None, True)
+    assert after_profile not in (key, after_rules)
+    assert after_profile[:5] == key[:5]
+
+
+def test_results_after_profile_change_are_not_stale():
+    enable_cache()
+    before = analyze_post(TEXT)
+    analyze_x_post.apply_profile({"weights": {"reply": 20.0}})
+    after = analyze_post(TEXT)
+    assert after.weighted_score != before.weighted_score
+    analyze_x_post.disable_cache()
+    assert analyze_post(TEXT) == after
@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from calibrate import Calibrator  # noqa: E402
+
+TEXTS = [
+    "What's your take on remote work?",
+    "Hot take: most productivity advice is wrong",
+    "Here's how I grew to 10k followers in 6 months",
+    "Just shipped a new feature today",
+]
+
+
+def engagement_rows(seed, scale=1):
+    """Rows where follows = 2·reply + 1·like exactly."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(400):
+        impressions = rng.randint(500, 50_000)
+        reply = int(impressions * rng.uniform(0.001, 0.02))
+        like = int(impressions * rng.uniform(0.005, 0.05))
+        rows.append({
+            "text": TEXTS[i % len(TEXTS)],
+            "impressions": impressions * scale,
+            "reply": reply * scale,
+            "like": like * scale,
+            "follows": (2 * reply + like) * scale,
+        })
+    return rows
+
+
+def fitted_weights(rows, batch=100):
+    calibrator = Calibrator(target="follows")
+    for start in range(0, len(rows), batch):
+        calibrator.update(rows[start:start + batch])
+    return calibrator.fit_weights(ridge=1e-9)
+
+
+def test_fit_weights_recovers_known_weights():
+    weights = fitted_weights(engagement_rows(7))
+    assert weights["reply"] == pytest.approx(2, rel=1e-3)
+    assert weights["like"] == pytest.approx(1, rel=1e-3)
+
+
+def test_fit_weights_independent_of_audience_size():
+    small = fitted_weights(engagement_rows(7))
+    large = fitted_weights(engagement_rows(7, scale=10))
+    assert large["reply"] == pytest.approx(small["reply"], rel=1e-3)
+    assert large["like"] == pytest.approx(small["like"], rel=1e-3)
+
+
+def test_fit_weights_same_across_batch_sizes():
+    rows = engagement_rows(11)
+    assert fitted_weights(rows, batch=7) == pytest.approx(fitted_weights(rows, batch=400))
+
+
+def test_malformed_and_skipped_rows_are_counted():
+    calibrator = Calibrator()
+    calibrator.update([
+        {"text": "a", "impressions": 0, "reply": 1},
+        {"text": "b", "impressions": "n/a", "reply": 1},
+        {"text": "c", "impressions": 100, "reply": "1,204"},
+        {"text": "d", "impressions": 100, "reply": 3},
+    ])
+    assert (calibrator.rows, calibrator.skipped, calibrator.malformed) == (2, 2, 1)
@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from analyze_x_post import analyze_post  # noqa: E402
+from incremental import IncrementalAnalyzer  # noqa: E402
+
+
+def assert_matches(session):
+    expected = analyze_post(session.text, session.include_media, session.media_type, session.is_thread_start)
+    assert session.result().to_dict() == expected.to_dict()
+
+
+def test_edits_after_length_changing_lowercase():
+    # "İ" lowercases to two characters, so anchors from that text are stale
+    session = IncrementalAnalyzer("İ you idiot")
+    session.delete(0, 1)
+    assert_matches(session)
+    session.insert(5, "x")
+    assert session.text == " you xidiot"
+    assert_matches(session)
+
+
+def test_edits_around_length_changing_lowercase():
+    session = IncrementalAnalyzer("What do you think? İstanbul is great")
+    for edit in [
+        lambda s: s.insert(len(s.text), " honestly"),
+        lambda s: s.replace(19, 20, "I"),
+        lambda s: s.insert(0, "İ "),
+        lambda s: s.delete(0, 2),
+        lambda s: s.insert(5, "x"),
+    ]:
+        edit(session)
+        assert_matches(session)
+
+
+def test_pattern_spanning_unbounded_whitespace():
+    from analyze_x_post import PostType, current_rules, install_rules
+
+    original = current_rules()
+    rules = current_rules()
+    rules["patterns"]["open_question"].append(r"lorem\s+ipsum dolor")
+    rules["pattern_keys"]["open_question"].append("lorem")
+    install_rules(rules)
+    try:
+        session = IncrementalAnalyzer("lorem" + " " * 30 + "ipsum dolo")
+        session.insert(len(session.text), "r")
+        assert session.result().post_type == PostType.OPEN_QUESTION
+        assert_matches(session)
+    finally:
+        install_rules(original)
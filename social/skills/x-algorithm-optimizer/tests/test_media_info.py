@@ -0,0 +1,107 @@
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from analyze_x_post import analyze_post  # noqa: E402
+from media_info import MediaInfo, inspect_media, inspect_media_files, primary_media  # noqa: E402
+
+
+def png(width, height):
+    ihdr = struct.pack(">II", width, height) + bytes([8, 2, 0, 0, 0])
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + b"\0\0\0\0"
+
+
+def jpeg(width, height, orientation=1):
+    tiff = b"MM\x00\x2a" + struct.pack(">I", 8) + struct.pack(">H", 1)
+    tiff += struct.pack(">HHIHH", 0x0112, 3, 1, orientation, 0) + b"\0\0\0\0"
+    app1 = b"Exif\x00\x00" + tiff
+    sof = bytes([8]) + struct.pack(">HH", height, width) + bytes([3]) + b"\x01\x11\x00" * 3
+    return (
+        b"\xff\xd8"
+        + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+        + b"\xff\xc0" + struct.pack(">H", len(sof) + 2) + sof
+        + b"\xff\xd9"
+    )
+
+
+def gif(width, height, delays):
+    data = b"GIF89a" + struct.pack("<HH", width, height) + b"\x00\x00\x00"
+    for delay in delays:
+        data += b"\x21\xf9\x04\x00" + struct.pack("<H", delay) + b"\x00\x00"
+        data += b"\x2c" + struct.pack("<HHHH", 0, 0, width, height) + b"\x00"
+        data += b"\x02\x02\x4c\x01\x00"
+    return data + b"\x3b"
+
+
+def box(kind, body):
+    return struct.pack(">I", 8 + len(body)) + kind + body
+
+
+def mp4(width, height, seconds, rotated=False):
+    mvhd = b"\0" * 12 + struct.pack(">II", 1000, int(seconds * 1000)) + b"\0" * 80
+    a, b = (0, 0x10000) if rotated else (0x10000, 0)
+    matrix = struct.pack(">ii", a, b) + b"\0" * 28
+    tkhd = b"\0" * 40 + matrix + struct.pack(">II", width << 16, height << 16)
+    moov = box(b"moov", box(b"mvhd", mvhd) + box(b"trak", box(b"tkhd", tkhd)))
+    return box(b"ftyp", b"isom\0\0\0\0") + box(b"mdat", b"\0" * 64) + moov
+
+
+@pytest.fixture
+def write(tmp_path):
+    def write(name, data):
+        path = tmp_path / name
+        path.write_bytes(data)
+        return str(path)
+    return write
+
+
+def test_png(write):
+    info = inspect_media(write("a.png", png(1200, 675)))
+    assert (info.format, info.media_type, info.width, info.height) == ("png", "image", 1200, 675)
+    assert info.aspect_ratio == pytest.approx(16 / 9)
+
+
+def test_jpeg_with_and_without_rotation(write):
+    assert inspect_media(write("a.jpg", jpeg(400, 300))).signature == ("jpeg", 400, 300, 0.0)
+    assert inspect_media(write("b.jpg", jpeg(400, 300, orientation=6))).signature == ("jpeg", 300, 400, 0.0)
+
+
+def test_animated_gif(write):
+    info = inspect_media(write("a.gif", gif(320, 240, [10, 15])))
+    assert (info.media_type, info.width, info.height, info.frames) == ("gif", 320, 240, 2)
+    assert info.duration == pytest.approx(0.25)
+    still = inspect_media(write("b.gif", gif(32, 32, [10])))
+    assert (still.frames, still.duration) == (1, 0.0)
+
+
+def test_mp4(write):
+    info = inspect_media(write("a.mp4", mp4(1920, 1080, 12.5)))
+    assert (info.format, info.media_type, info.width, info.height, info.duration) == ("mp4", "video", 1920, 1080, 12.5)
+    rotated = inspect_media(write("b.mp4", mp4(1920, 1080, 3, rotated=True)))
+    assert (rotated.width, rotated.height) == (1080, 1920)
+
+
+def test_bad_files(write):
+    with pytest.raises(ValueError, match="empty file"):
+        inspect_media(write("empty.png", b""))
+    with pytest.raises(ValueError, match="unsupported media format"):
+        inspect_media(write("a.txt", b"plain text, not media"))
+    with pytest.raises(ValueError):
+        inspect_media(write("short.png", png(10, 10)[:20]))
+    paths = [write("ok.png", png(10, 20)), write("bad.png", b"nope")]
+    infos = list(inspect_media_files(paths + ["/nonexistent.png"], workers=2, strict=False))
+    assert infos[0].height == 20 and infos[1:] == [None, None]
+
+
+def test_primary_media_feeds_analysis(write):
+    path = write("clip.mp4", mp4(1080, 1920, 20))
+    info = primary_media([path, write("other.png", png(10, 10))])
+    assert isinstance(info, MediaInfo) and info.path == path
+    assert primary_media(None) is None and primary_media([]) is None
+    result = analyze_post("Watch this", media_files=[path])
+    assert result == analyze_post("Watch this", media_files=[info])
+    assert result.to_dict() != analyze_post("Watch this").to_dict()
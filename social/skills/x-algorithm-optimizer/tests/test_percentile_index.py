@@ -0,0 +1,68 @@
+"""PercentileIndex build, file round trip and ranking."""
+
+import pytest
+
+import analyze_x_post
+from analyze_x_post import PercentileIndex, PostType, analyze_post, enable_percentiles, format_report
+
+
+def naive_percentile(scores, score):
+    below = sum(s < score for s in scores)
+    ties = sum(s == score for s in scores)
+    return 100.0 * (below + ties / 2) / len(scores)
+
+
+@pytest.fixture
+def results(baseline):
+    return [result for _, result in baseline]
+
+
+def test_saved_index_ranks_like_built_index(results, tmp_path):
+    built = PercentileIndex.build(results, min_type_count=10)
+    path = str(tmp_path / "reference.pidx")
+    built.save(path)
+    with PercentileIndex.load(path) as loaded:
+        assert len(loaded) == len(built) == len(results)
+        assert sorted(loaded.post_types(), key=str) == sorted(built.post_types(), key=str)
+        for result in results[::7]:
+            assert loaded.rank(result) == built.rank(result)
+            typed = [r.weighted_score for r in results if r.post_type is result.post_type]
+            overall, within = loaded.rank(result)
+            assert overall == pytest.approx(naive_percentile([r.weighted_score for r in results], result.weighted_score))
+            if loaded.count(result.post_type):
+                assert within == pytest.approx(naive_percentile(typed, result.weighted_score))
+            else:
+                assert within is None
+
+
+def test_pairs_and_min_type_count():
+    rows = [("open_question", 1.0), ("open_question", 2.0), (PostType.CONTRARIAN.value, 3.0)]
+    index = PercentileIndex.build(rows, min_type_count=2)
+    assert index.post_types() == [PostType.OPEN_QUESTION]
+    assert index.percentile(2.0) == pytest.approx(50.0)
+    assert index.percentile(0.0) == 0.0 and index.percentile(9.0) == 100.0
+    assert index.percentile(3.0, PostType.CONTRARIAN) is None
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "junk.pidx"
+    path.write_bytes(b"not an index at all, just bytes")
+    with pytest.raises(ValueError):
+        PercentileIndex.load(str(path))
+
+
+def test_enable_percentiles_closes_index_it_opened(results, tmp_path):
+    path = str(tmp_path / "reference.pidx")
+    PercentileIndex.build(results).save(path)
+    first = enable_percentiles(path)
+    assert "percentile" in format_report(analyze_post("What do you think?")).lower()
+    second = enable_percentiles(path)
+    assert len(first) == 0 and len(second) == len(results)
+    analyze_x_post.disable_percentiles()
+    assert len(second) == 0
+
+    mine = PercentileIndex.load(path)
+    enable_percentiles(mine)
+    analyze_x_post.disable_percentiles()
+    assert len(mine) == len(results)
+    mine.close()
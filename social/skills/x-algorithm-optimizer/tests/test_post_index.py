@@ -0,0 +1,63 @@
+"""PostIndex.update re-analyzes only new, edited or re-fingerprinted posts."""
+
+import pytest
+
+import analyze_x_post
+from analyze_x_post import analyze_post
+from post_index import PostIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    with PostIndex(str(tmp_path / "posts.db")) as index:
+        yield index
+
+
+def records(baseline, n=40):
+    return [
+        {"id": i, "text": post["text"], "include_media": post["include_media"], "media_type": post["media_type"],
+         "posted_at": f"2026-01-{i % 28 + 1:02d}T12:00:00Z"}
+        for i, (post, _) in enumerate(baseline[:n])
+    ]
+
+
+def test_second_update_skips_unchanged_and_marks_edits(index, baseline):
+    rows = records(baseline)
+    assert index.update(rows, batch_size=7) == {"new": 40, "changed": 0, "unchanged": 0, "bad_dates": 0, "pruned": 0}
+    rows[3] = dict(rows[3], text=rows[3]["text"] + " What do you think?")
+    rows.append({"id": "extra", "text": "Just shipped a new feature today"})
+    counts = index.update(rows, batch_size=7)
+    assert (counts["new"], counts["changed"], counts["unchanged"]) == (1, 1, 39)
+    stored = {post.post_id: post for post in index.query(order="id")}
+    assert len(stored) == 41
+    assert stored["3"].result == analyze_post(rows[3]["text"], rows[3]["include_media"], rows[3]["media_type"])
+    assert stored["0"].result == baseline[0][1]
+
+
+def test_profile_change_makes_everything_stale(index, baseline):
+    index.update(records(baseline))
+    analyze_x_post.apply_profile({"weights": {"reply": 20.0}})
+    assert index.stats()["stale"] == 40
+    assert index.update(records(baseline))["changed"] == 40
+    assert index.stats()["stale"] == 0
+
+
+def test_bad_date_is_stored_as_missing(index, baseline):
+    rows = records(baseline, 3)
+    rows[1]["posted_at"] = "yesterday-ish"
+    counts = index.update(rows)
+    assert counts["bad_dates"] == 1 and counts["new"] == 3
+    dated = {post.post_id: post.posted_at for post in index.query(order="id")}
+    assert dated["1"] is None and dated["0"] is not None
+    assert [post.post_id for post in index.query(since="2026-01-01", order="id")] == ["0", "2"]
+
+
+def test_prune_drops_old_revisions_of_idless_posts(index):
+    first = [{"text": "Draft one"}, {"text": "Draft two"}]
+    index.update(first)
+    edited = [{"text": "Draft one"}, {"text": "Draft two, edited"}]
+    assert index.update(edited)["new"] == 1
+    assert len(index) == 3
+    counts = index.update(edited, prune=True)
+    assert (counts["unchanged"], counts["pruned"]) == (2, 1)
+    assert sorted(post.text for post in index.query()) == ["Draft one", "Draft two, edited"]
@@ -0,0 +1,36 @@
+"""rank_posts(top_k=k) keeps exactly the first k of the full ranking."""
+
+import pytest
+
+from analyze_x_post import compare_posts, rank_posts
+
+
+@pytest.fixture
+def posts(baseline):
+    # Repeat every post so ties are everywhere
+    return [dict(post, id=i) for i, post in enumerate(post for post, _ in baseline[:60] * 3)]
+
+
+@pytest.mark.parametrize("k", [1, 2, 5, 37, 180, 500])
+def test_top_k_is_prefix_of_full_ranking(posts, k):
+    full = rank_posts(posts)
+    top = rank_posts(iter(posts), top_k=k)
+    assert [(num, post["id"]) for num, post, _ in top] == [(num, post["id"]) for num, post, _ in full[:k]]
+
+
+def test_ties_keep_input_order(posts):
+    full = rank_posts(posts)
+    for (num, _, result), (next_num, _, next_result) in zip(full, full[1:]):
+        assert result.weighted_score >= next_result.weighted_score
+        if result.weighted_score == next_result.weighted_score:
+            assert num < next_num
+
+
+def test_zero_or_negative_k_is_empty(posts):
+    assert rank_posts(posts, top_k=0) == []
+    assert rank_posts(posts, top_k=-1) == []
+
+
+def test_compare_posts_top_k_lists_only_k(posts):
+    report = compare_posts(posts, top_k=3)
+    assert "🥉" in report and "\n4." not in report
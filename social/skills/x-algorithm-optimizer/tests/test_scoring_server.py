@@ -0,0 +1,56 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from analyze_x_post import quick_score  # noqa: E402
+from scoring_server import ScoringClient, ScoringServer, handle_request  # noqa: E402
+
+
+def test_handle_request_ops():
+    assert handle_request({"op": "ping"}) == "pong"
+    assert handle_request({"op": "quick_score", "post": {"text": "What's your take?"}}) == quick_score("What's your take?")
+    batch = handle_request({"op": "analyze", "posts": ["a", {"text": "b"}]})
+    assert len(batch) == 2 and all("post_type" in r for r in batch)
+    assert "Post Comparison" in handle_request({"op": "compare", "posts": ["a", "b"]})
+    with pytest.raises(ValueError, match="unknown op"):
+        handle_request({"op": "nope"})
+
+
+def test_media_files_need_a_media_root(tmp_path):
+    request = {"op": "analyze", "post": {"text": "x", "media_files": ["clip.mp4"]}}
+    with pytest.raises(ValueError, match="--media-root"):
+        handle_request(request)
+    escape = {"op": "analyze", "post": {"text": "x", "media_files": ["../outside.png"]}}
+    with pytest.raises(ValueError, match="outside the media root"):
+        handle_request(escape, media_root=str(tmp_path))
+    with pytest.raises(ValueError, match="outside the media root"):
+        handle_request({"op": "analyze", "post": {"text": "x", "media_files": ["/etc/passwd"]}}, media_root=str(tmp_path))
+
+
+def test_pipelined_requests_and_stop_with_open_connection():
+    async def run():
+        server = ScoringServer()
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+
+        def client():
+            with ScoringClient(port=port) as c:
+                return c.request_many([{"op": "ping"}, {"op": "nope"}, {"op": "ping"}])
+
+        responses = await asyncio.get_running_loop().run_in_executor(None, client)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b'{"id": 7, "op": "ping"}\n')
+        await writer.drain()
+        assert await reader.readline() == b'{"id": 7, "ok": true, "result": "pong"}\n'
+        await asyncio.wait_for(server.stop(), 5)
+        assert await reader.read() == b""
+        writer.close()
+        return responses
+
+    responses = asyncio.run(run())
+    assert [r["ok"] for r in responses] == [True, False, True]
+    assert [r["id"] for r in responses] == [1, 2, 3]
@@ -0,0 +1,32 @@
+import io
+
+from analyze_x_post import AnalysisResult, analyze_post
+from serialize import decode_binary, encode_binary, read_binary, read_jsonl, write_binary, write_jsonl
+
+
+def results(baseline):
+    return [expected for _, expected in baseline] + [
+        analyze_post("Thread 🧵 with media", True, "video"),
+        analyze_post("", False, None),
+    ]
+
+
+def test_jsonl_round_trip(baseline):
+    originals = results(baseline)
+    out = io.StringIO()
+    assert write_jsonl(originals, out, buffer_lines=7) == len(originals)
+    assert list(read_jsonl(io.StringIO(out.getvalue()))) == originals
+
+
+def test_binary_round_trip(baseline):
+    originals = results(baseline)
+    out = io.BytesIO()
+    assert write_binary(originals, out, buffer_bytes=4096) == len(originals)
+    assert list(read_binary(io.BytesIO(out.getvalue()), chunk_bytes=1000)) == originals
+
+
+def test_single_record_and_dict_round_trip(baseline):
+    for _, result in baseline[:50]:
+        data = encode_binary(result)
+        assert decode_binary(data) == (result, len(data))
+        assert AnalysisResult.from_dict(result.to_dict()) == result
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import analyze_x_post  # noqa: E402
+from analyze_x_post import ACTIONS, analyze_post  # noqa: E402
+from uncertainty import default_weight_spec, probability_matrix, sample_weights, score_intervals  # noqa: E402
+
+TEXTS = ["What's your take on remote work?", "You idiot, this is garbage", "Thread 🧵 10 tips for founders"]
+
+
+def test_seeded_draws_repeat_and_have_expected_shape():
+    probs = probability_matrix(analyze_post(text) for text in TEXTS)
+    first = score_intervals(probs, draws=500, seed=3)
+    second = score_intervals(probs, draws=500, seed=3)
+    for key in ("mean", "std", "lower", "upper", "p_negative"):
+        assert first[key].shape == (len(TEXTS),)
+        assert np.array_equal(first[key], second[key])
+    assert sample_weights(10, rng=np.random.default_rng(0)).shape == (10, len(ACTIONS))
+
+
+def test_fixed_weights_reproduce_point_scores():
+    results = [analyze_post(text) for text in TEXTS]
+    spec = {action: getattr(analyze_x_post.ActionWeights, action.upper()) for action in ACTIONS}
+    stats = score_intervals(probability_matrix(results), draws=50, weight_spec=spec, concentration=None)
+    assert stats["mean"] == pytest.approx([r.weighted_score for r in results])
+    assert np.allclose(stats["std"], 0)
+
+
+def test_default_intervals_contain_point_score_after_profile_change():
+    analyze_x_post.apply_profile({"weights": {"reply": 40.0, "block": -3000.0}})
+    assert default_weight_spec()["reply"][2] == 40.0
+    results = [analyze_post(text) for text in TEXTS]
+    stats = score_intervals(probability_matrix(results), draws=4000, concentration=None)
+    for result, lower, mean, upper in zip(results, stats["lower"], stats["mean"], stats["upper"]):
+        assert lower <= result.weighted_score <= upper
+        assert mean == pytest.approx(result.weighted_score, abs=0.05 * (upper - lower) + 1e-9)
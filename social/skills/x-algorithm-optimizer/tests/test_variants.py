@@ -0,0 +1,73 @@
+"""VariantSearch against scoring each assembled text from scratch."""
+
+import itertools
+import random
+
+import pytest
+
+from analyze_x_post import analyze_post, score_post
+from variants import VariantSearch
+
+# Pieces that interact across a join: numbers, URLs and list markers split
+# between parts, case folds that change length, and empty parts
+FRAGMENTS = [
+    "12", "3.", "\n1. x", "http:", "//y.co", "http://a", "İs", "   ", "idiot", "\n", "99", "5 tips",
+    "Hot take:", "Unpopular opinion: remote work is DEAD", "What do you think?", "Here's the thing",
+    "1. First\n2. Second", "🧵 thread", "I was wrong about", "Follow for more", "", "Ω", "ΣΑΣ",
+    "Bookmark this", "agree or disagree?", "https://x.com/a", "99% of people", "Stop doing this",
+    "ever", "How to", "Why",
+]
+SEPARATORS = ["\n\n", " ", "? ", "", "\n", "7"]
+MEDIA = [(False, None), (True, "video")]
+
+
+def random_slots(rng):
+    part = lambda: " ".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 3)))
+    return [[part() for _ in range(rng.randint(1, 3))] for _ in range(rng.randint(1, 3))]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_assemblies_match_scoring_the_joined_text(seed):
+    rng = random.Random(seed)
+    slots = random_slots(rng)
+    separator = rng.choice(SEPARATORS)
+    for include_media, media_type in MEDIA:
+        search = VariantSearch(slots, include_media, media_type, separator)
+        scores = dict((indices, score) for score, indices in search.scores())
+        for indices in itertools.product(*(range(len(slot)) for slot in slots)):
+            text = search.text(indices)
+            expected = score_post(text, include_media, media_type)
+            assert search.score(indices) == expected, repr(text)
+            assert scores[indices] == expected.weighted_score, repr(text)
+            assert search.analyze(indices) == analyze_post(text, include_media, media_type), repr(text)
+
+
+def test_exhaustive_top_is_best_in_enumeration_order():
+    rng = random.Random(7)
+    slots = [[rng.choice(FRAGMENTS) + " " + rng.choice(FRAGMENTS) for _ in range(4)] for _ in range(3)]
+    search = VariantSearch(slots)
+    ranked = sorted(search.scores(), key=lambda item: item[0], reverse=True)
+    top = search.top(5)
+    assert [v.parts for v in top] == [indices for _, indices in ranked[:5]]
+    for variant in top:
+        assert variant.text == search.text(variant.parts)
+        assert variant.score == score_post(variant.text)
+
+
+def test_beam_returns_valid_scored_assemblies():
+    rng = random.Random(11)
+    slots = [[rng.choice(FRAGMENTS) for _ in range(5)] for _ in range(3)]
+    search = VariantSearch(slots, separator=" ")
+    exhaustive = search.top(1)[0].score.weighted_score
+    beam = search.top(3, beam_width=4)
+    assert len(beam) == 3
+    assert [v.score.weighted_score for v in beam] == sorted((v.score.weighted_score for v in beam), reverse=True)
+    for variant in beam:
+        assert len(variant.parts) == len(slots)
+        assert variant.score == score_post(variant.text)
+        assert variant.score.weighted_score <= exhaustive
+
+
+def test_empty_slot_is_rejected():
+    with pytest.raises(ValueError):
+        VariantSearch([["a"], []])